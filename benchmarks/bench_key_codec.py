@@ -0,0 +1,86 @@
+#
+# bench_key_codec.py
+#
+# Key string codec timings: the hex round trip implementation EOSKey used before
+# key_codec, against key_codec and the memoised EOSKey.to_public.
+#
+#   python benchmarks/bench_key_codec.py
+#
+
+import hashlib
+import timeit
+from binascii import hexlify, unhexlify
+import base58
+from quantralib.key_codec import decode_key_string, encode_key_string, encode_wif
+from quantralib.keys import EOSKey
+
+KEY = EOSKey('PVT_K1_r9seSVdS9yTRmSXtLrpELLZ5dhbEqr12jLCRg5NJAWr5q8U9o')
+DIGEST = hashlib.sha256(b'benchmark').hexdigest()
+SIG = KEY.sign(DIGEST)
+SECRET = KEY._sk.to_string()
+PUBLIC = KEY._compressed()
+COMPACT = decode_key_string(SIG, 'SIG')[1]
+
+
+def _sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def _ripemd160(data):
+    return hashlib.new('rmd160', data).hexdigest()
+
+
+def legacy_check_encode(key_buffer, key_type=None):
+    if isinstance(key_buffer, bytes):
+        key_buffer = key_buffer.decode()
+    check = key_buffer
+    if key_type == 'sha256x2':
+        chksum = _sha256(unhexlify(_sha256(unhexlify(check))))[:8]
+    else:
+        if key_type:
+            check += hexlify(bytearray(key_type, 'utf-8')).decode()
+        chksum = _ripemd160(unhexlify(check))[:8]
+    return base58.b58encode(unhexlify(key_buffer + chksum))
+
+
+def legacy_check_decode(key_string, key_type=None):
+    buffer = hexlify(base58.b58decode(key_string)).decode()
+    chksum, key = buffer[-8:], buffer[:-8]
+    check = key
+    if key_type:
+        check += hexlify(bytearray(key_type, 'utf-8')).decode()
+    if chksum != _ripemd160(unhexlify(check))[:8]:
+        raise ValueError('checksums do not match')
+    return key
+
+
+CASES = [
+    ('public key encode',
+     lambda: 'EOS' + legacy_check_encode(hexlify(PUBLIC)).decode(),
+     lambda: encode_key_string('PUB', 'K1', PUBLIC)),
+    ('EOSKey.to_public',
+     lambda: 'EOS' + legacy_check_encode(KEY.do_compress_pubkey(KEY._curve.order, KEY._vk.pubkey.point)).decode(),
+     KEY.to_public),
+    ('wif encode',
+     lambda: legacy_check_encode('80' + hexlify(SECRET).decode(), 'sha256x2').decode(),
+     lambda: encode_wif(SECRET)),
+    ('signature encode',
+     lambda: 'SIG_K1_' + legacy_check_encode(hexlify(COMPACT), 'K1').decode(),
+     lambda: encode_key_string('SIG', 'K1', COMPACT)),
+    ('signature decode',
+     lambda: unhexlify(legacy_check_decode(SIG[7:], 'K1')),
+     lambda: decode_key_string(SIG, 'SIG')[1]),
+]
+
+
+def main(number=20000):
+    print('{:<20} {:>12} {:>12} {:>8}'.format('', 'legacy us', 'codec us', 'speedup'))
+    for name, legacy, codec in CASES:
+        assert legacy() == codec()
+        old = min(timeit.repeat(legacy, number=number, repeat=3)) / number * 1e6
+        new = min(timeit.repeat(codec, number=number, repeat=3)) / number * 1e6
+        print('{:<20} {:>12.2f} {:>12.2f} {:>7.1f}x'.format(name, old, new, old / new))
+
+
+if __name__ == '__main__':
+    main()
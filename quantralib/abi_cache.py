@@ -0,0 +1,102 @@
+#
+# abi_cache.py
+#
+
+import base64
+import threading
+import time
+from collections import OrderedDict
+from .abi_serializer import find_serializer, get_serializer, unpack_abi
+from .exceptions import EOSAbiProcessingError
+
+DEFAULT_ABI_CACHE_SIZE = 128
+# how long a cached abi is trusted before it is checked against the chain abi_hash
+DEFAULT_ABI_CACHE_TTL = 300
+
+
+class _AbiEntry:
+    __slots__ = ('abi_hash', 'serializer', 'checked')
+
+    def __init__(self, abi_hash, serializer, checked):
+        self.abi_hash = abi_hash
+        self.serializer = serializer
+        self.checked = checked
+
+
+class AbiCache:
+    '''
+    Per client cache of contract abis, keyed by account name.
+
+    An abi is fetched and parsed once with chain.get_raw_abi. After ttl seconds the entry
+    is revalidated by sending its abi_hash along: nodeos only returns the abi body when
+    the contract abi changed, so an unchanged abi costs a single small round trip.
+    At most maxsize abis are kept, the least recently used one is evicted first.
+    '''
+
+    def __init__(self, cleos, maxsize=DEFAULT_ABI_CACHE_SIZE, ttl=DEFAULT_ABI_CACHE_TTL, clock=time.monotonic):
+        self._cleos = cleos
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, account):
+        return account in self._entries
+
+    def cached(self, account):
+        ''' the cached AbiSerializer of account if it is still fresh, None otherwise '''
+        with self._lock:
+            entry = self._entries.get(account)
+            if entry is None or self._clock() - entry.checked > self._ttl:
+                return None
+            self._entries.move_to_end(account)
+            return entry.serializer
+
+    def stale_hash(self, account):
+        ''' abi_hash of the cached entry to revalidate, None when account is not cached '''
+        with self._lock:
+            entry = self._entries.get(account)
+            return entry.abi_hash if entry is not None else None
+
+    def update(self, account, raw_abi):
+        ''' update the cache from a chain.get_raw_abi response, returns the AbiSerializer '''
+        abi_hash = raw_abi.get('abi_hash')
+        with self._lock:
+            entry = self._entries.get(account)
+            if entry is not None and not raw_abi.get('abi') and entry.abi_hash == abi_hash:
+                # abi unchanged
+                entry.checked = self._clock()
+                self._entries.move_to_end(account)
+                return entry.serializer
+        if not raw_abi.get('abi'):
+            self.invalidate(account)
+            raise EOSAbiProcessingError('{} has no abi'.format(account))
+        serializer = find_serializer(abi_hash) if abi_hash else None
+        if serializer is None:
+            serializer = get_serializer(unpack_abi(base64.b64decode(raw_abi['abi'])), abi_hash)
+        with self._lock:
+            self._entries[account] = _AbiEntry(abi_hash, serializer, self._clock())
+            self._entries.move_to_end(account)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+        return serializer
+
+    def get(self, account, timeout=30):
+        ''' AbiSerializer for the contract on account '''
+        serializer = self.cached(account)
+        if serializer is None:
+            raw_abi = self._cleos.get_raw_abi(account, abi_hash=self.stale_hash(account), timeout=timeout)
+            serializer = self.update(account, raw_abi)
+        return serializer
+
+    def invalidate(self, account=None):
+        ''' drop the cached abi of account, or all of them '''
+        with self._lock:
+            if account is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(account, None)
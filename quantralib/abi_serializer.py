@@ -0,0 +1,804 @@
+#
+# abi_serializer.py
+#
+# Local implementation of the nodeos abi_serializer: converts action data between
+# its json form and the binary form expected on chain, driven by a contract abi.
+#
+
+import calendar
+import datetime as dt
+import functools
+import re
+import struct
+import threading
+from collections import OrderedDict
+from .utils import string_to_name, name_to_string, sha256
+from .key_codec import KEY_TYPES, decode_key_string, encode_key_string
+from .exceptions import EOSAbiProcessingError, EOSUnknownObj
+
+# epoch of block_timestamp_type (2000-01-01T00:00:00) in ms, and its slot length
+BLOCK_TIMESTAMP_EPOCH_MS = 946684800000
+BLOCK_INTERVAL_MS = 500
+NAME_CACHE_SIZE = 4096
+
+_NAME_RE = re.compile(r'^[.1-5a-z]{0,12}[.1-5a-j]?$')
+_TIME_RE = re.compile(r'^(\d{4})-(\d{2})-(\d{2})T(\d{2}):(\d{2}):(\d{2})(?:\.(\d{1,6}))?Z?$')
+_FIXED_ARRAY_RE = re.compile(r'^(.*)\[(\d+)\]$')
+
+_INT_FORMATS = {
+    'int8': 'b', 'uint8': 'B',
+    'int16': 'h', 'uint16': 'H',
+    'int32': 'i', 'uint32': 'I',
+    'int64': 'q', 'uint64': 'Q',
+}
+
+
+class BinaryReader:
+    ''' cursor over a read-only view of the serialized data '''
+
+    def __init__(self, data, pos=0):
+        if isinstance(data, str):
+            data = bytes.fromhex(data)
+        self.data = memoryview(data)
+        self.pos = pos
+
+    def remaining(self):
+        return len(self.data) - self.pos
+
+    def read(self, length):
+        end = self.pos + length
+        if end > len(self.data):
+            raise EOSAbiProcessingError('Read past the end of the buffer')
+        view = self.data[self.pos:end]
+        self.pos = end
+        return view
+
+    def unpack(self, fmt, size):
+        if self.pos + size > len(self.data):
+            raise EOSAbiProcessingError('Read past the end of the buffer')
+        val = struct.unpack_from(fmt, self.data, self.pos)[0]
+        self.pos += size
+        return val
+
+    def read_byte(self):
+        return self.unpack('<B', 1)
+
+    def read_varuint32(self):
+        shift = 0
+        result = 0
+        while True:
+            b = self.read_byte()
+            result |= (b & 0x7f) << shift
+            shift += 7
+            if not b & 0x80:
+                return result
+
+
+#####
+# helpers
+#####
+
+def _to_int(val):
+    if isinstance(val, str):
+        val = val.strip()
+        if val.startswith(('0x', '0X')):
+            return int(val, 16)
+        return int(val)
+    if isinstance(val, float):
+        if not val.is_integer():
+            raise EOSAbiProcessingError('{} is not an integer'.format(val))
+    return int(val)
+
+
+def _from_hex(val, length=None):
+    if isinstance(val, (bytes, bytearray, memoryview)):
+        data = bytes(val)
+    else:
+        try:
+            data = bytes.fromhex(val)
+        except (TypeError, ValueError):
+            raise EOSAbiProcessingError('{} is not a valid hex string'.format(val))
+    if length is not None and len(data) != length:
+        raise EOSAbiProcessingError('Expected {} bytes, got {}'.format(length, len(data)))
+    return data
+
+
+def _decode_key_string(val, prefix):
+    ''' decode EOS.../PUB_K1_.../SIG_K1_... style strings into (key type index, raw bytes) '''
+    try:
+        key_type, data = decode_key_string(val, prefix)
+    except ValueError as ex:
+        raise EOSAbiProcessingError('{} is not a valid key string: {}'.format(val, ex))
+    return KEY_TYPES.index(key_type), data
+
+
+def _encode_key_string(key_type, data, prefix):
+    return encode_key_string(prefix, KEY_TYPES[key_type], data)
+
+
+def _symbol_code_to_int(code):
+    if not re.match(r'^[A-Z]{1,7}$', code):
+        raise EOSAbiProcessingError('{} is not a valid symbol code'.format(code))
+    return int.from_bytes(code.encode().ljust(8, b'\0'), 'little')
+
+
+def _symbol_code_from_int(val):
+    return val.to_bytes(8, 'little').rstrip(b'\0').decode()
+
+
+def _parse_symbol(val):
+    try:
+        precision, code = val.split(',')
+        precision = int(precision)
+    except (AttributeError, ValueError):
+        raise EOSAbiProcessingError('{} is not a valid symbol, expected <precision>,<code>'.format(val))
+    if not 0 <= precision <= 18:
+        raise EOSAbiProcessingError('Invalid symbol precision {}'.format(precision))
+    return precision | (_symbol_code_to_int(code) << 8)
+
+
+def _format_symbol(val):
+    return '{},{}'.format(val & 0xff, _symbol_code_from_int(val >> 8))
+
+
+def _parse_asset(val):
+    ''' "1.0000 EOS" -> (amount, symbol) without going through floats '''
+    try:
+        amount_str, code = val.split()
+    except (AttributeError, ValueError):
+        raise EOSAbiProcessingError('{} is not a valid asset, expected <amount> <symbol>'.format(val))
+    digits = amount_str.lstrip('-')
+    if '.' in digits:
+        int_part, frac = digits.split('.')
+    else:
+        int_part, frac = digits, ''
+    if not (int_part + frac).isdigit():
+        raise EOSAbiProcessingError('{} is not a valid asset amount'.format(amount_str))
+    amount = int(int_part + frac)
+    if amount_str.startswith('-'):
+        amount = -amount
+    return amount, len(frac) | (_symbol_code_to_int(code) << 8)
+
+
+def _format_asset(amount, symbol):
+    precision = symbol & 0xff
+    digits = str(abs(amount)).rjust(precision + 1, '0')
+    if precision:
+        digits = '{}.{}'.format(digits[:-precision], digits[-precision:])
+    return '{}{} {}'.format('-' if amount < 0 else '', digits, _symbol_code_from_int(symbol >> 8))
+
+
+def _parse_time(val):
+    ''' iso time string (always UTC) -> microseconds since epoch '''
+    if isinstance(val, dt.datetime):
+        return calendar.timegm(val.utctimetuple()) * 1000000 + val.microsecond
+    if not isinstance(val, str):
+        return _to_int(val)
+    match = _TIME_RE.match(val)
+    if not match:
+        raise EOSAbiProcessingError('{} is not a valid time'.format(val))
+    parts = match.groups()
+    seconds = calendar.timegm(tuple(int(p) for p in parts[:6]))
+    micro = int((parts[6] or '').ljust(6, '0'))
+    return seconds * 1000000 + micro
+
+
+def _format_time(micro, precision=3):
+    t = dt.datetime(1970, 1, 1) + dt.timedelta(microseconds=micro)
+    s = t.strftime('%Y-%m-%dT%H:%M:%S')
+    if precision:
+        s += '.' + '{:06d}'.format(t.microsecond)[:precision]
+    return s
+
+
+#####
+# built-in types
+#####
+
+def _pack_varuint32(buf, val):
+    val = _to_int(val)
+    if not 0 <= val <= 0xffffffff:
+        raise EOSAbiProcessingError('{} is out of range for varuint32'.format(val))
+    while True:
+        b = val & 0x7f
+        val >>= 7
+        if val:
+            buf.append(b | 0x80)
+        else:
+            buf.append(b)
+            return
+
+
+def _pack_varint32(buf, val):
+    val = _to_int(val)
+    if not -0x80000000 <= val <= 0x7fffffff:
+        raise EOSAbiProcessingError('{} is out of range for varint32'.format(val))
+    _pack_varuint32(buf, ((val << 1) ^ (val >> 31)) & 0xffffffff)
+
+
+def _unpack_varint32(reader):
+    val = reader.read_varuint32()
+    return (val >> 1) ^ -(val & 1)
+
+
+def _int_codec(fmt):
+    fmt = '<' + fmt
+    size = struct.calcsize(fmt)
+
+    def pack(buf, val):
+        try:
+            buf += struct.pack(fmt, _to_int(val))
+        except struct.error:
+            raise EOSAbiProcessingError('{} is out of range for {}'.format(val, fmt))
+
+    def unpack(reader):
+        return reader.unpack(fmt, size)
+    return pack, unpack
+
+
+def _int128_codec(signed):
+    def pack(buf, val):
+        try:
+            buf += _to_int(val).to_bytes(16, 'little', signed=signed)
+        except OverflowError:
+            raise EOSAbiProcessingError('{} is out of range for a 128 bit integer'.format(val))
+
+    def unpack(reader):
+        return int.from_bytes(reader.read(16), 'little', signed=signed)
+    return pack, unpack
+
+
+def _float_codec(fmt):
+    fmt = '<' + fmt
+    size = struct.calcsize(fmt)
+
+    def pack(buf, val):
+        buf += struct.pack(fmt, float(val))
+
+    def unpack(reader):
+        return reader.unpack(fmt, size)
+    return pack, unpack
+
+
+def _fixed_bytes_codec(length):
+    def pack(buf, val):
+        buf += _from_hex(val, length)
+
+    def unpack(reader):
+        return reader.read(length).hex()
+    return pack, unpack
+
+
+def _pack_bool(buf, val):
+    if isinstance(val, str):
+        val = val.strip().lower() in ('true', '1')
+    buf.append(1 if val else 0)
+
+
+def _unpack_bool(reader):
+    return reader.read_byte() != 0
+
+
+# the same few account/action names are serialized over and over
+@functools.lru_cache(maxsize=NAME_CACHE_SIZE)
+def _name_to_bytes(val):
+    if not _NAME_RE.match(val):
+        raise EOSAbiProcessingError('{} is not a valid name'.format(val))
+    return struct.pack('<Q', string_to_name(val))
+
+
+_name_from_int = functools.lru_cache(maxsize=NAME_CACHE_SIZE)(name_to_string)
+
+
+def _pack_name(buf, val):
+    if not isinstance(val, str):
+        raise EOSAbiProcessingError('{} is not a valid name'.format(val))
+    buf += _name_to_bytes(val)
+
+
+def _unpack_name(reader):
+    return _name_from_int(reader.unpack('<Q', 8))
+
+
+def _pack_string(buf, val):
+    data = val.encode('utf-8')
+    _pack_varuint32(buf, len(data))
+    buf += data
+
+
+def _unpack_string(reader):
+    return bytes(reader.read(reader.read_varuint32())).decode('utf-8')
+
+
+def _pack_bytes(buf, val):
+    data = _from_hex(val)
+    _pack_varuint32(buf, len(data))
+    buf += data
+
+
+def _unpack_bytes(reader):
+    return reader.read(reader.read_varuint32()).hex()
+
+
+def _pack_time_point(buf, val):
+    buf += struct.pack('<q', _parse_time(val))
+
+
+def _unpack_time_point(reader):
+    return _format_time(reader.unpack('<q', 8))
+
+
+def _pack_time_point_sec(buf, val):
+    buf += struct.pack('<I', _parse_time(val) // 1000000)
+
+
+def _unpack_time_point_sec(reader):
+    return _format_time(reader.unpack('<I', 4) * 1000000, precision=0)
+
+
+def _pack_block_timestamp(buf, val):
+    ms = _parse_time(val) // 1000
+    buf += struct.pack('<I', (ms - BLOCK_TIMESTAMP_EPOCH_MS) // BLOCK_INTERVAL_MS)
+
+
+def _unpack_block_timestamp(reader):
+    slot = reader.unpack('<I', 4)
+    return _format_time((slot * BLOCK_INTERVAL_MS + BLOCK_TIMESTAMP_EPOCH_MS) * 1000)
+
+
+def _pack_public_key(buf, val):
+    key_type, data = _decode_key_string(val, 'PUB')
+    buf.append(key_type)
+    buf += data
+
+
+def _unpack_public_key(reader):
+    key_type = reader.read_byte()
+    if key_type >= len(KEY_TYPES) or KEY_TYPES[key_type] == 'WA':
+        raise EOSAbiProcessingError('Unsupported public key type {}'.format(key_type))
+    return _encode_key_string(key_type, reader.read(33), 'PUB')
+
+
+def _pack_signature(buf, val):
+    key_type, data = _decode_key_string(val, 'SIG')
+    buf.append(key_type)
+    buf += data
+
+
+def _unpack_signature(reader):
+    key_type = reader.read_byte()
+    if key_type >= len(KEY_TYPES) or KEY_TYPES[key_type] == 'WA':
+        raise EOSAbiProcessingError('Unsupported signature type {}'.format(key_type))
+    return _encode_key_string(key_type, reader.read(65), 'SIG')
+
+
+def _pack_symbol(buf, val):
+    buf += struct.pack('<Q', _parse_symbol(val))
+
+
+def _unpack_symbol(reader):
+    return _format_symbol(reader.unpack('<Q', 8))
+
+
+def _pack_symbol_code(buf, val):
+    buf += struct.pack('<Q', _symbol_code_to_int(val))
+
+
+def _unpack_symbol_code(reader):
+    return _symbol_code_from_int(reader.unpack('<Q', 8))
+
+
+def _pack_asset(buf, val):
+    amount, symbol = _parse_asset(val)
+    try:
+        buf += struct.pack('<qQ', amount, symbol)
+    except struct.error:
+        raise EOSAbiProcessingError('{} is out of range for an asset'.format(val))
+
+
+def _unpack_asset(reader):
+    amount = reader.unpack('<q', 8)
+    return _format_asset(amount, reader.unpack('<Q', 8))
+
+
+def _pack_extended_asset(buf, val):
+    _pack_asset(buf, val['quantity'])
+    _pack_name(buf, val['contract'])
+
+
+def _unpack_extended_asset(reader):
+    return OrderedDict([('quantity', _unpack_asset(reader)), ('contract', _unpack_name(reader))])
+
+
+BUILTIN_TYPES = {
+    'bool': (_pack_bool, _unpack_bool),
+    'int128': _int128_codec(True),
+    'uint128': _int128_codec(False),
+    'varint32': (_pack_varint32, _unpack_varint32),
+    'varuint32': (_pack_varuint32, lambda reader: reader.read_varuint32()),
+    'float32': _float_codec('f'),
+    'float64': _float_codec('d'),
+    'float128': _fixed_bytes_codec(16),
+    'time_point': (_pack_time_point, _unpack_time_point),
+    'time_point_sec': (_pack_time_point_sec, _unpack_time_point_sec),
+    'block_timestamp_type': (_pack_block_timestamp, _unpack_block_timestamp),
+    'name': (_pack_name, _unpack_name),
+    'bytes': (_pack_bytes, _unpack_bytes),
+    'string': (_pack_string, _unpack_string),
+    'checksum160': _fixed_bytes_codec(20),
+    'checksum256': _fixed_bytes_codec(32),
+    'checksum512': _fixed_bytes_codec(64),
+    'public_key': (_pack_public_key, _unpack_public_key),
+    'signature': (_pack_signature, _unpack_signature),
+    'symbol': (_pack_symbol, _unpack_symbol),
+    'symbol_code': (_pack_symbol_code, _unpack_symbol_code),
+    'asset': (_pack_asset, _unpack_asset),
+    'extended_asset': (_pack_extended_asset, _unpack_extended_asset),
+}
+BUILTIN_TYPES.update((name, _int_codec(fmt)) for name, fmt in _INT_FORMATS.items())
+
+
+class AbiSerializer:
+    '''
+    Serializes action data the same way nodeos' chain.abi_json_to_bin does,
+    driven by a contract abi (the "abi" member of a chain.get_abi response).
+
+    Supports all nodeos built-in types, structs with base, typedefs, arrays (T[]),
+    fixed arrays (T[N]), optionals (T?), binary extensions (T$) and variants.
+
+    Every type is compiled on first use into a (pack, unpack) pair of closures, structs
+    into a flat list of field codecs with the base fields first. Later calls for the same
+    type skip type resolution entirely. Use get_serializer() to share the compiled codecs
+    of an abi between clients.
+
+    Compilation holds a per-serializer lock and publishes its codecs only once all of them
+    are complete, so other threads never see a struct or variant whose fields are still
+    being compiled.
+    '''
+
+    def __init__(self, abi):
+        self.abi = abi
+        self._typedefs = {t['new_type_name']: t['type'] for t in abi.get('types', [])}
+        self._structs = {s['name']: s for s in abi.get('structs', [])}
+        self._variants = {v['name']: v['types'] for v in abi.get('variants', [])}
+        self._actions = {a['name']: a['type'] for a in abi.get('actions', [])}
+        self._codecs = {}
+        # codecs of the compilation in progress, only seen by the thread holding the lock
+        self._pending = None
+        self._lock = threading.RLock()
+
+    def get_action_type(self, action):
+        try:
+            return self._actions[action]
+        except KeyError:
+            raise EOSUnknownObj('{} is not a valid action for this contract'.format(action))
+
+    def action_fields(self, action):
+        ''' (name, type) of the fields of the struct of action, base fields first '''
+        struct_type = self.resolve_type(self.get_action_type(action))
+        if struct_type not in self._structs:
+            raise EOSAbiProcessingError('The type {} of action {} is not a struct'.format(struct_type, action))
+        return [(name, field_type) for name, field_type, _ in self._struct_fields(self._structs[struct_type])]
+
+    def resolve_type(self, type_name):
+        ''' follow typedefs down to a built-in type, struct, variant or modified type '''
+        seen = set()
+        while type_name in self._typedefs:
+            if type_name in seen:
+                raise EOSAbiProcessingError('Circular typedef {}'.format(type_name))
+            seen.add(type_name)
+            type_name = self._typedefs[type_name]
+        return type_name
+
+    #####
+    # codec compilation
+    #####
+
+    def codec(self, type_name):
+        ''' the compiled (pack(buf, val), unpack(reader)) pair of type_name '''
+        codec = self._codecs.get(type_name)
+        if codec is None:
+            with self._lock:
+                codec = self._codecs.get(type_name)
+                if codec is None:
+                    codec = self._compile_codec(type_name)
+        return codec
+
+    def _compile_codec(self, type_name):
+        if self._pending is not None:
+            # nested in the compilation of this thread, placeholders of recursive types included
+            codec = self._pending.get(type_name)
+            return codec if codec is not None else self._compile(type_name)
+        self._pending = {}
+        try:
+            codec = self._compile(type_name)
+            self._codecs.update(self._pending)
+        finally:
+            self._pending = None
+        return codec
+
+    def _compile(self, type_name):
+        resolved = self.resolve_type(type_name)
+        if resolved != type_name:
+            codec = self._pending[type_name] = self.codec(resolved)
+            return codec
+        if type_name.endswith('?'):
+            codec = self._compile_optional(type_name)
+        elif type_name.endswith('[]'):
+            codec = self._compile_array(type_name)
+        elif type_name in BUILTIN_TYPES:
+            codec = BUILTIN_TYPES[type_name]
+        elif type_name in self._structs:
+            # registers itself before compiling the fields, structs may refer to themselves
+            return self._compile_struct(type_name)
+        elif type_name in self._variants:
+            # registers itself as well, variants may refer to themselves through a struct
+            return self._compile_variant(type_name)
+        elif _FIXED_ARRAY_RE.match(type_name):
+            codec = self._compile_fixed_array(type_name)
+        else:
+            raise EOSUnknownObj('{} is not a known abi type'.format(type_name))
+        self._pending[type_name] = codec
+        return codec
+
+    def _compile_optional(self, type_name):
+        item_pack, item_unpack = self.codec(type_name[:-1])
+
+        def pack(buf, val):
+            if val is None:
+                buf.append(0)
+            else:
+                buf.append(1)
+                item_pack(buf, val)
+
+        def unpack(reader):
+            if not reader.read_byte():
+                return None
+            return item_unpack(reader)
+        return pack, unpack
+
+    def _compile_array(self, type_name):
+        item_pack, item_unpack = self.codec(type_name[:-2])
+
+        def pack(buf, val):
+            if not isinstance(val, (list, tuple)):
+                raise EOSAbiProcessingError('Expected an array for {}, got {}'.format(type_name, val))
+            _pack_varuint32(buf, len(val))
+            for item in val:
+                item_pack(buf, item)
+
+        def unpack(reader):
+            return [item_unpack(reader) for _ in range(reader.read_varuint32())]
+        return pack, unpack
+
+    def _compile_fixed_array(self, type_name):
+        item_type, size = _FIXED_ARRAY_RE.match(type_name).groups()
+        size = int(size)
+        item_pack, item_unpack = self.codec(item_type)
+
+        def pack(buf, val):
+            if len(val) != size:
+                raise EOSAbiProcessingError('Expected {} items for {}'.format(size, type_name))
+            for item in val:
+                item_pack(buf, item)
+
+        def unpack(reader):
+            return [item_unpack(reader) for _ in range(size)]
+        return pack, unpack
+
+    def _compile_variant(self, type_name):
+        types = self._variants[type_name]
+        index = {name: i for i, name in enumerate(types)}
+        codecs = []
+
+        def pack(buf, val):
+            if not isinstance(val, (list, tuple)) or len(val) != 2 or val[0] not in index:
+                raise EOSAbiProcessingError('Expected [type, value] with a type from {} for {}'.format(types, type_name))
+            idx = index[val[0]]
+            _pack_varuint32(buf, idx)
+            codecs[idx][0](buf, val[1])
+
+        def unpack(reader):
+            idx = reader.read_varuint32()
+            if idx >= len(types):
+                raise EOSAbiProcessingError('Invalid index {} for variant {}'.format(idx, type_name))
+            return [types[idx], codecs[idx][1](reader)]
+        self._pending[type_name] = (pack, unpack)
+        try:
+            codecs.extend(self.codec(name) for name in types)
+        except Exception:
+            del self._pending[type_name]
+            raise
+        return pack, unpack
+
+    def _struct_fields(self, struct_def, seen=()):
+        ''' (name, type, is_extension) of all fields of struct_def, base fields first '''
+        if struct_def['name'] in seen:
+            raise EOSAbiProcessingError('Circular base of {}'.format(struct_def['name']))
+        fields = []
+        base = struct_def.get('base')
+        if base:
+            base = self.resolve_type(base)
+            if base not in self._structs:
+                raise EOSUnknownObj('{} is not a known struct'.format(base))
+            fields.extend(self._struct_fields(self._structs[base], seen + (struct_def['name'],)))
+        for field in struct_def['fields']:
+            field_type = field['type']
+            is_ext = field_type.endswith('$')
+            fields.append((field['name'], field_type[:-1] if is_ext else field_type, is_ext))
+        return fields
+
+    def _compile_struct(self, type_name):
+        ops = []
+
+        def pack(buf, val):
+            if not isinstance(val, dict):
+                raise EOSAbiProcessingError('Expected an object for {}, got {}'.format(type_name, val))
+            skipped = None
+            for name, field_pack, _, is_ext in ops:
+                if name not in val:
+                    if is_ext:
+                        skipped = name
+                        continue
+                    raise EOSAbiProcessingError('Missing field {} in {}'.format(name, type_name))
+                if skipped:
+                    raise EOSAbiProcessingError('Binary extension {} of {} can not be skipped'.format(skipped, type_name))
+                field_pack(buf, val[name])
+
+        def unpack(reader):
+            out = OrderedDict()
+            for name, _, field_unpack, is_ext in ops:
+                if is_ext and not reader.remaining():
+                    break
+                out[name] = field_unpack(reader)
+            return out
+        self._pending[type_name] = (pack, unpack)
+        try:
+            for name, field_type, is_ext in self._struct_fields(self._structs[type_name]):
+                field_pack, field_unpack = self.codec(field_type)
+                ops.append((name, field_pack, field_unpack, is_ext))
+        except Exception:
+            del self._pending[type_name]
+            raise
+        return pack, unpack
+
+    #####
+    # json -> bin
+    #####
+
+    def _pack(self, buf, type_name, val):
+        self.codec(type_name)[0](buf, val)
+
+    def encode(self, type_name, val):
+        ''' serialize val as type_name, returns bytes '''
+        buf = bytearray()
+        self.codec(type_name)[0](buf, val)
+        return bytes(buf)
+
+    def encode_action_data(self, action, data):
+        return self.encode(self.get_action_type(action), data)
+
+    #####
+    # bin -> json
+    #####
+
+    def _unpack(self, reader, type_name):
+        return self.codec(type_name)[1](reader)
+
+    def decode(self, type_name, data):
+        ''' deserialize data (bytes, hex string or a BinaryReader) as type_name '''
+        reader = data if isinstance(data, BinaryReader) else BinaryReader(data)
+        return self.codec(type_name)[1](reader)
+
+    def decode_action_data(self, action, data):
+        return self.decode(self.get_action_type(action), data)
+
+
+# compiled serializers shared between clients, keyed by abi hash
+_SERIALIZERS = OrderedDict()
+_SERIALIZERS_LOCK = threading.Lock()
+SERIALIZER_CACHE_SIZE = 64
+
+
+def find_serializer(abi_hash):
+    ''' the shared AbiSerializer of the abi with abi_hash, None if it is not compiled yet '''
+    with _SERIALIZERS_LOCK:
+        serializer = _SERIALIZERS.get(abi_hash)
+        if serializer is not None:
+            _SERIALIZERS.move_to_end(abi_hash)
+        return serializer
+
+
+def get_serializer(abi, abi_hash=None):
+    '''
+    AbiSerializer for abi, reusing the already compiled one of an identical abi.
+    abi_hash is the sha256 of the binary abi (as returned by chain.get_raw_abi),
+    it is computed when not given.
+    '''
+    if abi_hash is None:
+        abi_hash = sha256(pack_abi(abi))
+    serializer = find_serializer(abi_hash)
+    if serializer is not None:
+        return serializer
+    serializer = AbiSerializer(abi)
+    with _SERIALIZERS_LOCK:
+        serializer = _SERIALIZERS.setdefault(abi_hash, serializer)
+        while len(_SERIALIZERS) > SERIALIZER_CACHE_SIZE:
+            _SERIALIZERS.popitem(last=False)
+    return serializer
+
+
+# abi of the abi itself, used to serialize the "abi" argument of eosio::setabi
+ABI_DEF = {
+    'version': 'eosio::abi/1.1',
+    'structs': [
+        {'name': 'type_def', 'base': '', 'fields': [
+            {'name': 'new_type_name', 'type': 'string'},
+            {'name': 'type', 'type': 'string'}]},
+        {'name': 'field_def', 'base': '', 'fields': [
+            {'name': 'name', 'type': 'string'},
+            {'name': 'type', 'type': 'string'}]},
+        {'name': 'struct_def', 'base': '', 'fields': [
+            {'name': 'name', 'type': 'string'},
+            {'name': 'base', 'type': 'string'},
+            {'name': 'fields', 'type': 'field_def[]'}]},
+        {'name': 'action_def', 'base': '', 'fields': [
+            {'name': 'name', 'type': 'name'},
+            {'name': 'type', 'type': 'string'},
+            {'name': 'ricardian_contract', 'type': 'string'}]},
+        {'name': 'table_def', 'base': '', 'fields': [
+            {'name': 'name', 'type': 'name'},
+            {'name': 'index_type', 'type': 'string'},
+            {'name': 'key_names', 'type': 'string[]'},
+            {'name': 'key_types', 'type': 'string[]'},
+            {'name': 'type', 'type': 'string'}]},
+        {'name': 'clause_pair', 'base': '', 'fields': [
+            {'name': 'id', 'type': 'string'},
+            {'name': 'body', 'type': 'string'}]},
+        {'name': 'error_message', 'base': '', 'fields': [
+            {'name': 'error_code', 'type': 'uint64'},
+            {'name': 'error_msg', 'type': 'string'}]},
+        {'name': 'extensions_entry', 'base': '', 'fields': [
+            {'name': 'tag', 'type': 'uint16'},
+            {'name': 'value', 'type': 'bytes'}]},
+        {'name': 'variant_def', 'base': '', 'fields': [
+            {'name': 'name', 'type': 'string'},
+            {'name': 'types', 'type': 'string[]'}]},
+        {'name': 'action_result_def', 'base': '', 'fields': [
+            {'name': 'name', 'type': 'name'},
+            {'name': 'result_type', 'type': 'string'}]},
+        {'name': 'abi_def', 'base': '', 'fields': [
+            {'name': 'version', 'type': 'string'},
+            {'name': 'types', 'type': 'type_def[]'},
+            {'name': 'structs', 'type': 'struct_def[]'},
+            {'name': 'actions', 'type': 'action_def[]'},
+            {'name': 'tables', 'type': 'table_def[]'},
+            {'name': 'ricardian_clauses', 'type': 'clause_pair[]'},
+            {'name': 'error_messages', 'type': 'error_message[]'},
+            {'name': 'abi_extensions', 'type': 'extensions_entry[]'},
+            {'name': 'variants', 'type': 'variant_def[]$'},
+            {'name': 'action_results', 'type': 'action_result_def[]$'}]},
+    ],
+}
+
+_ABI_DEF_SERIALIZER = AbiSerializer(ABI_DEF)
+# members nodeos always writes, even when the json leaves them out
+_ABI_DEFAULTS = ('types', 'structs', 'actions', 'tables', 'ricardian_clauses', 'error_messages',
+                 'abi_extensions', 'variants')
+
+
+def pack_abi(abi):
+    ''' serialize a json abi the way cleos does for eosio::setabi, returns bytes '''
+    abi = dict(abi)
+    for member in _ABI_DEFAULTS:
+        abi.setdefault(member, [])
+    # fill the optional struct/action members nodeos defaults
+    abi['structs'] = [dict({'base': ''}, **s) for s in abi['structs']]
+    abi['actions'] = [dict({'ricardian_contract': ''}, **a) for a in abi['actions']]
+    abi['tables'] = [dict({'key_names': [], 'key_types': []}, **t) for t in abi['tables']]
+    return _ABI_DEF_SERIALIZER.encode('abi_def', abi)
+
+
+def unpack_abi(data):
+    ''' deserialize a binary abi (bytes or hex) into its json form '''
+    return _ABI_DEF_SERIALIZER.decode('abi_def', data)
@@ -0,0 +1,143 @@
+#
+# action_batch.py
+#
+
+from concurrent.futures import ThreadPoolExecutor
+from .exceptions import EOSBatchPushError
+
+# per transaction limits of a batch, far below the nodeos defaults (512 KiB, 150 ms of cpu)
+DEFAULT_BATCH_MAX_BYTES = 64 * 1024
+DEFAULT_BATCH_MAX_ACTIONS = 50
+# cpu estimate of an action in us, only used when a batch has a max_cpu_us
+DEFAULT_ACTION_CPU_US = 500
+# authorization groups of a batch pushed concurrently while it is flushed
+DEFAULT_BATCH_WINDOW = 8
+
+# transaction header, action/extension counts and a signature, serialized
+_TRX_OVERHEAD_BYTES = 16 + 2 * 66
+# result of the transactions of a group after its first failed one
+_NOT_PUSHED = 'not pushed, an earlier transaction of the group failed'
+
+
+def _varuint_size(n):
+    size = 1
+    while n >= 0x80:
+        n >>= 7
+        size += 1
+    return size
+
+
+def action_size(action):
+    ''' serialized size of an action dict with hex data '''
+    data_len = len(action['data']) // 2
+    auths = len(action['authorization'])
+    return 16 + _varuint_size(auths) + 16 * auths + _varuint_size(data_len) + data_len
+
+
+class ActionBatch:
+    '''
+    Collects the actions of a contract wrapper (EOSSP8DE_NFT, EOSSP8DE_NFT_EXCHANGE,
+    EOSRandom...) instead of pushing one transaction per action, see EOSSP8DEBase.batch.
+
+    On flush the actions are grouped by their authorizations, every group is split into
+    transactions of at most max_actions actions and max_bytes serialized bytes (and
+    max_cpu_us of estimated cpu, action_cpu_us per action as a number or a dict by action
+    name). The transactions of a group are pushed one after another, each once the node
+    accepted the previous one, so actions keep their order inside a group. The first
+    failed transaction stops its group, the following ones are not pushed. Up to window
+    groups are pushed concurrently, different groups are not ordered.
+
+    Leaving the with block flushes the batch, unless the block raised. When a transaction
+    fails EOSBatchPushError is raised once every group was pushed or stopped, its results
+    hold the result of every transaction: the push result, or an 'error' entry for the
+    transactions that were not pushed.
+    '''
+
+    def __init__(self, contract, max_bytes=DEFAULT_BATCH_MAX_BYTES, max_actions=DEFAULT_BATCH_MAX_ACTIONS,
+                 max_cpu_us=None, action_cpu_us=DEFAULT_ACTION_CPU_US, window=DEFAULT_BATCH_WINDOW):
+        self._contract = contract
+        self.max_bytes = max_bytes
+        self.max_actions = max_actions
+        self.max_cpu_us = max_cpu_us
+        self.action_cpu_us = action_cpu_us
+        self.window = window
+        self.actions = []
+        self.results = []
+
+    def __enter__(self):
+        self._contract._begin_batch(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._contract._end_batch(self)
+        if exc_type is None:
+            self.flush()
+
+    def __getattr__(self, name):
+        # b.transfer(...) is the batched contract.transfer(...)
+        return getattr(self._contract, name)
+
+    def __len__(self):
+        return len(self.actions)
+
+    def add(self, action):
+        ''' queue an action dict with packed hex data '''
+        self.actions.append(action)
+
+    def _cpu(self, action):
+        if isinstance(self.action_cpu_us, dict):
+            return self.action_cpu_us.get(action['name'], DEFAULT_ACTION_CPU_US)
+        return self.action_cpu_us
+
+    def transactions(self):
+        ''' the transaction dicts the queued actions are split into '''
+        return [trx for group in self._groups() for trx in group]
+
+    def _groups(self):
+        ''' the transaction dicts of every authorization group, in order '''
+        groups = {}
+        for action in self.actions:
+            auth = tuple(sorted((a['actor'], a['permission']) for a in action['authorization']))
+            groups.setdefault(auth, []).append(action)
+        grouped = []
+        for actions in groups.values():
+            transactions = []
+            current, size, cpu = [], _TRX_OVERHEAD_BYTES, 0
+            for action in actions:
+                a_size, a_cpu = action_size(action), self._cpu(action)
+                if current and (len(current) >= self.max_actions or size + a_size > self.max_bytes or
+                                (self.max_cpu_us is not None and cpu + a_cpu > self.max_cpu_us)):
+                    transactions.append({'actions': current})
+                    current, size, cpu = [], _TRX_OVERHEAD_BYTES, 0
+                current.append(action)
+                size += a_size
+                cpu += a_cpu
+            if current:
+                transactions.append({'actions': current})
+            grouped.append(transactions)
+        return grouped
+
+    def flush(self):
+        ''' push the queued actions, returns the push result of every transaction '''
+        groups = self._groups()
+        self.actions = []
+        if not groups:
+            return []
+        ce, keyring = self._contract.ce, self._contract.keyring
+
+        def push(transactions):
+            results = []
+            for i, trx in enumerate(transactions):
+                rslt = ce.push_transactions([trx], keyring, window=1)[0]
+                results.append(rslt)
+                if 'error' in rslt:
+                    results.extend({'error': _NOT_PUSHED} for _ in transactions[i + 1:])
+                    break
+            return results
+        with ThreadPoolExecutor(max_workers=max(1, min(self.window, len(groups)))) as executor:
+            results = [rslt for group in executor.map(push, groups) for rslt in group]
+        self.results.extend(results)
+        failed = [r for r in results if 'error' in r]
+        if failed:
+            raise EOSBatchPushError('{} of {} transactions failed'.format(len(failed), len(results)), results)
+        return results
@@ -0,0 +1,328 @@
+#
+# async_cleos.py
+#
+
+import asyncio
+import functools
+import time
+from json import loads
+import requests
+from .cleos import Cleos, MAX_PUSH_TRANSACTIONS, WRITE_FUNCS, _push_error, _response_json, _with_transaction_ids
+from .dynamic_url import DynamicUrl
+from .node_pool import NodePool, is_node_failure
+from .tapos import TaposProvider, DEFAULT_TAPOS_MAX_AGE
+from .table_pager import TablePager, DEFAULT_TABLE_PAGE_SIZE
+from .abi_cache import AbiCache, DEFAULT_ABI_CACHE_SIZE, DEFAULT_ABI_CACHE_TTL
+from .keyring import Keyring
+from .utils import sha256
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+DEFAULT_POOL_SIZE = 100
+
+
+def _http_error(status, url, body):
+    ''' mirror the requests.exceptions.HTTPError raised by the blocking client '''
+    resp = requests.Response()
+    resp.status_code = status
+    resp.url = url
+    resp._content = body
+    try:
+        msg = resp.json()
+    except ValueError:
+        msg = body
+    return requests.exceptions.HTTPError('Error: {}'.format(msg), response=resp)
+
+
+class AsyncCleos(Cleos):
+    '''
+    asyncio client mirroring the Cleos API. Every get/push/abi method returns an awaitable
+    and all requests of an instance share one aiohttp connection pool, so many calls can
+    be in flight on a single event loop.
+
+    pool_size          - maximum number of open connections
+    pool_size_per_host - maximum number of open connections per host, 0 means no limit
+    keep_alive         - when False connections are closed after every request
+
+    As with Cleos, url can be a list of endpoints (or a NodePool) to enable node pool routing,
+    and tapos_max_age controls the TAPOS cache (refreshed on demand, there is no background
+    refresh for the asyncio client). abi_cache_size and abi_cache_ttl configure the AbiCache.
+
+    The rarely used administrative calls (set_abi, set_code, create_account,
+    multisig_review) run the blocking Cleos implementation in the default executor.
+    '''
+
+    def __init__(self, url='http://localhost:8888', version='v1', pool_size=DEFAULT_POOL_SIZE,
+                 pool_size_per_host=0, keep_alive=True, tapos_max_age=DEFAULT_TAPOS_MAX_AGE,
+                 abi_cache_size=DEFAULT_ABI_CACHE_SIZE, abi_cache_ttl=DEFAULT_ABI_CACHE_TTL):
+        if aiohttp is None:
+            raise ImportError('AsyncCleos requires the aiohttp package')
+        self._pool = None
+        if isinstance(url, NodePool):
+            self._pool = url
+        elif isinstance(url, (list, tuple)):
+            self._pool = NodePool(url)
+        if self._pool is not None:
+            url = self._pool.nodes[0].url
+        self._prod_url = url
+        self._version = version
+        self._pool_size = pool_size
+        self._pool_size_per_host = pool_size_per_host
+        self._keep_alive = keep_alive
+        self._http = None
+        self._sync = None
+        self._dynurl = DynamicUrl(url=self._prod_url, version=self._version)
+        self.tapos = TaposProvider(self, max_age=tapos_max_age) if tapos_max_age else None
+        self.abi_cache = AbiCache(self, maxsize=abi_cache_size, ttl=abi_cache_ttl)
+
+    def __enter__(self):
+        raise TypeError('Use "async with" with AsyncCleos')
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def close(self):
+        ''' Close the pooled HTTP connections '''
+        if self._http is not None:
+            await self._http.close()
+            self._http = None
+        if self._sync is not None:
+            self._sync.close()
+            self._sync = None
+
+    def _get_http(self):
+        # the session has to be created inside the running event loop
+        if self._http is None or self._http.closed:
+            connector = aiohttp.TCPConnector(limit=self._pool_size,
+                                             limit_per_host=self._pool_size_per_host,
+                                             force_close=not self._keep_alive)
+            self._http = aiohttp.ClientSession(connector=connector)
+        return self._http
+
+    async def _request(self, method, func, **kwargs):
+        cmd = eval('self._dynurl.{0}'.format(func))
+        if self._pool is None:
+            return await self._send(method, cmd.create_url(), **kwargs)
+        is_write = func in WRITE_FUNCS
+        error = None
+        for node in self._pool.candidates():
+            start = time.monotonic()
+            try:
+                rslt = await self._send(method, cmd.create_url(node.url), **kwargs)
+            except requests.exceptions.HTTPError as ex:
+                if not is_node_failure(ex.response.status_code, _response_json(ex.response)):
+                    self._pool.report_success(node, time.monotonic() - start)
+                    raise
+                self._pool.report_failure(node, time.monotonic() - start)
+                error = ex
+            except asyncio.TimeoutError as ex:
+                self._pool.report_failure(node, time.monotonic() - start)
+                # the node may still process a write it timed out on
+                if is_write:
+                    raise
+                error = ex
+            except aiohttp.ClientConnectionError as ex:
+                self._pool.report_failure(node)
+                error = ex
+            else:
+                self._pool.report_success(node, time.monotonic() - start)
+                return rslt
+        raise error
+
+    async def _send(self, method, url, params=None, json=None, data=None, timeout=30):
+        async with self._get_http().request(method, url, params=params, json=json, data=data,
+                                            timeout=aiohttp.ClientTimeout(total=timeout)) as r:
+            body = await r.read()
+            if r.status >= 400:
+                raise _http_error(r.status, url, body)
+            return loads(body)
+
+    def _get_sync(self):
+        if self._sync is None:
+            self._sync = Cleos(url=self._pool or self._prod_url, version=self._version)
+        return self._sync
+
+    async def _run_sync(self, func, *args, **kwargs):
+        ''' run a blocking Cleos method in the default executor '''
+        call = functools.partial(getattr(self._get_sync(), func), *args, **kwargs)
+        return await asyncio.get_running_loop().run_in_executor(None, call)
+
+    #####
+    # private functions
+    #####
+
+    async def get(self, func='', **kwargs):
+        ''' '''
+        return await self._request('GET', func, **kwargs)
+
+    async def post(self, func='', **kwargs):
+        ''' '''
+        return await self._request('POST', func, **kwargs)
+
+    #####
+    # get methods
+    #####
+
+    async def get_chain_lib_info(self, timeout=30):
+        ''' '''
+        chain_info = await self.get('chain.get_info', timeout=timeout)
+        lib_info = await self.get_block(chain_info['last_irreversible_block_num'], timeout=timeout)
+        return chain_info, lib_info
+
+    async def iter_table(self, code, scope, table, index_position='', key_type='', lower_bound='', upper_bound='',
+                         limit=None, page_size=DEFAULT_TABLE_PAGE_SIZE, reverse=False, show_payer=False,
+                         prefetch=True, timeout=30):
+        ''' async generator counterpart of Cleos.iter_table, the next page is prefetched in a task '''
+        pager = TablePager(lower_bound=lower_bound, upper_bound=upper_bound, limit=limit, page_size=page_size,
+                           reverse=reverse)
+        table_args = {'code': code, 'scope': scope, 'table': table, 'index_position': index_position,
+                      'key_type': key_type, 'reverse': reverse, 'show_payer': show_payer, 'timeout': timeout}
+
+        async def fetch(page_args):
+            start = time.monotonic()
+            rslt = await self.get_table(**dict(table_args, **page_args))
+            return rslt, time.monotonic() - start
+
+        pending = None
+        try:
+            while not pager.done:
+                if pending is None:
+                    page_args = pager.request()
+                    rslt, elapsed = await fetch(page_args)
+                else:
+                    page_args, task = pending
+                    pending = None
+                    rslt, elapsed = await task
+                rows = pager.advance(rslt, page_args['limit'], elapsed)
+                if prefetch and not pager.done:
+                    next_args = pager.request()
+                    pending = (next_args, asyncio.ensure_future(fetch(next_args)))
+                for row in rows:
+                    yield row
+        finally:
+            if pending is not None:
+                pending[1].cancel()
+
+    #####
+    # set
+    #####
+
+    async def set_abi(self, account, permission, abi_file, key, broadcast=True, timeout=30):
+        rslt = await self._run_sync('set_abi', account, permission, abi_file, key, broadcast=broadcast, timeout=timeout)
+        if broadcast:
+            self.abi_cache.invalidate(account)
+        return rslt
+
+    async def set_code(self, account, permission, code_file, key, broadcast=True, timeout=30):
+        return await self._run_sync('set_code', account, permission, code_file, key, broadcast=broadcast, timeout=timeout)
+
+    #####
+    # transactions
+    #####
+
+    async def push_transaction(self, transaction, keys, broadcast=True, compression='none', packed=False, timeout=30):
+        '''
+        parameter keys can be a list of WIF strings or EOSKey objects or a filename to key file, or a Keyring.
+        As with Cleos.push_transaction a failed push raises with the client side transaction_id.
+        '''
+        data, trx_id = await self.sign_transaction(transaction, keys, compression, packed, timeout=timeout)
+        if broadcast:
+            try:
+                return await self.post('chain.push_transaction', params=None, data=data, timeout=timeout)
+            except (requests.exceptions.RequestException, aiohttp.ClientError, asyncio.TimeoutError) as ex:
+                ex.transaction_id = trx_id
+                raise
+        return data
+
+    async def sign_transaction(self, transaction, keys, compression='none', packed=False, timeout=30):
+        ''' (chain.push_transaction body, transaction id) of the transaction signed as push_transaction does '''
+        chain_info, lib_info = await self._tapos_chain_lib_info(timeout=timeout)
+        return await self._sign_transaction_async(transaction, keys, chain_info, lib_info, compression, packed,
+                                                  timeout)
+
+    async def push_transactions(self, transactions, keys, broadcast=True, compression='none', packed=False,
+                                window=None, timeout=30):
+        ''' asyncio counterpart of Cleos.push_transactions, window bounds the pushes in flight '''
+        chain_info, lib_info = await self._tapos_chain_lib_info(timeout=timeout)
+        signed = [await self._sign_transaction_async(transaction, keys, chain_info, lib_info, compression, packed,
+                                                     timeout)
+                  for transaction in transactions]
+        bodies = [body for body, _ in signed]
+        if not broadcast:
+            return bodies
+        if window:
+            semaphore = asyncio.Semaphore(window)
+
+            async def push(body):
+                async with semaphore:
+                    return await self._push_signed(body, 'chain.push_transaction', timeout)
+
+            results = await asyncio.gather(*(push(body) for body in bodies))
+        else:
+            results = []
+            for i in range(0, len(bodies), MAX_PUSH_TRANSACTIONS):
+                chunk = bodies[i:i + MAX_PUSH_TRANSACTIONS]
+                rslt = await self._push_signed('[{}]'.format(','.join(chunk)), 'chain.push_transactions', timeout)
+                results.extend(rslt if isinstance(rslt, list) else [rslt] * len(chunk))
+        return _with_transaction_ids(results, [trx_id for _, trx_id in signed])
+
+    async def _push_signed(self, body, func, timeout=30):
+        try:
+            return await self.post(func, params=None, data=body, timeout=timeout)
+        except (requests.exceptions.RequestException, aiohttp.ClientError, asyncio.TimeoutError) as ex:
+            return _push_error(ex)
+
+    async def _tapos_chain_lib_info(self, timeout=30):
+        if self.tapos is not None:
+            if self.tapos.needs_refresh():
+                self.tapos.update(await self.get_info(timeout=timeout))
+            return self.tapos.cached_chain_lib_info()
+        return await self.get_chain_lib_info(timeout=timeout)
+
+    async def _sign_transaction_async(self, transaction, keys, chain_info, lib_info, compression='none',
+                                      packed=False, timeout=30):
+        ''' _sign_transaction awaiting Signer.sign_async of all keys concurrently '''
+        if isinstance(keys, Keyring):
+            # the keyring fetches uncached account permissions with the blocking client
+            call = functools.partial(keys.keys_for_transaction, transaction, cleos=self._get_sync(), timeout=timeout)
+            keys = await asyncio.get_running_loop().run_in_executor(None, call)
+        trx, raw, digest = self._build_transaction(transaction, chain_info, lib_info)
+        signatures = await asyncio.gather(*(key.sign_async(digest) for key in self._signers(keys)))
+        return self._signed_body(trx, raw, list(signatures), compression, packed), sha256(raw)
+
+    #####
+    # bin/json
+    #####
+
+    async def get_abi_serializer(self, acct_name, timeout=30):
+        ''' '''
+        serializer = self.abi_cache.cached(acct_name)
+        if serializer is None:
+            raw_abi = await self.get_raw_abi(acct_name, abi_hash=self.abi_cache.stale_hash(acct_name), timeout=timeout)
+            serializer = self.abi_cache.update(acct_name, raw_abi)
+        return serializer
+
+    async def pack_action_data(self, code, action, args, timeout=30):
+        ''' '''
+        serializer = await self.get_abi_serializer(code, timeout=timeout)
+        return serializer.encode_action_data(action, args).hex()
+
+    #####
+    # multisig
+    #####
+
+    async def multisig_review(self, proposer, proposal):
+        return await self._run_sync('multisig_review', proposer, proposal)
+
+    #####
+    # system functions
+    #####
+
+    async def create_account(self, *args, **kwargs):
+        return await self._run_sync('create_account', *args, **kwargs)
@@ -1,6 +1,6 @@
 import base64
 
-from .keys import EOSKey
+from .keys import generate_key_pair
 from itertools import cycle
 
 
@@ -24,7 +24,7 @@ def xor_crypt_decode(data, key = 'AwesoMePassworD129'):
     return xored
 
 def generate_dynamic_key():
-    return EOSKey().to_public()
+    return generate_key_pair()[1]
 
 if __name__ == "__main__":
     print("===== Testing XOR =====")
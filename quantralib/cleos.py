@@ -2,23 +2,116 @@
 # cleos.py
 #
 
-from .dynamic_url import DynamicUrl
+from .dynamic_url import DynamicUrl, PooledSession, DEFAULT_POOL_CONNECTIONS, DEFAULT_POOL_MAXSIZE
 from .keys import EOSKey, check_wif
+from .keyring import Keyring
 from .signer import Signer
 from .utils import sig_digest, parse_key_file, sha256
-from .types import EOSEncoder, Transaction, PackedTransaction, Abi
+from .types import EOSEncoder, Transaction, PackedTransaction
+from .abi_serializer import pack_abi
+from .abi_cache import AbiCache, DEFAULT_ABI_CACHE_SIZE, DEFAULT_ABI_CACHE_TTL
+from .node_pool import NodePool, is_node_failure
+from .tapos import TaposProvider, DEFAULT_TAPOS_MAX_AGE
+from .table_pager import TablePager, DEFAULT_TABLE_PAGE_SIZE
 from .exceptions import (EOSKeyError, EOSMsigInvalidProposal, EOSSetSameAbi, EOSSetSameCode)
 import json
+import time
+import zlib
+import requests
 from binascii import hexlify
+from concurrent.futures import ThreadPoolExecutor
+
+# calls that change chain state, they are not retried after the node may have received them
+WRITE_FUNCS = ('chain.push_transaction', 'chain.push_transactions', 'chain.send_transaction')
+# nodeos rejects chain.push_transactions calls with more transactions
+MAX_PUSH_TRANSACTIONS = 1000
+# packed_transaction compression types
+COMPRESSIONS = ('none', 'zlib')
+
+
+def _response_json(response):
+    try:
+        return response.json()
+    except ValueError:
+        return None
+
+
+def _push_error(ex):
+    ''' push result of a transaction whose push failed, nodeos errors carry an 'error' entry already '''
+    rslt = _response_json(ex.response) if getattr(ex, 'response', None) is not None else None
+    if isinstance(rslt, dict) and 'error' in rslt:
+        return rslt
+    return {'error': str(ex)}
+
+
+def _push_result_error(rslt):
+    ''' error of a failed push result, None when the transaction was accepted '''
+    if 'error' in rslt:
+        return rslt['error']
+    # chain.push_transactions reports a failed transaction in place, under processed with a zero id
+    processed = rslt.get('processed') or {}
+    if processed.get('error'):
+        return processed['error']
+    if 'transaction_id' in rslt and not rslt['transaction_id'].strip('0'):
+        return 'transaction failed'
+    return None
+
+
+def _with_transaction_ids(results, ids):
+    ''' lift the error of failed push results to the top level, with the client side transaction id '''
+    checked = []
+    for rslt, trx_id in zip(results, ids):
+        error = _push_result_error(rslt)
+        checked.append(rslt if error is None else dict(rslt, error=error, transaction_id=trx_id))
+    return checked
 
 
 class Cleos:
 
-    def __init__(self, url='http://localhost:8888', version='v1'):
-        ''' '''
+    def __init__(self, url='http://localhost:8888', version='v1', pool_connections=DEFAULT_POOL_CONNECTIONS,
+                 pool_maxsize=DEFAULT_POOL_MAXSIZE, pool_block=False, keep_alive=True,
+                 tapos_max_age=DEFAULT_TAPOS_MAX_AGE, abi_cache_size=DEFAULT_ABI_CACHE_SIZE,
+                 abi_cache_ttl=DEFAULT_ABI_CACHE_TTL):
+        '''
+        Every instance owns a pooled keep-alive HTTP session, see PooledSession for the
+        meaning of the pool_* and keep_alive parameters. Call close() (or use the instance
+        as a context manager) to release the pooled connections.
+
+        url can also be a list of endpoints (or a NodePool), in which case requests are
+        routed to the fastest healthy node and fail over to the next one.
+
+        push_transaction takes the chain_id and TAPOS reference from a TaposProvider
+        cache refreshed every tapos_max_age seconds, pass 0 to query them on every push.
+
+        Contract abis used to pack and decode action data are kept in an AbiCache of
+        abi_cache_size entries, revalidated against the chain abi_hash every abi_cache_ttl seconds.
+        '''
+        self._pool = None
+        if isinstance(url, NodePool):
+            self._pool = url
+        elif isinstance(url, (list, tuple)):
+            self._pool = NodePool(url)
+        if self._pool is not None:
+            url = self._pool.nodes[0].url
         self._prod_url = url
         self._version = version
-        self._dynurl = DynamicUrl(url=self._prod_url, version=self._version)
+        self._session = PooledSession(pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+                                      pool_block=pool_block, keep_alive=keep_alive)
+        self._dynurl = DynamicUrl(url=self._prod_url, version=self._version, session=self._session)
+        self.tapos = TaposProvider(self, max_age=tapos_max_age) if tapos_max_age else None
+        self.abi_cache = AbiCache(self, maxsize=abi_cache_size, ttl=abi_cache_ttl)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        ''' Close the pooled HTTP connections '''
+        if self.tapos is not None:
+            self.tapos.stop()
+        self._session.close()
 
     #####
     # private functions
@@ -27,15 +120,52 @@ class Cleos:
     def get(self, func='', **kwargs):
         ''' '''
         cmd = eval('self._dynurl.{0}'.format(func))
+        if self._pool is not None:
+            return self._pool_request(cmd.get_url, cmd, func, **kwargs)
         url = cmd.create_url()
         return cmd.get_url(url, **kwargs)
 
     def post(self, func='', **kwargs):
         ''' '''
         cmd = eval('self._dynurl.{0}'.format(func))
+        if self._pool is not None:
+            return self._pool_request(cmd.post_url, cmd, func, **kwargs)
         url = cmd.create_url()
         return cmd.post_url(url, **kwargs)
 
+    def _pool_request(self, request, cmd, func, **kwargs):
+        ''' send the request to the best node of the pool, failing over to the next ones '''
+        is_write = func in WRITE_FUNCS
+        error = None
+        for node in self._pool.candidates():
+            start = time.monotonic()
+            try:
+                rslt = request(cmd.create_url(node.url), **kwargs)
+            except requests.exceptions.HTTPError as ex:
+                if not is_node_failure(ex.response.status_code, _response_json(ex.response)):
+                    # a regular nodeos error, the node itself is fine
+                    self._pool.report_success(node, time.monotonic() - start)
+                    raise
+                self._pool.report_failure(node, time.monotonic() - start)
+                error = ex
+            except requests.exceptions.ReadTimeout as ex:
+                self._pool.report_failure(node, time.monotonic() - start)
+                # the node may still process a write it timed out on
+                if is_write:
+                    raise
+                error = ex
+            except requests.exceptions.ConnectionError as ex:
+                self._pool.report_failure(node)
+                error = ex
+            else:
+                self._pool.report_success(node, time.monotonic() - start)
+                return rslt
+        raise error
+
+    @property
+    def node_pool(self):
+        return self._pool
+
     #####
     # get methods
     #####
@@ -69,9 +199,12 @@ class Cleos:
         ''' '''
         return self.post('chain.get_abi', params=None, json={'account_name': acct_name}, timeout=timeout)
 
-    def get_raw_abi(self, acct_name, timeout=30):
-        ''' '''
-        return self.post('chain.get_raw_abi', params=None, json={'account_name': acct_name}, timeout=timeout)
+    def get_raw_abi(self, acct_name, abi_hash=None, timeout=30):
+        ''' the abi body is left out of the response when abi_hash matches the current abi '''
+        json = {'account_name': acct_name}
+        if abi_hash:
+            json['abi_hash'] = abi_hash
+        return self.post('chain.get_raw_abi', params=None, json=json, timeout=timeout)
 
     def get_actions(self, acct_name, pos=-1, offset=-20, timeout=30):
         '''
@@ -111,14 +244,60 @@ class Cleos:
         '''
         return self.post('history.get_transaction', params=None, json={'id': trans_id}, timeout=timeout)
 
-    def get_table(self, code, scope, table, index_position='', key_type='', lower_bound='', upper_bound='', limit=10, timeout=30):
+    def get_table(self, code, scope, table, index_position='', key_type='', lower_bound='', upper_bound='', limit=10,
+                  reverse=False, show_payer=False, timeout=30):
         '''
         POST /v1/chain/get_table_rows
         {"json":true,"code":"eosio","scope":"eosio","table":"producers","index_position":"","key_type":"name","lower_bound":"","upper_bound":"","limit":10}
         '''
         json = {"json": True, "code": code, "scope": scope, "table": table, "key_type": key_type, "index_position": index_position, "lower_bound": lower_bound, "upper_bound": upper_bound, "limit": limit}
+        if reverse:
+            json['reverse'] = True
+        if show_payer:
+            json['show_payer'] = True
         return self.post('chain.get_table_rows', params=None, json=json, timeout=timeout)
 
+    def iter_table(self, code, scope, table, index_position='', key_type='', lower_bound='', upper_bound='', limit=None,
+                   page_size=DEFAULT_TABLE_PAGE_SIZE, reverse=False, show_payer=False, prefetch=True, timeout=30):
+        '''
+        Generator over all rows of a table (at most limit rows), following the next_key
+        continuation of get_table_rows, see TablePager for the page sizing.
+        With prefetch the next page is requested in a background thread while the rows
+        of the current one are consumed, so at most two pages are held in memory.
+        '''
+        pager = TablePager(lower_bound=lower_bound, upper_bound=upper_bound, limit=limit, page_size=page_size,
+                           reverse=reverse)
+        table_args = {'code': code, 'scope': scope, 'table': table, 'index_position': index_position,
+                      'key_type': key_type, 'reverse': reverse, 'show_payer': show_payer, 'timeout': timeout}
+
+        def fetch(page_args):
+            start = time.monotonic()
+            rslt = self.get_table(**dict(table_args, **page_args))
+            return rslt, time.monotonic() - start
+
+        executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+        pending = None
+        try:
+            while not pager.done:
+                if pending is None:
+                    page_args = pager.request()
+                    rslt, elapsed = fetch(page_args)
+                else:
+                    page_args, future = pending
+                    pending = None
+                    rslt, elapsed = future.result()
+                rows = pager.advance(rslt, page_args['limit'], elapsed)
+                if executor is not None and not pager.done:
+                    next_args = pager.request()
+                    pending = (next_args, executor.submit(fetch, next_args))
+                for row in rows:
+                    yield row
+        finally:
+            if executor is not None:
+                if pending is not None:
+                    pending[1].cancel()
+                executor.shutdown(wait=False)
+
     def get_producers(self, lower_bound='', limit=50, timeout=30):
         '''
         POST /v1/chain/get_producers HTTP/1.0
@@ -131,26 +310,17 @@ class Cleos:
     #####
 
     def set_abi(self, account, permission, abi_file, key, broadcast=True, timeout=30):
-        
-        current_abi = ''
-        current_sha = ''
-        
-        account_abi = self.get_abi(account)
-        if 'abi' in account_abi:
-            current_abi = Abi(account_abi['abi'])
-            current_sha = sha256(current_abi.get_raw().encode('utf-8'))
-        
         with open(abi_file) as rf:
-            abi = json.load(rf)
-            new_abi = Abi(abi)
-            # hex_abi = hexlify(abi)
-            new_sha = sha256(new_abi.get_raw().encode('utf-8'))
+            raw_abi = pack_abi(json.load(rf))
+            new_sha = sha256(raw_abi)
+            # passing the new hash keeps nodeos from sending the current abi back
+            current_sha = self.get_raw_abi(account, abi_hash=new_sha, timeout=timeout).get('abi_hash')
             if current_sha == new_sha:
                 raise EOSSetSameAbi()
             # generate trx
             arguments = {
                 "account": account,
-                "abi": new_abi.get_raw()
+                "abi": raw_abi.hex()
             }
             payload = {
                 "account": "eosio",
@@ -161,12 +331,13 @@ class Cleos:
                 }],
             }
             # Converting payload to binary
-            data = self.abi_json_to_bin(payload['account'], payload['name'], arguments)
-            # Inserting payload binary form as "data" field in original payload
-            payload['data'] = data['binargs']
+            payload['data'] = self.pack_action_data(payload['account'], payload['name'], arguments)
             trx = {"actions": [payload]}
             sign_key = EOSKey(key)
-            return self.push_transaction(trx, sign_key, broadcast=broadcast)
+            rslt = self.push_transaction(trx, sign_key, broadcast=broadcast, compression='zlib')
+            if broadcast:
+                self.abi_cache.invalidate(account)
+            return rslt
 
     def set_code(self, account, permission, code_file, key, broadcast=True, timeout=30):
         current_sha = ''
@@ -196,43 +367,138 @@ class Cleos:
                 }],
             }
             # Converting payload to binary
-            data = self.abi_json_to_bin(payload['account'], payload['name'], arguments)
-            # Inserting payload binary form as "data" field in original payload
-            payload['data'] = data['binargs']
+            payload['data'] = self.pack_action_data(payload['account'], payload['name'], arguments)
             trx = {"actions": [payload]}
             sign_key = EOSKey(key)
-            return self.push_transaction(trx, sign_key, broadcast=broadcast)
+            return self.push_transaction(trx, sign_key, broadcast=broadcast, compression='zlib')
 
     #####
     # transactions
     #####
 
-    def push_transaction(self, transaction, keys, broadcast=True, compression='none', timeout=30):
-        ''' parameter keys can be a list of WIF strings or EOSKey objects or a filename to key file'''
-        chain_info, lib_info = self.get_chain_lib_info()
+    def push_transaction(self, transaction, keys, broadcast=True, compression='none', packed=False, timeout=30):
+        '''
+        parameter keys can be a list of WIF strings or EOSKey objects or a filename to key file,
+        or a Keyring to sign only with the keys the action authorizations require
+
+        packed sends the serialized transaction as packed_trx instead of its json form,
+        compression='zlib' sends it zlib compressed (and implies packed).
+
+        When the push fails the raised exception carries the client side transaction_id.
+        When broadcast is False the signed body is returned, sign_transaction returns it
+        together with the transaction id.
+        '''
+        data, trx_id = self.sign_transaction(transaction, keys, compression, packed, timeout=timeout)
+        if broadcast:
+            try:
+                return self.post('chain.push_transaction', params=None, data=data, timeout=timeout)
+            except requests.exceptions.RequestException as ex:
+                ex.transaction_id = trx_id
+                raise
+        return data
+
+    def sign_transaction(self, transaction, keys, compression='none', packed=False, timeout=30):
+        ''' (chain.push_transaction body, transaction id) of the transaction signed as push_transaction does '''
+        if isinstance(keys, Keyring):
+            keys = keys.keys_for_transaction(transaction, cleos=self, timeout=timeout)
+        chain_info, lib_info = self._tapos_chain_lib_info(timeout=timeout)
+        return self._sign_transaction(transaction, keys, chain_info, lib_info, compression, packed)
+
+    def push_transactions(self, transactions, keys, broadcast=True, compression='none', packed=False, window=None,
+                          timeout=30):
+        '''
+        Sign and broadcast many transactions with keys (as in push_transaction), returns a
+        result per transaction in order: the nodeos push_transaction response, or a dict
+        with an 'error' entry and the client side transaction_id for a transaction that
+        failed, so one bad transaction does not hide the others.
+
+        By default the transactions are sent in chain.push_transactions calls of up to
+        MAX_PUSH_TRANSACTIONS. With window=N they are sent as single chain.push_transaction
+        calls instead, N of them in flight at a time.
+        When broadcast is False the signed push_transaction bodies are returned.
+        compression and packed are applied to every transaction, see push_transaction.
+        '''
+        chain_info, lib_info = self._tapos_chain_lib_info(timeout=timeout)
+        bodies, ids = [], []
+        for transaction in transactions:
+            trx_keys = keys
+            if isinstance(keys, Keyring):
+                trx_keys = keys.keys_for_transaction(transaction, cleos=self, timeout=timeout)
+            body, trx_id = self._sign_transaction(transaction, trx_keys, chain_info, lib_info, compression, packed)
+            bodies.append(body)
+            ids.append(trx_id)
+        if not broadcast:
+            return bodies
+        if window:
+            with ThreadPoolExecutor(max_workers=window) as executor:
+                results = list(executor.map(lambda body: self._push_signed(body, timeout), bodies))
+        else:
+            results = []
+            for i in range(0, len(bodies), MAX_PUSH_TRANSACTIONS):
+                chunk = bodies[i:i + MAX_PUSH_TRANSACTIONS]
+                try:
+                    results.extend(self.post('chain.push_transactions', params=None,
+                                             data='[{}]'.format(','.join(chunk)), timeout=timeout))
+                except requests.exceptions.RequestException as ex:
+                    results.extend([_push_error(ex)] * len(chunk))
+        return _with_transaction_ids(results, ids)
+
+    def _push_signed(self, body, timeout=30):
+        try:
+            return self.post('chain.push_transaction', params=None, data=body, timeout=timeout)
+        except requests.exceptions.RequestException as ex:
+            return _push_error(ex)
+
+    def _tapos_chain_lib_info(self, timeout=30):
+        ''' chain info and TAPOS reference block, from the TAPOS cache when enabled '''
+        if self.tapos is not None:
+            return self.tapos.get_chain_lib_info(timeout=timeout)
+        return self.get_chain_lib_info(timeout=timeout)
+
+    def _sign_transaction(self, transaction, keys, chain_info, lib_info, compression='none', packed=False):
+        ''' build and sign the transaction, returns the json body for chain.push_transaction and the transaction id '''
+        trx, raw, digest = self._build_transaction(transaction, chain_info, lib_info)
+        signatures = [key.sign(digest) for key in self._signers(keys)]
+        return self._signed_body(trx, raw, signatures, compression, packed), sha256(raw)
+
+    @staticmethod
+    def _build_transaction(transaction, chain_info, lib_info):
+        ''' the Transaction, its serialized bytes and its signing digest '''
         trx = Transaction(transaction, chain_info, lib_info)
-        digest = sig_digest(trx.encode(), chain_info['chain_id'])
-        # sign the transaction
-        signatures = []
+        raw = trx.encode()
+        return trx, raw, sig_digest(raw, chain_info['chain_id'])
+
+    @staticmethod
+    def _signers(keys):
         if not isinstance(keys, list):
             if not isinstance(keys, Signer):
                 raise EOSKeyError('Must pass a class that extends the quantralib.Signer class')
             keys = [keys]
-
         for key in keys:
             if not isinstance(key, Signer):
                 raise EOSKeyError('Must pass a class that extends the quantralib.Signer class')
-            signatures.append(key.sign(digest))
+        return keys
+
+    @staticmethod
+    def _signed_body(trx, raw, signatures, compression='none', packed=False):
+        if compression not in COMPRESSIONS:
+            raise ValueError('Unsupported compression {}, expected one of {}'.format(compression, COMPRESSIONS))
+        if packed or compression != 'none':
+            # nodeos unpacks the binary transaction as is, the transaction id is the sha256 of raw
+            packed_trx = zlib.compress(raw) if compression == 'zlib' else raw
+            return json.dumps({
+                'signatures': signatures,
+                'compression': compression,
+                'packed_context_free_data': '',
+                'packed_trx': packed_trx.hex()
+            })
         # build final trx
         final_trx = {
             'compression': compression,
             'transaction': trx.__dict__,
             'signatures': signatures
         }
-        data = json.dumps(final_trx, cls=EOSEncoder)
-        if broadcast:
-            return self.post('chain.push_transaction', params=None, data=data, timeout=timeout)
-        return data
+        return json.dumps(final_trx, cls=EOSEncoder)
 
     def push_block(self, timeout=30):
         raise NotImplementedError
@@ -251,6 +517,14 @@ class Cleos:
         json = {'code': code, 'action': action, 'args': args}
         return self.post('chain.abi_json_to_bin', params=None, json=json, timeout=timeout)
 
+    def get_abi_serializer(self, acct_name, timeout=30):
+        ''' AbiSerializer for the contract on acct_name, served from the abi cache '''
+        return self.abi_cache.get(acct_name, timeout=timeout)
+
+    def pack_action_data(self, code, action, args, timeout=30):
+        ''' serialize action arguments locally, returns the same hex as abi_json_to_bin()['binargs'] '''
+        return self.get_abi_serializer(code, timeout=timeout).encode_action_data(action, args).hex()
+
     #####
     # create keys
     #####
@@ -326,7 +600,7 @@ class Cleos:
             "waits": []
         }
 
-        newaccount_data = self.abi_json_to_bin('eosio', 'newaccount', {'creator': creator, 'name': acct_name, 'owner': owner_auth, 'active': active_auth})
+        newaccount_data = self.pack_action_data('eosio', 'newaccount', {'creator': creator, 'name': acct_name, 'owner': owner_auth, 'active': active_auth})
         newaccount_json = {
             'account': 'eosio',
             'name': 'newaccount',
@@ -335,10 +609,10 @@ class Cleos:
                     'actor': creator,
                     'permission': permission
                 }],
-            'data': newaccount_data['binargs']
+            'data': newaccount_data
         }
         # create buyrambytes trx
-        buyram_data = self.abi_json_to_bin('eosio', 'buyrambytes', {'payer': creator, 'receiver': acct_name, 'bytes': ramkb * 1024})
+        buyram_data = self.pack_action_data('eosio', 'buyrambytes', {'payer': creator, 'receiver': acct_name, 'bytes': ramkb * 1024})
         buyram_json = {
             'account': 'eosio',
             'name': 'buyrambytes',
@@ -347,11 +621,11 @@ class Cleos:
                     'actor': creator,
                     'permission': permission
                 }],
-            'data': buyram_data['binargs']
+            'data': buyram_data
         }
         # create delegatebw
-        delegate_data = self.abi_json_to_bin('eosio', 'delegatebw',
-                                             {'from': creator, 'receiver': acct_name, 'stake_net_quantity': stake_net, 'stake_cpu_quantity': stake_cpu, 'transfer': transfer})
+        delegate_data = self.pack_action_data('eosio', 'delegatebw',
+                                              {'from': creator, 'receiver': acct_name, 'stake_net_quantity': stake_net, 'stake_cpu_quantity': stake_cpu, 'transfer': transfer})
         delegate_json = {
             'account': 'eosio',
             'name': 'delegatebw',
@@ -360,7 +634,7 @@ class Cleos:
                     'actor': creator,
                     'permission': permission
                 }],
-            'data': delegate_data['binargs']
+            'data': delegate_data
         }
 
         trx = {"actions":
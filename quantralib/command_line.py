@@ -1,9 +1,10 @@
 import argparse
 import requests
+import sys
 from .cleos import Cleos
 from .testeos import TestEos
 from .utils import parse_key_file, str2bool
-from .keys import EOSKey, Signer
+from .keys import EOSKey, Signer, generate_keys
 from .exceptions import InvalidPermissionFormat, EOSSetSameAbi, EOSSetSameCode
 import json
 
@@ -124,6 +125,11 @@ def cleos():
     group_key = create_key.add_mutually_exclusive_group(required=True)
     group_key.add_argument('--key-file', '-k', type=str, action='store', help='file to output the keys too', dest='key_file')
     group_key.add_argument('--to-console', '-c', action='store_true', help='output to the console', dest='to_console')
+    # create many EOS keys
+    create_keys = create_subparsers.add_parser('keys')
+    create_keys.add_argument('--count', '-n', type=int, action='store', required=True, help='number of keys to create', dest='count')
+    create_keys.add_argument('--out', '-o', type=str, action='store', help='file to output the keys to, the console by default', dest='out')
+    create_keys.add_argument('--workers', '-w', type=int, action='store', help='number of worker processes, all cores by default', dest='workers')
     
     # push
     push_parser = subparsers.add_parser('push')
@@ -362,9 +368,7 @@ def cleos():
                     "permission": permission,
                 }],
             }
-            data = ce.abi_json_to_bin(args.account, args.action, arguments)
-            print(data)
-            payload['data'] = data['binargs']
+            payload['data'] = ce.pack_action_data(args.account, args.action, arguments)
             print(payload)
             trx = {"actions": [payload]}
             resp = ce.push_transaction(trx, priv_keys, broadcast=args.broadcast)
@@ -387,6 +391,17 @@ def cleos():
                     wf.write(priv_key + '\n')
                     wf.write(pub_key + '\n')
                 print("Wrote keys to {}".format(args.key_file))
+        elif args.create == 'keys':
+            wf = open(args.out, 'w') if args.out else sys.stdout
+            try:
+                # written as the workers produce them, in the key file format
+                for wif, public in generate_keys(args.count, workers=args.workers):
+                    wf.write('Private key: {}\nPublic key: {}\n'.format(wif, public))
+            finally:
+                if args.out:
+                    wf.close()
+            if args.out:
+                print("Wrote {} keys to {}".format(args.count, args.out))
     # SET
     elif args.subparser == 'set':
         if args.set == 'abi':
@@ -1,15 +1,87 @@
 #
 # python library cleos
 #
+import threading
+import weakref
 import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 10
+
+
+class PooledSession:
+    ''' Keep-alive HTTP session backed by one shared urllib3 connection pool.
+
+        requests.Session objects are not safe to share between threads, so every
+        thread gets its own lightweight Session, while all of them are mounted on
+        the same HTTPAdapter and therefore reuse the same pooled connections.
+        A Session is owned by its thread and goes away with it, requests fail with
+        RuntimeError once the session was closed.
+
+        pool_connections - number of per-host pools to keep
+        pool_maxsize     - maximum number of kept-alive connections per host
+        pool_block       - block instead of opening extra connections when a host pool is exhausted
+        keep_alive       - when False every request is sent with "Connection: close"
+    '''
+
+    def __init__(self, pool_connections=DEFAULT_POOL_CONNECTIONS, pool_maxsize=DEFAULT_POOL_MAXSIZE,
+                 pool_block=False, keep_alive=True):
+        self._adapter = HTTPAdapter(pool_connections=pool_connections,
+                                    pool_maxsize=pool_maxsize,
+                                    pool_block=pool_block)
+        self._keep_alive = keep_alive
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # only tracked for close(), the thread-locals own the sessions
+        self._sessions = weakref.WeakSet()
+        self._closed = False
+
+    def _session(self):
+        if self._closed:
+            raise RuntimeError('The pooled session is closed')
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.mount('http://', self._adapter)
+            session.mount('https://', self._adapter)
+            if not self._keep_alive:
+                session.headers['Connection'] = 'close'
+            with self._lock:
+                if self._closed:
+                    raise RuntimeError('The pooled session is closed')
+                self._sessions.add(session)
+            self._local.session = session
+        return session
+
+    def get(self, url, **kwargs):
+        return self._session().get(url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self._session().post(url, **kwargs)
+
+    def close(self):
+        ''' Close every pooled connection '''
+        with self._lock:
+            sessions, self._sessions = list(self._sessions), weakref.WeakSet()
+            self._closed = True
+        for session in sessions:
+            session.close()
+        self._adapter.close()
+        self._local = threading.local()
+
+    @property
+    def closed(self):
+        return self._closed
 
 
 class DynamicUrl:
     # def __init__(self, url='http://localhost:8888', version='v1', cache=None) :
-    def __init__(self, url='http://localhost:8888', version='v1', cache=None):
+    def __init__(self, url='http://localhost:8888', version='v1', cache=None, session=None):
         self._cache = cache or []
         self._baseurl = url
         self._version = version
+        self._session = session
 
     def __getattr__(self, name):
         return self._(name)
@@ -18,28 +90,36 @@ class DynamicUrl:
         pass
 
     def _(self, name):
-        return DynamicUrl(url=self._baseurl, version=self._version, cache=self._cache + [name])
+        return DynamicUrl(url=self._baseurl, version=self._version, cache=self._cache + [name], session=self._session)
 
     def method(self):
         return self._cache
 
-    def create_url(self):
-        url_str = '{0}/{1}'.format(self._baseurl, self._version)
+    def create_url(self, baseurl=None):
+        url_str = '{0}/{1}'.format(baseurl or self._baseurl, self._version)
         for obj in self.method():
             url_str = '{0}/{1}'.format(url_str, obj)
         return url_str
 
+    def _http(self):
+        # fall back to the module level functions when no session was given
+        return self._session or requests
+
     def get_url(self, url, params=None, json=None, timeout=30):
         # get request
-        r = requests.get(url, params=params, json=json, timeout=timeout)
+        r = self._http().get(url, params=params, json=json, timeout=timeout)
         r.raise_for_status()
         return r.json()
 
     def post_url(self, url, params=None, json=None, data=None, timeout=30):
         # post request
-        r = requests.post(url, params=params, json=json, data=data, timeout=timeout)
+        r = self._http().post(url, params=params, json=json, data=data, timeout=timeout)
         try:
             r.raise_for_status()
         except:
-            raise requests.exceptions.HTTPError('Error: {}'.format(r.json()), response=r)
+            try:
+                msg = r.json()
+            except ValueError:
+                msg = r.text
+            raise requests.exceptions.HTTPError('Error: {}'.format(msg), response=r)
         return r.json()
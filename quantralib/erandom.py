@@ -13,17 +13,8 @@ class EOSRandom(EOSSP8DEBase):
 
     def check_if_generator(self, account):
         """Check if account is already registered to generate randoms"""
-        ret = False
-        r = self.ce.get_table(self.contract_account, self.contract_account, "generators")
-
-        for r in r['rows']:
-            if r.get("owner") == account:
-                ret = True
-                break
-        else:
-            ret = False
-
-        return ret
+        rows = self.ce.iter_table(self.contract_account, self.contract_account, "generators")
+        return any(r.get("owner") == account for r in rows)
 
     def get_config_table(self):
         """Get main configuration for QRandom"""
@@ -211,6 +202,7 @@ class EOSRandom(EOSSP8DEBase):
 
     def buy_random(self, account, count_values, memo=""):
         """Buy a random value for the account in QRandom system and return result"""
+        self._require_no_batch('buy_random')
         rand_price = self._get_actual_random_price(count_values)
         self.buy_random_value(account, rand_price, memo)
         return self.get_randresult(account)
@@ -50,4 +50,25 @@ class EOSSetSameAbi(Exception):
 
 class EOSIncorectContractVersion(Exception):
     ''' Raised when incorect contract version'''
-    pass
\ No newline at end of file
+    pass
+
+class EOSTablePagingError(Exception):
+    ''' Raised when the rows of a table cannot be paged through '''
+    pass
+
+class EOSRemoteSignerError(Exception):
+    ''' Raised when the signing daemon rejects or fails a request '''
+    pass
+
+class EOSBatchPushError(Exception):
+    ''' Raised when transactions of an action batch failed, results holds every push result '''
+    def __init__(self, message, results):
+        super().__init__(message)
+        self.results = results
+
+class EOSTransactionStatusError(Exception):
+    ''' Raised for a tracked transaction that expired or was included with a failed status '''
+    def __init__(self, message, trx_id, status):
+        super().__init__(message)
+        self.trx_id = trx_id
+        self.status = status
@@ -0,0 +1,103 @@
+#
+# key_codec.py
+#
+# Codec of the EOS key strings: legacy EOS... public keys and WIF private keys, and the
+# PUB_<type>_, PVT_<type>_ and SIG_<type>_ strings. Everything works on raw bytes, the
+# checksums are computed without hex round trips.
+#
+
+import hashlib
+import re
+
+# order of the public_key/signature variants
+KEY_TYPES = ('K1', 'R1', 'WA')
+WIF_VERSION = 0x80
+
+_KEY_STRING = re.compile(r'^(PUB|PVT|SIG)_([A-Z0-9]{2})_(\w+)$')
+
+B58_ALPHABET = '123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz'
+# base58 is converted two digits at a time, halving the big integer divisions
+_B58_PAIRS = [a + b for a in B58_ALPHABET for b in B58_ALPHABET]
+_B58_PAIR_VALUES = {pair: i for i, pair in enumerate(_B58_PAIRS)}
+_B58_DIGITS = {c: i for i, c in enumerate(B58_ALPHABET)}
+_B58_PAIR_BASE = 58 * 58
+
+
+def b58encode(data):
+    ''' base58 string of data, leading zero bytes are kept as leading 1s '''
+    data = bytes(data)
+    n = int.from_bytes(data, 'big')
+    out = []
+    while n:
+        n, rem = divmod(n, _B58_PAIR_BASE)
+        out.append(_B58_PAIRS[rem])
+    out.reverse()
+    return '1' * (len(data) - len(data.lstrip(b'\0'))) + ''.join(out).lstrip('1')
+
+
+def b58decode(val):
+    ''' bytes of a base58 string, raises ValueError on characters outside the alphabet '''
+    digits = val.lstrip('1')
+    try:
+        n = _B58_DIGITS[digits[0]] if len(digits) & 1 else 0
+        for i in range(len(digits) & 1, len(digits), 2):
+            n = n * _B58_PAIR_BASE + _B58_PAIR_VALUES[digits[i:i + 2]]
+    except KeyError:
+        raise ValueError('{} is not base58 encoded'.format(val))
+    return b'\0' * (len(val) - len(digits)) + n.to_bytes((n.bit_length() + 7) // 8, 'big')
+
+
+def ripemd160_checksum(data, key_type=''):
+    ''' checksum of the PUB_/PVT_/SIG_ strings, the key type is hashed along except for legacy keys '''
+    return hashlib.new('rmd160', bytes(data) + key_type.encode()).digest()[:4]
+
+
+def sha256d_checksum(data):
+    ''' checksum of WIF private keys '''
+    return hashlib.sha256(hashlib.sha256(data).digest()).digest()[:4]
+
+
+def _b58_check_decode(val, encoded, checksum):
+    raw = b58decode(encoded)
+    data, chk = raw[:-4], raw[-4:]
+    if chk != checksum(data):
+        raise ValueError('checksums do not match: {} != {}'.format(chk.hex(), checksum(data).hex()))
+    return data
+
+
+def encode_wif(secret):
+    ''' WIF string of a 32 byte K1 secret '''
+    data = bytes([WIF_VERSION]) + bytes(secret)
+    return b58encode(data + sha256d_checksum(data))
+
+
+def decode_wif(wif):
+    ''' 32 byte secret of a WIF string '''
+    data = _b58_check_decode(wif, wif, sha256d_checksum)
+    if not data or data[0] != WIF_VERSION:
+        raise ValueError('Expected version 0x80, instead got {}'.format(data[:1].hex()))
+    return data[1:]
+
+
+def encode_key_string(prefix, key_type, data):
+    ''' PUB, PVT or SIG string of key_type for the raw data, K1 public keys use the legacy EOS... form '''
+    data = bytes(data)
+    if prefix == 'PUB' and key_type == 'K1':
+        return 'EOS' + b58encode(data + ripemd160_checksum(data))
+    return '{}_{}_{}'.format(prefix, key_type, b58encode(data + ripemd160_checksum(data, key_type)))
+
+
+def decode_key_string(val, prefix):
+    '''
+    (key type, raw bytes) of a PUB, PVT or SIG string, legacy EOS... public keys and WIF
+    private keys are accepted as K1 keys. Raises ValueError on malformed strings.
+    '''
+    if prefix == 'PUB' and val.startswith('EOS'):
+        return 'K1', _b58_check_decode(val, val[3:], ripemd160_checksum)
+    if prefix == 'PVT' and not val.startswith('PVT_'):
+        return 'K1', decode_wif(val)
+    match = _KEY_STRING.match(val)
+    if not match or match.group(1) != prefix or match.group(2) not in KEY_TYPES:
+        raise ValueError('{} is not a valid key string'.format(val))
+    key_type = match.group(2)
+    return key_type, _b58_check_decode(val, match.group(3), lambda data: ripemd160_checksum(data, key_type))
@@ -0,0 +1,155 @@
+#
+# keyring.py
+#
+
+import threading
+import time
+from .key_codec import encode_key_string
+from .exceptions import EOSKeyError
+from .keys import EOSKey, _normalize_public_key
+from .signer import Signer
+
+# how long account permissions fetched with chain.get_account are trusted
+DEFAULT_ACCOUNT_CACHE_TTL = 300
+# nodeos default max_authority_depth
+MAX_AUTHORITY_DEPTH = 6
+
+
+def public_key_of(key):
+    ''' public key string of a Signer in the form nodeos reports it (EOS... or PUB_R1_...) '''
+    if isinstance(key, EOSKey):
+        return encode_key_string('PUB', key._key_type, key._compressed())
+    return _normalize_public_key(key.to_public())
+
+
+class Keyring:
+    '''
+    Private keys parsed once and indexed by public key.
+
+    keys_for() picks the keys an authorization list actually needs, from the account
+    permissions fetched with chain.get_account and cached for account_cache_ttl seconds.
+    A Keyring can be passed as the keys of Cleos.push_transaction, the transaction is then
+    signed only with the keys its action authorizations require.
+
+    keys  - EOSKey/Signer objects or private key strings
+    cleos - client used to fetch account permissions, Cleos.push_transaction passes itself
+    '''
+
+    def __init__(self, keys=(), cleos=None, account_cache_ttl=DEFAULT_ACCOUNT_CACHE_TTL, clock=time.monotonic):
+        self._cleos = cleos
+        self._ttl = account_cache_ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._keys = {}
+        self._accounts = {}
+        for key in keys:
+            self.add(key)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, public_key):
+        return _normalize_public_key(public_key) in self._keys
+
+    def __iter__(self):
+        return iter(list(self._keys.values()))
+
+    def add(self, key):
+        ''' add a private key string or Signer, returns the Signer '''
+        if isinstance(key, str):
+            key = EOSKey(key)
+        elif not isinstance(key, Signer):
+            raise EOSKeyError('Must pass a class that extends the quantralib.Signer class')
+        return self._keys.setdefault(public_key_of(key), key)
+
+    def get(self, public_key):
+        ''' the Signer of public_key, None when the key is not in the keyring '''
+        return self._keys.get(_normalize_public_key(public_key))
+
+    def public_keys(self):
+        return list(self._keys)
+
+    #####
+    # account permissions
+    #####
+
+    def permissions(self, account, cleos=None, timeout=30):
+        ''' {perm_name: permission} of account from chain.get_account, served from the cache '''
+        with self._lock:
+            entry = self._accounts.get(account)
+            if entry is not None and self._clock() - entry[1] <= self._ttl:
+                return entry[0]
+        cleos = cleos or self._cleos
+        if cleos is None:
+            raise EOSKeyError('The keyring needs a Cleos instance to fetch the permissions of {}'.format(account))
+        info = cleos.get_account(account, timeout=timeout)
+        perms = {perm['perm_name']: perm for perm in info.get('permissions', [])}
+        with self._lock:
+            self._accounts[account] = (perms, self._clock())
+        return perms
+
+    def invalidate(self, account=None):
+        ''' drop the cached permissions of account, or all of them, e.g. after an updateauth '''
+        with self._lock:
+            if account is None:
+                self._accounts.clear()
+            else:
+                self._accounts.pop(account, None)
+
+    #####
+    # key selection
+    #####
+
+    def _satisfy(self, actor, permission, cleos, timeout, depth=0):
+        '''
+        public keys of the keyring satisfying the authority of actor@permission itself,
+        None when the keyring can not satisfy it. As in nodeos the keys of a parent
+        permission (owner for active) do not satisfy a declared child permission.
+        '''
+        if depth > MAX_AUTHORITY_DEPTH:
+            return None
+        perm = self.permissions(actor, cleos=cleos, timeout=timeout).get(permission)
+        if perm is None:
+            return None
+        return self._satisfy_authority(perm['required_auth'], cleos, timeout, depth)
+
+    def _satisfy_authority(self, auth, cleos, timeout, depth):
+        threshold = auth['threshold']
+        weight = 0
+        selected = []
+        # heaviest keys first, so few signatures reach the threshold
+        for key_weight in sorted(auth.get('keys', []), key=lambda kw: -kw['weight']):
+            public_key = _normalize_public_key(key_weight['key'])
+            if public_key in self._keys and public_key not in selected:
+                selected.append(public_key)
+                weight += key_weight['weight']
+                if weight >= threshold:
+                    return selected
+        for account_weight in sorted(auth.get('accounts', []), key=lambda aw: -aw['weight']):
+            level = account_weight['permission']
+            keys = self._satisfy(level['actor'], level['permission'], cleos, timeout, depth + 1)
+            if keys is not None:
+                selected.extend(key for key in keys if key not in selected)
+                weight += account_weight['weight']
+                if weight >= threshold:
+                    return selected
+        return None
+
+    def keys_for(self, authorizations, cleos=None, timeout=30):
+        '''
+        Signers needed for the authorizations, a list of {'actor', 'permission'} dicts.
+        When the keyring can not satisfy one of them it returns all of its keys, so nodeos
+        reports the missing authority as it did before.
+        '''
+        selected = []
+        for auth in authorizations:
+            keys = self._satisfy(auth['actor'], auth['permission'], cleos, timeout)
+            if keys is None:
+                return list(self)
+            selected.extend(key for key in keys if key not in selected)
+        return [self._keys[key] for key in selected]
+
+    def keys_for_transaction(self, transaction, cleos=None, timeout=30):
+        ''' Signers needed by the authorizations of all actions of the transaction dict '''
+        authorizations = [auth for action in transaction.get('actions', []) for auth in action.get('authorization', [])]
+        return self.keys_for(authorizations, cleos=cleos, timeout=timeout)
@@ -1,14 +1,16 @@
-import base58
 import os
 import ecdsa
-import re
 from binascii import hexlify, unhexlify
-from .utils import sha256, ripemd160, int_to_hex
+from .utils import sha256
 from .signer import Signer
-import hashlib
-import struct
-import array
+from .exceptions import EOSKeyError
+from .sign_backend import COMPACT_HEADER, compress_point, get_backend, is_canonical, PythonBackend
+from .key_codec import decode_key_string, encode_key_string, encode_wif
+import functools
 import subprocess
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 
 
 CHIP_KEY_CONVERTER_JAR="/usr/share/java/ChipKeyConverter.jar"
@@ -19,6 +21,14 @@ def get_curve(key_type) :
         return ecdsa.NIST256p
     return ecdsa.SECP256k1
 
+def _key_backend(key_type, backend=None):
+    ''' backend (name, instance or None for the default) able to handle key_type '''
+    if backend is None or isinstance(backend, str):
+        backend = get_backend(backend)
+    if key_type not in backend.key_types:
+        backend = get_backend(PythonBackend.name)
+    return backend
+
 def check_wif(key) :
     if isinstance(key, str) :
         try :
@@ -28,60 +38,104 @@ def check_wif(key) :
             pass
     return False
 
-def pubkey_to_eospubkey(pub_key):
-    '''Converts ecdsa pub_key to the relevant EOS public key'''
+def _java_convert(*args):
+    res = subprocess.run(['java', '-jar', CHIP_KEY_CONVERTER_JAR] + list(args), stdout=subprocess.PIPE, check=True)
+    return res.stdout.decode().strip()
 
-    cmd = f"java -jar {CHIP_KEY_CONVERTER_JAR} -m key -k {pub_key}"
-    res = subprocess.run(cmd, shell=True, stdout=subprocess.PIPE, check=True)
-    pub_key = res.stdout.decode().strip()
 
-    return pub_key
+def _chip_verifying_key(pub_key):
+    ''' ecdsa R1 verifying key from a hex chip public key: compressed, uncompressed, raw x|y or DER '''
+    data = unhexlify(pub_key)
+    if data[:1] == b'\x30':
+        return ecdsa.VerifyingKey.from_der(data)
+    return ecdsa.VerifyingKey.from_string(data, curve=ecdsa.NIST256p)
 
-def sig_to_eossig(ecdsa_signature, ecdsa_pubkey, data):
-    '''Converts ecdsa signature to eos signature'''
 
-    cmd = f"java -jar {CHIP_KEY_CONVERTER_JAR} -m sign -k {ecdsa_pubkey} -s {ecdsa_signature} -d {data}"
-    res = subprocess.run(cmd, shell=True, stdout=subprocess.PIPE, check=True)
-    eos_sig = res.stdout.decode().strip()
+def _compressed_r1(vk):
+    point = vk.pubkey.point
+    return compress_point(point.x(), point.y())
+
+
+def _chip_fallback(convert, java_args):
+    ''' run the native conversion, falling back to the ChipKeyConverter jar on input it can not parse '''
+    try:
+        return convert()
+    except (ValueError, ecdsa.der.UnexpectedDER, ecdsa.MalformedPointError):
+        if not os.path.exists(CHIP_KEY_CONVERTER_JAR):
+            raise
+    return _java_convert(*java_args)
+
 
-    return eos_sig
+def pubkey_to_eospubkey(pub_key):
+    '''Converts ecdsa pub_key to the relevant EOS public key
+
+    pub_key is the hex R1 public key of the chip, compressed, uncompressed or DER encoded.
+    The ChipKeyConverter jar is only used when installed and the key can not be parsed.
+    '''
+    def convert():
+        return encode_key_string('PUB', 'R1', _compressed_r1(_chip_verifying_key(pub_key)))
+
+    return _chip_fallback(convert, ['-m', 'key', '-k', pub_key])
+
+
+def sig_to_eossig(ecdsa_signature, ecdsa_pubkey, data):
+    '''Converts ecdsa signature to eos signature
+
+    ecdsa_signature is the hex DER (or raw r|s) signature the chip made of the hex sha256
+    digest data with the key ecdsa_pubkey. s is normalized to the lower half of the order
+    and the recovery id is the one that recovers ecdsa_pubkey.
+    '''
+    def convert():
+        curve = ecdsa.NIST256p
+        order = curve.order
+        raw_sig = unhexlify(ecdsa_signature)
+        if raw_sig[:1] == b'\x30':
+            r, s = ecdsa.util.sigdecode_der(raw_sig, order)
+        else:
+            r, s = ecdsa.util.sigdecode_string(raw_sig, order)
+        if s > order // 2:
+            s = order - s
+        digest = unhexlify(data)
+        public = _compressed_r1(_chip_verifying_key(ecdsa_pubkey))
+        rs = r.to_bytes(32, 'big') + s.to_bytes(32, 'big')
+        backend = get_backend(PythonBackend.name)
+        for recid in range(4):
+            compact = bytes([COMPACT_HEADER + recid]) + rs
+            if backend.recover(curve, digest, compact) == public:
+                return encode_key_string('SIG', 'R1', compact)
+        raise ValueError('The signature does not match the public key {}'.format(ecdsa_pubkey))
+
+    return _chip_fallback(convert, ['-m', 'sign', '-k', ecdsa_pubkey, '-s', ecdsa_signature, '-d', data])
 
 
 class EOSKey(Signer):
-    def __init__(self, private_str=''):
-        ''' '''
+    def __init__(self, private_str='', backend=None):
+        '''
+        backend selects the signing backend by name or instance (see sign_backend),
+        by default libsecp256k1 is used for K1 keys when coincurve is installed.
+        '''
+        self._backend = get_backend(backend) if isinstance(backend, str) else backend
         if private_str:
             private_key, format, key_type = self._parse_key(private_str)
             self._key_type = key_type
             self._curve = get_curve(key_type)
-            self._sk = ecdsa.SigningKey.from_string(unhexlify(private_key), curve=self._curve)
+            self._sk = ecdsa.SigningKey.from_string(private_key, curve=self._curve)
         else :
             prng = self._create_entropy()
             self._key_type = 'K1'
             self._curve = get_curve(self._key_type)
             self._sk = ecdsa.SigningKey.generate(curve=self._curve, entropy=prng)
         self._vk = self._sk.get_verifying_key()
+        self._public = None
+        self._public_bytes = None
 
     def __str__(self):
         return self.to_public()
 
     def _parse_key(self, private_str):
-        ''' '''
-        match = re.search('^PVT_([A-Za-z0-9]+)_([A-Za-z0-9]+)$', private_str)
-        if not match:
-            # legacy WIF - format
-            version_key = self._check_decode(private_str, 'sha256x2')
-            # ensure first 2 chars == 0x80
-            version = int(version_key[0:2], 16)
-            if not version == 0x80:
-                raise ValueError('Expected version 0x80, instead got {0}', version)
-            private_key = version_key[2:]
-            key_type = 'K1'
-            format = 'WIF'
-        else:
-            key_type, key_string = match.groups()
-            private_key = self._check_decode(key_string, key_type)
-            format = 'PVT'
+        ''' (32 byte secret, format, key type) of a WIF or PVT_ private key string '''
+        key_type, private_key = decode_key_string(private_str, 'PVT')
+        format = 'PVT' if private_str.startswith('PVT_') else 'WIF'
         return (private_key, format, key_type)
 
     def _create_entropy(self):
@@ -90,39 +144,6 @@ class EOSKey(Signer):
         seed = sha256(ba)
         return ecdsa.util.PRNG(seed)
 
-    def _check_encode(self, key_buffer, key_type=None):
-        '''    '''
-        if isinstance(key_buffer, bytes):
-            key_buffer = key_buffer.decode()
-        check = key_buffer
-        if key_type == 'sha256x2':
-            first_sha = sha256(unhexlify(check))
-            chksum = sha256(unhexlify(first_sha))[:8]
-        else:
-            if key_type:
-                check += hexlify(bytearray(key_type, 'utf-8')).decode()
-            chksum = ripemd160(unhexlify(check))[:8]
-        return base58.b58encode(unhexlify(key_buffer + chksum))
-
-    def _check_decode(self, key_string, key_type=None):
-        '''    '''
-        buffer = hexlify(base58.b58decode(key_string)).decode()
-        chksum = buffer[-8:]
-        key = buffer[:-8]
-        if key_type == 'sha256x2':
-            # legacy
-            first_sha = sha256(unhexlify(key))
-            newChk = sha256(unhexlify(first_sha))[:8]
-        else:
-            check = key
-            if key_type:
-                check += hexlify(bytearray(key_type, 'utf-8')).decode()
-            newChk = ripemd160(unhexlify(check))[:8]
-        #print('newChk: '+newChk)
-        if chksum != newChk:
-            raise ValueError('checksums do not match: {0} != {1}'.format(chksum, newChk))
-        return key
-
     def _recover_key(self, digest, signature, i):
         return self.recover_key(self._curve, digest, signature, i)
 
@@ -167,10 +188,14 @@ class EOSKey(Signer):
 
     def _compress_pubkey(self):
         ''' '''
-        order = self._sk.curve.generator.order()
-        p = self._vk.pubkey.point
+        return hexlify(self._compressed()).decode()
 
-        return self.do_compress_pubkey(order, p)
+    def _compressed(self):
+        ''' 33 byte compressed public key, computed once '''
+        if self._public_bytes is None:
+            p = self._vk.pubkey.point
+            self._public_bytes = compress_point(p.x(), p.y())
+        return self._public_bytes
 
     @staticmethod
     def do_compress_pubkey(order, p):
@@ -181,22 +206,28 @@ class EOSKey(Signer):
         return compressed
 
     def _is_canonical(self, sig):
-        print("sig: " + str(sig))
-        t1 = (sig[1] & 0x80) == 0
-        t2 = not (sig[1] == 0 and ((sig[2] & 0x80) == 0))
-        t3 = (sig[33] & 0x80) == 0
-        t4 = not (sig[33] == 0 and ((sig[34] & 0x80) == 0))
-        return t1 and t2 and t3 and t4
+        return is_canonical(sig)
+
+    def _get_backend(self):
+        ''' signing backend of this key, R1 keys always use the pure python one '''
+        return _key_backend(self._key_type, self._backend)
 
     def to_public(self):
         ''' '''
-        cmp = self._compress_pubkey()
-        return 'EOS' + self._check_encode(cmp).decode()
+        if self._public is None:
+            # the legacy EOS... form, for R1 keys too
+            self._public = encode_key_string('PUB', 'K1', self._compressed())
+        return self._public
 
     def to_wif(self):
         ''' '''
-        pri_key = '80' + hexlify(self._sk.to_string()).decode()
-        return self._check_encode(pri_key, 'sha256x2').decode()
+        return encode_wif(self._sk.to_string())
+
+    def to_private_string(self):
+        ''' private key string that keeps the key type, WIF for K1 keys and PVT_R1_ for R1 keys '''
+        if self._key_type == 'K1':
+            return self.to_wif()
+        return encode_key_string('PVT', self._key_type, self._sk.to_string())
 
     def sign_string(self, data, encoding="utf-8"):
         ''' '''
@@ -205,74 +236,311 @@ class EOSKey(Signer):
 
     def sign(self, digest):
         ''' '''
-        cnt = 0
         # convert digest to hex string
         digest = unhexlify(digest)
         if len(digest) != 32:
             raise ValueError("32 byte buffer required")
-        while 1:
-            # get deterministic k
-            if cnt:
-                sha_digest = hashlib.sha256(digest + bytearray(cnt)).digest()
-            else:
-                sha_digest = hashlib.sha256(digest).digest()
-            k = ecdsa.rfc6979.generate_k(self._sk.curve.generator.order(),
-                                         self._sk.privkey.secret_multiplier,
-                                         hashlib.sha256,
-                                         #   hashlib.sha256(digest + struct.pack('d', time.time())).digest() # use time to randomize
-                                         sha_digest
-                                         )
-            # sign the message
-            sigder = self._sk.sign_digest(digest, sigencode=ecdsa.util.sigencode_der, k=k)
-
-            # reformat sig
-            r, s = ecdsa.util.sigdecode_der(sigder, self._sk.curve.generator.order())
-            sig = ecdsa.util.sigencode_string(r, s, self._sk.curve.generator.order())
-
-            sigder = array.array('B', sigder)
-            # ensure signature is canonical
-            lenR = sigder[3]
-            lenS = sigder[5 + lenR]
-
-            if lenR == 32 and lenS == 32:
-                # derive recover parameter
-                i = self._recovery_pubkey_param(digest, sig)
-                # compact
-                i += 27
-                # compressed
-                i += 4
-                sigstr = struct.pack('<B', i) + sig
-                break
-                # if self._is_canonical(sigstr):
-                #     break    
-            cnt += 1
-            if not cnt % 10 :
-                print('Still searching for a signature. Tried {} times.'.format(cnt))        
-        # encode
-        return 'SIG_' + self._key_type + '_' + self._check_encode(hexlify(sigstr), self._key_type).decode()
+        sigstr = self._get_backend().sign(self, digest)
+        return encode_key_string('SIG', self._key_type, sigstr)
 
     def verify(self, encoded_sig, digest):
         ''' '''
-        # remove SIG_ prefix
-        encoded_sig = encoded_sig[4:]
-        # remove curve prefix
-        curvePre = encoded_sig[:3].strip('_')
+        curvePre, decoded_sig = decode_key_string(encoded_sig, 'SIG')
         if curvePre != self._key_type :
             raise TypeError('Unsupported curve prefix {}'.format(curvePre))
 
-        decoded_sig = self._check_decode(encoded_sig[3:], curvePre)
-        ret = self._check_encode(decoded_sig, curvePre)
-        # first 2 bytes are recover param
-        # recover_param = hex_to_int(decoded_sig[:2]) - 4 - 27
-        # use sig
-        sig = decoded_sig[2:]
-
-        # verify sig by recovering the key and comparing to self._vk
-        # p = self._recover_key(unhexlify(digest), unhexlify(sig), recover_param)
-        # return self._vk.verify_digest(unhexlify(sig), unhexlify(digest), sigdecode=ecdsa.util.sigdecode_string)
-        # return p.to_string() == self._vk.to_string()
-        try:
-            self._vk.verify_digest(unhexlify(sig), unhexlify(digest), sigdecode=ecdsa.util.sigdecode_string)
-        except ecdsa.keys.BadSignatureError:
-            return False
-        return True
+        # first byte is the recover param, the signature is valid when it recovers our key
+        recovered = self._get_backend().recover(self._curve, unhexlify(digest), decoded_sig)
+        return recovered == self._compressed()
+
+
+def recover_public_key(signature, digest, backend=None):
+    '''
+    public key string (EOS... or PUB_R1_...) that produced the SIG_ string signature over
+    the hex digest, None when the signature is malformed or does not recover a key
+    '''
+    try:
+        key_type, compact = decode_key_string(signature, 'SIG')
+    except ValueError:
+        return None
+    digest = unhexlify(digest) if isinstance(digest, str) else bytes(digest)
+    if key_type == 'WA' or len(compact) != 65 or len(digest) != 32:
+        return None
+    public = _key_backend(key_type, backend).recover(get_curve(key_type), digest, compact)
+    if public is None:
+        return None
+    return encode_key_string('PUB', key_type, public)
+
+
+def _normalize_public_key(public_key):
+    ''' EOS... and PUB_K1_... spell the same key, None for an invalid key string '''
+    try:
+        return encode_key_string('PUB', *decode_key_string(public_key, 'PUB'))
+    except ValueError:
+        return None
+
+
+#####
+# key generation
+#####
+
+# keys generated per task of the generate_keys process pool
+KEYGEN_CHUNK_SIZE = 500
+
+
+def generate_key_pair(backend=None):
+    ''' new K1 key pair as a (WIF, EOS public key) tuple, without building an EOSKey '''
+    order = ecdsa.SECP256k1.order
+    while True:
+        secret = os.urandom(32)
+        if 0 < int.from_bytes(secret, 'big') < order:
+            break
+    public = _key_backend('K1', backend).public_key(ecdsa.SECP256k1, secret)
+    return encode_wif(secret), encode_key_string('PUB', 'K1', public)
+
+
+def _generate_chunk(count, backend=None):
+    return [generate_key_pair(backend) for _ in range(count)]
+
+
+def generate_keys(n, workers=None, backend=None):
+    '''
+    Generate n K1 key pairs on a pool of worker processes, yields (WIF, EOS public key)
+    tuples as the workers produce them, so large batches can be written incrementally.
+    workers defaults to os.cpu_count(), one worker generates in this process.
+
+    Only two chunks per worker are in flight, the next one is submitted as a finished
+    one is yielded, so memory stays bounded with a slow consumer and closing the
+    generator early cancels the chunks not started yet.
+    '''
+    workers = workers or os.cpu_count() or 1
+    backend = backend or get_backend().name
+    chunks = [min(KEYGEN_CHUNK_SIZE, n - i) for i in range(0, n, KEYGEN_CHUNK_SIZE)]
+    if workers == 1 or len(chunks) < 2:
+        for count in chunks:
+            yield from _generate_chunk(count, backend)
+        return
+    pool = ProcessPoolExecutor(max_workers=workers)
+    pending = deque()
+    try:
+        for count in chunks:
+            pending.append(pool.submit(_generate_chunk, count, backend))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+
+#####
+# batch signing
+#####
+
+# keys of a BatchSigner worker process, loaded once by _init_sign_worker
+_worker_keys = None
+
+
+def _init_sign_worker(private_strs, backend):
+    global _worker_keys
+    _worker_keys = [EOSKey(private_str, backend=backend) for private_str in private_strs]
+
+
+def _sign_chunk(digests, indices=None):
+    keys = _worker_keys if indices is None else [_worker_keys[i] for i in indices]
+    return [[key.sign(digest) for key in keys] for digest in digests]
+
+
+def _sign_tasks(tasks):
+    ''' signatures of (digest, key indices) tasks '''
+    return [[_worker_keys[i].sign(digest) for i in indices] for digest, indices in tasks]
+
+
+def _chunks(items, workers):
+    ''' a few chunks per worker amortize the IPC and still balance the load '''
+    size = max(1, -(-len(items) // (workers * 4)))
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def _load_key(key):
+    if isinstance(key, EOSKey):
+        return key
+    if isinstance(key, str):
+        return EOSKey(key)
+    raise TypeError('Batch signing needs EOSKey objects or private key strings, got {}'.format(type(key)))
+
+
+class BatchSigner:
+    '''
+    Signs many digests with the same keys on a pool of worker processes.
+    Every worker loads the keys once when it starts, tasks only carry digests.
+
+    keys    - an EOSKey or private key string, or a list of them
+    workers - number of worker processes, os.cpu_count() by default
+    backend - signing backend name used by the workers, the process default by default
+    '''
+
+    def __init__(self, keys, workers=None, backend=None):
+        self._single = not isinstance(keys, (list, tuple))
+        self._keys = [_load_key(key) for key in ([keys] if self._single else keys)]
+        self._index = {encode_key_string('PUB', key._key_type, key._compressed()): i
+                       for i, key in enumerate(self._keys)}
+        self._workers = workers or os.cpu_count() or 1
+        self._backend = backend or get_backend().name
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def public_keys(self):
+        ''' public keys of the signer keys in order, EOS... for K1 and PUB_R1_... for R1 keys '''
+        return list(self._index)
+
+    def close(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self._workers, initializer=_init_sign_worker,
+                                                 initargs=([key.to_private_string() for key in self._keys],
+                                                           self._backend))
+            return self._pool
+
+    def _indices(self, public_keys):
+        indices = []
+        for public_key in public_keys:
+            index = self._index.get(_normalize_public_key(public_key))
+            if index is None:
+                raise EOSKeyError('No private key for {}'.format(public_key))
+            indices.append(index)
+        return indices
+
+    def sign(self, digests, public_keys=None):
+        '''
+        Sign the hex digests, returns their signatures in order: a signature per digest for a
+        single key, or a list with the signature of every key per digest. public_keys
+        restricts signing to those keys, the lists then follow their order.
+        '''
+        digests = list(digests)
+        indices = None if public_keys is None else self._indices(public_keys)
+        if self._workers == 1 or len(digests) < 2:
+            keys = self._keys if indices is None else [self._keys[i] for i in indices]
+            signed = [[key.sign(digest) for key in keys] for digest in digests]
+        else:
+            func = functools.partial(_sign_chunk, indices=indices)
+            chunks = self._get_pool().map(func, _chunks(digests, self._workers))
+            signed = [sigs for chunk in chunks for sigs in chunk]
+        if self._single and public_keys is None:
+            return [sigs[0] for sigs in signed]
+        return signed
+
+    def sign_requests(self, requests):
+        '''
+        Sign several (digests, public_keys) requests together, spread over the workers pool
+        whatever their size. Returns per request the list with the signature of every
+        requested key per digest, or the EOSKeyError of a request naming a key the signer
+        does not hold, the other requests are still signed.
+        '''
+        results, tasks, owners = [], [], []
+        for n, (digests, public_keys) in enumerate(requests):
+            try:
+                indices = self._indices(public_keys)
+            except EOSKeyError as ex:
+                results.append(ex)
+                continue
+            results.append([])
+            for digest in digests:
+                tasks.append((digest, indices))
+                owners.append(n)
+        if self._workers == 1:
+            signed = [[self._keys[i].sign(digest) for i in indices] for digest, indices in tasks]
+        else:
+            chunks = self._get_pool().map(_sign_tasks, _chunks(tasks, self._workers))
+            signed = [sigs for chunk in chunks for sigs in chunk]
+        for n, sigs in zip(owners, signed):
+            results[n].append(sigs)
+        return results
+
+
+def sign_batch(digests, keys, workers=None, backend=None):
+    ''' sign the hex digests on a temporary BatchSigner process pool, see BatchSigner.sign '''
+    with BatchSigner(keys, workers=workers, backend=backend) as signer:
+        return signer.sign(digests)
+
+
+#####
+# batch verification
+#####
+
+def _recover_chunk(pairs, backend):
+    return [recover_public_key(signature, digest, backend) for signature, digest in pairs]
+
+
+class BatchVerifier:
+    '''
+    Recovers the public keys of many signatures on a pool of worker processes, used to
+    audit signed actions offline.
+
+    workers - number of worker processes, os.cpu_count() by default
+    backend - backend name used for the recovery, the process default by default
+    '''
+
+    def __init__(self, workers=None, backend=None):
+        self._workers = workers or os.cpu_count() or 1
+        self._backend = backend or get_backend().name
+        self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def _get_pool(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self._workers)
+        return self._pool
+
+    def recover(self, pairs):
+        '''
+        Public key strings of the (SIG_ string, hex digest) pairs in order, None for a
+        signature that is malformed or does not recover a key.
+        '''
+        pairs = [tuple(pair) for pair in pairs]
+        if self._workers == 1 or len(pairs) < 2:
+            return _recover_chunk(pairs, self._backend)
+        func = functools.partial(_recover_chunk, backend=self._backend)
+        return [key for chunk in self._get_pool().map(func, _chunks(pairs, self._workers)) for key in chunk]
+
+    def verify(self, items):
+        ''' whether each (SIG_ string, hex digest, public key string) was signed by that key '''
+        items = list(items)
+        recovered = self.recover((signature, digest) for signature, digest, _ in items)
+        return [key is not None and key == _normalize_public_key(public_key)
+                for key, (_, _, public_key) in zip(recovered, items)]
+
+
+def recover_batch(pairs, workers=None, backend=None):
+    ''' recover the public keys on a temporary BatchVerifier process pool, see BatchVerifier.recover '''
+    with BatchVerifier(workers=workers, backend=backend) as verifier:
+        return verifier.recover(pairs)
+
+
+def verify_batch(items, workers=None, backend=None):
+    ''' verify the signatures on a temporary BatchVerifier process pool, see BatchVerifier.verify '''
+    with BatchVerifier(workers=workers, backend=backend) as verifier:
+        return verifier.verify(items)
@@ -0,0 +1,111 @@
+#
+# node_pool.py
+#
+
+import threading
+import time
+
+DEFAULT_EWMA_ALPHA = 0.3
+DEFAULT_BACKOFF = 1.0
+DEFAULT_MAX_BACKOFF = 60.0
+# statuses returned by proxies in front of a nodeos that is down or lagging
+NODE_FAILURE_STATUS = (502, 503, 504)
+
+
+def is_node_failure(status_code, body):
+    ''' nodeos reports request and contract errors as a 500 with a json error body,
+        those say nothing about the health of the node '''
+    if status_code < 500:
+        return False
+    if status_code in NODE_FAILURE_STATUS:
+        return True
+    return not (isinstance(body, dict) and 'error' in body)
+
+
+class Node:
+    def __init__(self, url):
+        self.url = url.rstrip('/')
+        # EWMA of the request latency in seconds, None until the first answer
+        self.latency = None
+        # EWMA of the failure ratio
+        self.error_rate = 0.0
+        # consecutive failures, drives the ejection backoff
+        self.failures = 0
+        self.ejected_until = 0.0
+
+    def __repr__(self):
+        return 'Node({}, latency={}, error_rate={:.3f}, failures={})'.format(self.url, self.latency, self.error_rate,
+                                                                            self.failures)
+
+    def is_healthy(self, now):
+        return self.ejected_until <= now
+
+    def score(self):
+        ''' lower is better, nodes that were never measured are probed first '''
+        return (self.latency or 0.0) * (1.0 + self.error_rate)
+
+
+class NodePool:
+    '''
+    Set of equivalent nodeos endpoints with a live latency/error EWMA per node.
+
+    Requests go to the healthy node with the best score. A node that fails is
+    ejected for backoff * 2 ** (failures - 1) seconds (capped at max_backoff)
+    and gets back into rotation once that time has passed.
+    '''
+
+    def __init__(self, urls, alpha=DEFAULT_EWMA_ALPHA, backoff=DEFAULT_BACKOFF, max_backoff=DEFAULT_MAX_BACKOFF,
+                 clock=time.monotonic):
+        if isinstance(urls, str):
+            urls = [urls]
+        if not urls:
+            raise ValueError('NodePool needs at least one endpoint')
+        self.nodes = [Node(url) for url in urls]
+        self._alpha = alpha
+        self._backoff = backoff
+        self._max_backoff = max_backoff
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    def _ewma(self, current, value):
+        if current is None:
+            return value
+        return self._alpha * value + (1.0 - self._alpha) * current
+
+    def candidates(self):
+        ''' nodes in the order they should be tried: healthy ones by score,
+            then the ejected ones by the time they come back '''
+        now = self._clock()
+        with self._lock:
+            healthy = [n for n in self.nodes if n.is_healthy(now)]
+            ejected = [n for n in self.nodes if not n.is_healthy(now)]
+            healthy.sort(key=lambda n: n.score())
+            ejected.sort(key=lambda n: n.ejected_until)
+        return healthy + ejected
+
+    def best(self):
+        return self.candidates()[0]
+
+    def report_success(self, node, latency):
+        with self._lock:
+            node.latency = self._ewma(node.latency, latency)
+            node.error_rate = self._ewma(node.error_rate, 0.0)
+            node.failures = 0
+            node.ejected_until = 0.0
+
+    def report_failure(self, node, latency=None):
+        with self._lock:
+            if latency is not None:
+                node.latency = self._ewma(node.latency, latency)
+            node.error_rate = self._ewma(node.error_rate, 1.0)
+            node.failures += 1
+            backoff = min(self._backoff * 2 ** (node.failures - 1), self._max_backoff)
+            node.ejected_until = self._clock() + backoff
+
+    def stats(self):
+        now = self._clock()
+        with self._lock:
+            return [{'url': n.url,
+                     'latency': n.latency,
+                     'error_rate': n.error_rate,
+                     'healthy': n.is_healthy(now)} for n in self.nodes]
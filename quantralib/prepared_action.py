@@ -0,0 +1,113 @@
+#
+# prepared_action.py
+#
+
+import struct
+import time
+from .exceptions import EOSAbiProcessingError
+from .types import EXPIRATION_SECONDS
+from .utils import sig_digest
+
+# net_usage_words, max_cpu_usage_ms and delay_sec of 0, then no context free actions
+_HEADER_TAIL = b'\0\0\0\0'
+_TRX_EXTENSIONS = b'\0'
+
+
+class PreparedAction:
+    '''
+    An action of a contract wrapper with its invariant parts serialized once, see
+    EOSSP8DEBase.prepare.
+
+    The account, name and authorization of the action and the runs of fixed_args between
+    the varying fields are kept as bytes, together with the compiled codecs of the varying
+    fields and the signers the authorization needs. Calling it with the varying fields packs
+    only those, writes the transaction around them with the cached TAPOS, signs and pushes
+    it as packed_trx. Inside a batch the action is queued instead and None is returned.
+
+    The abi and the keys are resolved when the action is prepared, prepare it again after
+    the contract abi or the account permissions changed.
+    '''
+
+    def __init__(self, contract, action, fixed_args, authorization, account=None):
+        self._contract = contract
+        ce = contract.ce
+        self.account = account or contract.contract_account
+        self.action = action
+        self.authorization = [dict(auth) for auth in authorization]
+        serializer = ce.get_abi_serializer(self.account)
+        # alternating fixed bytes and (name, pack) of the varying fields
+        self._segments = []
+        self.varying = []
+        fixed = bytearray()
+        for name, field_type in serializer.action_fields(action):
+            pack = serializer.codec(field_type)[0]
+            if name in fixed_args:
+                pack(fixed, fixed_args[name])
+                continue
+            if fixed:
+                self._segments.append(bytes(fixed))
+                fixed = bytearray()
+            self._segments.append((name, pack))
+            self.varying.append(name)
+        if fixed:
+            self._segments.append(bytes(fixed))
+        pack_name = serializer.codec('name')[0]
+        self._pack_varuint32 = serializer.codec('varuint32')[0]
+        prefix = bytearray()
+        pack_name(prefix, self.account)
+        pack_name(prefix, action)
+        self._pack_varuint32(prefix, len(self.authorization))
+        for auth in self.authorization:
+            pack_name(prefix, auth['actor'])
+            pack_name(prefix, auth['permission'])
+        self._action_prefix = bytes(prefix)
+        self._keys = contract.keyring.keys_for(self.authorization, cleos=ce)
+
+    def pack(self, **varying):
+        ''' the action data bytes with the varying fields '''
+        buf = bytearray()
+        for segment in self._segments:
+            if type(segment) is bytes:
+                buf.extend(segment)
+            else:
+                name, pack = segment
+                try:
+                    val = varying[name]
+                except KeyError:
+                    raise EOSAbiProcessingError('Missing field {} of prepared action {}'.format(name, self.action))
+                pack(buf, val)
+        return bytes(buf)
+
+    def payload(self, **varying):
+        ''' the action dict with hex data, as the wrapper methods push it '''
+        return {'account': self.account, 'name': self.action, 'authorization': self.authorization,
+                'data': self.pack(**varying).hex()}
+
+    def transaction(self, chain_info, lib_info, data, expiration=None):
+        ''' serialized single action transaction with the action data bytes '''
+        if expiration is None:
+            expiration = int(time.time()) + EXPIRATION_SECONDS
+        raw = bytearray(struct.pack('<IHI', expiration, chain_info['last_irreversible_block_num'] & 0xffff,
+                                    lib_info['ref_block_prefix']))
+        raw.extend(_HEADER_TAIL)
+        raw.append(1)
+        raw.extend(self._action_prefix)
+        self._pack_varuint32(raw, len(data))
+        raw.extend(data)
+        raw.extend(_TRX_EXTENSIONS)
+        return raw
+
+    def __call__(self, broadcast=True, timeout=30, **varying):
+        ''' push the action with the varying fields, returns the push_transaction response '''
+        batch = getattr(self._contract._local, 'batch', None)
+        if batch is not None:
+            batch.add(self.payload(**varying))
+            return None
+        ce = self._contract.ce
+        chain_info, lib_info = ce._tapos_chain_lib_info(timeout=timeout)
+        raw = self.transaction(chain_info, lib_info, self.pack(**varying))
+        digest = sig_digest(raw, chain_info['chain_id'])
+        body = ce._signed_body(None, raw, [key.sign(digest) for key in self._keys], packed=True)
+        if broadcast:
+            return ce.post('chain.push_transaction', params=None, data=body, timeout=timeout)
+        return body
@@ -0,0 +1,223 @@
+#
+# sign_backend.py
+#
+# ECDSA backends used by EOSKey.sign. Both produce the same deterministic signatures:
+# RFC6979 nonces over the digest (with a retry counter as additional data), low-S
+# normalization and the EOS canonical signature loop, so a transaction signed with either
+# backend is byte-identical. They also recover the public key of a compact signature.
+#
+
+import hashlib
+import ecdsa
+from ecdsa.ellipticcurve import PointJacobi
+from ecdsa.numbertheory import inverse_mod, square_root_mod_prime, SquareRootError
+from ecdsa.util import number_to_string, string_to_number
+
+try:
+    import coincurve
+    from coincurve._libsecp256k1 import ffi as _secp_ffi
+except ImportError:
+    coincurve = None
+
+# header byte of a compact signature: 27 + 4 (compressed public key) + recovery id
+COMPACT_HEADER = 27 + 4
+
+_GENERATORS = {}
+
+
+def is_canonical(compact):
+    ''' the EOS canonical signature rule on a 65 byte compact signature '''
+    return (not compact[1] & 0x80 and
+            not (compact[1] == 0 and not compact[2] & 0x80) and
+            not compact[33] & 0x80 and
+            not (compact[33] == 0 and not compact[34] & 0x80))
+
+
+def nonce_data(counter):
+    ''' RFC6979 additional data of the counter-th signing attempt, libsecp256k1's ndata '''
+    if not counter:
+        return b''
+    return counter.to_bytes(32, 'little')
+
+
+def recovery_id(compact):
+    ''' recovery id of a compact signature, None when its header byte is invalid '''
+    header = compact[0] - 27
+    if not 0 <= header < 8:
+        return None
+    return header & 3
+
+
+def compress_point(x, y):
+    ''' 33 byte compressed encoding of a curve point '''
+    return bytes([2 + (y & 1)]) + x.to_bytes(32, 'big')
+
+
+def _generator(curve):
+    ''' generator of curve with its multiplication table precomputed, cached per curve '''
+    gen = _GENERATORS.get(curve.name)
+    if gen is None:
+        gen = curve.generator
+        if not isinstance(gen, PointJacobi):
+            gen = PointJacobi.from_affine(gen, generator=True)
+        gen = _GENERATORS[curve.name] = gen
+    return gen
+
+
+class PythonBackend:
+    '''
+    pure python backend on top of the ecdsa package, supports K1 and R1 keys.
+
+    The nonce point R is computed with the precomputed generator table and kept, the
+    recovery id follows from its y parity and from whether its x overflowed the order,
+    so no public key recovery is needed.
+    '''
+    name = 'python'
+    key_types = ('K1', 'R1')
+
+    def sign(self, key, digest):
+        ''' 65 byte compact signature of the 32 byte digest with EOSKey key '''
+        curve = key._sk.curve
+        order = curve.order
+        half_order = order // 2
+        secret = key._sk.privkey.secret_multiplier
+        gen = _generator(curve)
+        e = string_to_number(digest)
+        counter = 0
+        while True:
+            k = ecdsa.rfc6979.generate_k(order, secret, hashlib.sha256, digest,
+                                         extra_entropy=nonce_data(counter))
+            counter += 1
+            R = (gen * k).to_affine()
+            x = R.x()
+            r = x % order
+            if not r:
+                continue
+            s = inverse_mod(k, order) * (e + r * secret) % order
+            if not s:
+                continue
+            recid = (R.y() & 1) | (2 if x >= order else 0)
+            if s > half_order:
+                # -s is signed with -R, flip the parity
+                s = order - s
+                recid ^= 1
+            compact = bytes([COMPACT_HEADER + recid]) + number_to_string(r, order) + number_to_string(s, order)
+            if is_canonical(compact):
+                return compact
+
+    def public_key(self, curve, secret):
+        ''' compressed public key of the 32 byte secret on the ecdsa curve '''
+        point = (_generator(curve) * string_to_number(secret)).to_affine()
+        return compress_point(point.x(), point.y())
+
+    def recover(self, curve, digest, compact):
+        '''
+        compressed public key that signed the 32 byte digest on the ecdsa curve,
+        None when compact is not a valid signature
+        '''
+        recid = recovery_id(compact)
+        if recid is None:
+            return None
+        order = curve.order
+        field = curve.curve
+        p = field.p()
+        r = int.from_bytes(compact[1:33], 'big')
+        s = int.from_bytes(compact[33:65], 'big')
+        if not (0 < r < order and 0 < s < order):
+            return None
+        x = r + (recid >> 1) * order
+        if x >= p:
+            return None
+        try:
+            beta = square_root_mod_prime((x * x * x + field.a() * x + field.b()) % p, p)
+        except SquareRootError:
+            return None
+        y = beta if (beta - recid) % 2 == 0 else p - beta
+        # Q = r^-1 * (s * R - e * G)
+        r_inv = inverse_mod(r, order)
+        e = string_to_number(digest)
+        R = PointJacobi(field, x, y, 1, order)
+        Q = R.mul_add(s * r_inv % order, _generator(curve), -e * r_inv % order).to_affine()
+        if Q == ecdsa.ellipticcurve.INFINITY:
+            return None
+        return compress_point(Q.x(), Q.y())
+
+
+class Secp256k1Backend:
+    ''' libsecp256k1 backend through the coincurve package, K1 keys only '''
+    name = 'secp256k1'
+    key_types = ('K1',)
+
+    def __init__(self):
+        if coincurve is None:
+            raise ImportError('The secp256k1 signing backend requires the coincurve package')
+
+    def _private_key(self, key):
+        # cache the native key on the EOSKey, creating it costs a point multiplication
+        pk = getattr(key, '_secp_key', None)
+        if pk is None:
+            pk = key._secp_key = coincurve.PrivateKey(key._sk.to_string())
+        return pk
+
+    def sign(self, key, digest):
+        ''' 65 byte compact signature of the 32 byte digest with EOSKey key '''
+        pk = self._private_key(key)
+        counter = 0
+        while True:
+            ndata = _secp_ffi.new('unsigned char[32]', nonce_data(counter)) if counter else _secp_ffi.NULL
+            # r (32) | s (32) | recovery id (1)
+            rec = pk.sign_recoverable(digest, hasher=None, custom_nonce=(_secp_ffi.NULL, ndata))
+            compact = bytes([COMPACT_HEADER + rec[64]]) + rec[:64]
+            if is_canonical(compact):
+                return compact
+            counter += 1
+
+    def public_key(self, curve, secret):
+        ''' compressed public key of the 32 byte secp256k1 secret '''
+        return coincurve.PublicKey.from_secret(secret).format(compressed=True)
+
+    def recover(self, curve, digest, compact):
+        '''
+        compressed public key that signed the 32 byte digest, None when compact is not a
+        valid signature
+        '''
+        recid = recovery_id(compact)
+        if recid is None:
+            return None
+        try:
+            pub = coincurve.PublicKey.from_signature_and_message(compact[1:] + bytes([recid]), digest, hasher=None)
+        except ValueError:
+            return None
+        return pub.format(compressed=True)
+
+
+BACKENDS = {
+    PythonBackend.name: PythonBackend,
+    Secp256k1Backend.name: Secp256k1Backend,
+}
+
+_default = None
+
+
+def available_backends():
+    ''' names of the backends usable in this environment '''
+    return [name for name in BACKENDS if name != Secp256k1Backend.name or coincurve is not None]
+
+
+def get_backend(name=None):
+    ''' backend instance by name, the process default when name is None '''
+    global _default
+    if name is not None:
+        try:
+            return BACKENDS[name]()
+        except KeyError:
+            raise ValueError('Unknown signing backend {}, expected one of {}'.format(name, list(BACKENDS)))
+    if _default is None:
+        _default = Secp256k1Backend() if coincurve is not None else PythonBackend()
+    return _default
+
+
+def set_default_backend(name):
+    ''' select the backend used by EOSKey instances created without an explicit backend '''
+    global _default
+    _default = get_backend(name)
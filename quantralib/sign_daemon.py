@@ -0,0 +1,326 @@
+#
+# sign_daemon.py
+#
+# keosd like signing service: one process holds the parsed private keys and signs
+# digests for local clients over a Unix socket.
+#
+# The protocol is one json object per line in each direction. Requests carry an "id"
+# echoed in the response and a "method":
+#
+#   {"id": 1, "method": "public_keys"}
+#       -> {"id": 1, "public_keys": ["EOS...", ...]}
+#   {"id": 2, "method": "sign", "digests": ["<hex>", ...], "public_keys": ["EOS...", ...]}
+#       -> {"id": 2, "signatures": [["SIG_K1_...", ...], ...]}
+#
+# signatures holds, for every digest, the signatures of the requested keys in order.
+# A failed request is answered with {"id": ..., "error": "<message>"}.
+#
+
+import argparse
+import json
+import os
+import queue
+import socket
+import socketserver
+import stat
+import threading
+from concurrent.futures import Future
+from .exceptions import EOSKeyError, EOSRemoteSignerError
+from .keys import BatchSigner, recover_public_key, _normalize_public_key
+from .signer import Signer
+from .utils import parse_key_file
+
+DEFAULT_SOCKET_PATH = os.path.expanduser('~/.quantrapy/signd.sock')
+# digests the dispatcher combines at most into one micro-batch
+DEFAULT_SIGN_BATCH_DIGESTS = 1024
+
+
+class _Handler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            response = self.server.signing_daemon.handle_request(line)
+            self.wfile.write(json.dumps(response).encode() + b'\n')
+            self.wfile.flush()
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class SigningDaemon:
+    '''
+    Signing service on the Unix socket path. keys are EOSKey objects or private key
+    strings, they are parsed once and every worker process of the internal BatchSigner
+    loads them once, so sign requests only move digests around.
+
+    The sign requests of all the connections are queued, a dispatcher thread takes the
+    queued ones (up to batch_digests digests) and signs them together over the workers
+    pool. Requests arriving while a micro-batch is signed are combined in the next one,
+    so the single digest requests of many clients still reach the workers in bulk.
+
+    The socket is created with owner only permissions.
+    '''
+
+    def __init__(self, path, keys, workers=None, backend=None, batch_digests=DEFAULT_SIGN_BATCH_DIGESTS):
+        self.path = path
+        self._signer = BatchSigner(list(keys), workers=workers, backend=backend)
+        self._batch_digests = batch_digests
+        self._queue = queue.Queue()
+        self._dispatcher = None
+        self._server = None
+        self._thread = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def public_keys(self):
+        return self._signer.public_keys
+
+    def handle_request(self, line):
+        ''' response dict of a json request line '''
+        req_id = None
+        try:
+            request = json.loads(line)
+            req_id = request.get('id')
+            method = request.get('method')
+            if method == 'public_keys':
+                return {'id': req_id, 'public_keys': self.public_keys}
+            if method == 'sign':
+                future = Future()
+                self._queue.put((list(request['digests']), list(request['public_keys']), future))
+                return {'id': req_id, 'signatures': future.result()}
+            return {'id': req_id, 'error': 'Unknown method {}'.format(method)}
+        except Exception as ex:
+            return {'id': req_id, 'error': '{}: {}'.format(type(ex).__name__, ex)}
+
+    def _dispatch(self):
+        ''' sign the queued requests in micro-batches until the None sentinel '''
+        stop = False
+        while not stop:
+            item = self._queue.get()
+            if item is None:
+                break
+            batch, size = [item], len(item[0])
+            while size < self._batch_digests:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+                size += len(item[0])
+            try:
+                results = self._signer.sign_requests([(digests, public_keys) for digests, public_keys, _ in batch])
+            except Exception as ex:
+                results = [ex] * len(batch)
+            for (_, _, future), rslt in zip(batch, results):
+                if isinstance(rslt, Exception):
+                    future.set_exception(rslt)
+                else:
+                    future.set_result(rslt)
+
+    def _bind(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if os.path.exists(self.path):
+            self._remove_stale_socket()
+        old_umask = os.umask(0o177)
+        try:
+            self._server = _Server(self.path, _Handler)
+        finally:
+            os.umask(old_umask)
+        self._server.signing_daemon = self
+        self._dispatcher = threading.Thread(target=self._dispatch, daemon=True)
+        self._dispatcher.start()
+
+    def _remove_stale_socket(self):
+        ''' unlink the socket of a daemon that did not shut down cleanly, raises when one still listens '''
+        if not stat.S_ISSOCK(os.stat(self.path).st_mode):
+            raise EOSRemoteSignerError('{} exists and is not a socket'.format(self.path))
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(self.path)
+        except ConnectionRefusedError:
+            os.unlink(self.path)
+            return
+        finally:
+            sock.close()
+        raise EOSRemoteSignerError('A signing daemon is already listening on {}'.format(self.path))
+
+    def serve_forever(self):
+        ''' serve requests until close() is called from another thread '''
+        if self._server is None:
+            self._bind()
+        self._server.serve_forever()
+
+    def start(self):
+        ''' serve requests in a background thread '''
+        self._bind()
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._dispatcher is not None:
+            self._queue.put(None)
+            self._dispatcher.join()
+            self._dispatcher = None
+        self._signer.close()
+
+
+class SignerClient:
+    '''
+    Connection to a SigningDaemon. The connection is opened on first use and shared by
+    the threads of the process, requests are serialized over it. A forked child does
+    not share the connection of its parent, it opens its own.
+    '''
+
+    def __init__(self, path=DEFAULT_SOCKET_PATH, timeout=30):
+        self.path = path
+        self._timeout = timeout
+        self._lock = threading.Lock()
+        self._sock = None
+        self._rfile = None
+        self._pid = None
+        self._next_id = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        with self._lock:
+            self._disconnect()
+
+    def _disconnect(self):
+        if self._sock is not None:
+            self._rfile.close()
+            self._sock.close()
+            self._sock = None
+            self._rfile = None
+
+    def _request(self, method, **params):
+        with self._lock:
+            if self._sock is not None and self._pid != os.getpid():
+                # inherited from the parent process, closing the copy leaves its connection open
+                self._disconnect()
+            if self._sock is None:
+                self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                self._sock.settimeout(self._timeout)
+                try:
+                    self._sock.connect(self.path)
+                except OSError:
+                    self._sock.close()
+                    self._sock = None
+                    raise
+                self._rfile = self._sock.makefile('rb')
+                self._pid = os.getpid()
+            self._next_id += 1
+            request = dict(params, id=self._next_id, method=method)
+            try:
+                self._sock.sendall(json.dumps(request).encode() + b'\n')
+                line = self._rfile.readline()
+            except OSError:
+                self._disconnect()
+                raise
+            if not line:
+                self._disconnect()
+                raise EOSRemoteSignerError('The signing daemon closed the connection')
+        response = json.loads(line)
+        if 'error' in response:
+            if response['error'].startswith(EOSKeyError.__name__):
+                raise EOSKeyError(response['error'])
+            raise EOSRemoteSignerError(response['error'])
+        return response
+
+    def public_keys(self):
+        ''' public keys held by the daemon '''
+        return self._request('public_keys')['public_keys']
+
+    def sign(self, digests, public_keys):
+        ''' signatures of the hex digests, a list with the signature of every public key per digest '''
+        return self._request('sign', digests=list(digests), public_keys=list(public_keys))['signatures']
+
+    def signers(self):
+        ''' a RemoteSigner for every key held by the daemon '''
+        return [RemoteSigner(public_key, client=self) for public_key in self.public_keys()]
+
+
+class RemoteSigner(Signer):
+    '''
+    Signer whose private key is held by a SigningDaemon, usable wherever an EOSKey is,
+    e.g. as keys of Cleos.push_transaction or in a Keyring.
+
+    client is a SignerClient or the path of the daemon socket.
+    '''
+
+    def __init__(self, public_key, client=DEFAULT_SOCKET_PATH):
+        super().__init__()
+        self._public = _normalize_public_key(public_key)
+        if self._public is None:
+            raise EOSKeyError('{} is not a valid public key'.format(public_key))
+        self._client = client if isinstance(client, SignerClient) else SignerClient(client)
+
+    def __str__(self):
+        return self.to_public()
+
+    def to_public(self):
+        return self._public
+
+    def to_wif(self):
+        raise EOSKeyError('The private key of {} is held by the signing daemon'.format(self._public))
+
+    def sign(self, digest):
+        return self._client.sign([digest], [self._public])[0][0]
+
+    def sign_batch(self, digests):
+        ''' signatures of the hex digests in a single request '''
+        return [sigs[0] for sigs in self._client.sign(digests, [self._public])]
+
+    def verify(self, encoded_sig, digest):
+        return recover_public_key(encoded_sig, digest) == self._public
+
+
+def main():
+    parser = argparse.ArgumentParser(description='quantrapy signing daemon')
+    parser.add_argument('--socket', '-s', type=str, default=DEFAULT_SOCKET_PATH, dest='socket',
+                        help='path of the Unix socket')
+    parser.add_argument('--key-file', '-k', type=str, required=True, dest='key_file',
+                        help='file with the "Private key:" lines of the keys to hold')
+    parser.add_argument('--workers', '-w', type=int, default=None, dest='workers',
+                        help='number of signing processes, all cores by default')
+    args = parser.parse_args()
+    keys = parse_key_file(args.key_file, first_key=False)
+    daemon = SigningDaemon(args.socket, keys if isinstance(keys, list) else [keys], workers=args.workers)
+    print('Signing with {} keys on {}'.format(len(daemon.public_keys), args.socket))
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,3 +1,4 @@
+import asyncio
 from abc import ABC, abstractmethod
 
 
@@ -17,6 +18,14 @@ class Signer(ABC):
     def sign(self, digest):
         pass
 
+    async def sign_async(self, digest, executor=None):
+        '''
+        awaitable sign(), by default the blocking sign() runs in executor (the event loop
+        default executor when None) so a slow signer does not stall the loop.
+        Signers with a native asynchronous implementation override it.
+        '''
+        return await asyncio.get_running_loop().run_in_executor(executor, self.sign, digest)
+
     @abstractmethod
     def verify(self, encoded_sig, digest):
         pass
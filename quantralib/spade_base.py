@@ -1,29 +1,82 @@
+import threading
+from .action_batch import ActionBatch
 from .cleos import Cleos
-from .keys import EOSKey
+from .keyring import Keyring
+from .prepared_action import PreparedAction
 
 
 class EOSSP8DEBase:
     def __init__(self, contract_account, p_keys, chain_url="http://localhost", chain_port=None):
         self.chain_url = chain_url
         self.chain_port = chain_port
-        if chain_port:
-            url = url='%s:%s' %(chain_url, chain_port)
+        if isinstance(chain_url, (list, tuple)):
+            # node pool mode
+            url = [self._make_url(u, chain_port) for u in chain_url]
         else:
-            url = url='%s' % chain_url
+            url = self._make_url(chain_url, chain_port)
         self.ce = Cleos(url)
         self.contract_account = contract_account
         self.p_keys = p_keys
+        # keys are parsed once, pushes sign only with the keys the action needs
+        self.keyring = Keyring(p_keys if isinstance(p_keys, list) else [p_keys], cleos=self.ce)
+        # the ActionBatch collecting the actions of the current thread, if any
+        self._local = threading.local()
+
+    @staticmethod
+    def _make_url(chain_url, chain_port):
+        if chain_port:
+            return '%s:%s' %(chain_url, chain_port)
+        return '%s' % chain_url
+
+    def close(self):
+        self.ce.close()
+
+    def batch(self, **limits):
+        '''
+        Context collecting the actions of this object instead of pushing them one by one:
+
+            with nft.batch() as b:
+                b.create(...)
+                b.transfer(...)
+
+        The actions are pushed in as few transactions as the limits allow when the block
+        exits, see ActionBatch for the limits. Action methods return None inside a batch,
+        methods reading the result of their action (EOSRandom.buy_random) raise.
+        '''
+        return ActionBatch(self, **limits)
+
+    def prepare(self, action, fixed_args, authorization, account=None):
+        '''
+        PreparedAction of action on account (the contract account by default) with the
+        fields in fixed_args serialized once, call it with the remaining fields:
+
+            bid = ex.prepare('transfer', {'from': 'alice', 'to': ex.contract_account},
+                             [{'actor': 'alice', 'permission': 'active'}], account='eosio.token')
+            bid(quantity='1.0000 EOS', memo='42')
+        '''
+        return PreparedAction(self, action, fixed_args, authorization, account=account)
+
+    def _begin_batch(self, batch):
+        if getattr(self._local, 'batch', None) is not None:
+            raise RuntimeError('A batch is already open on this thread')
+        self._local.batch = batch
+
+    def _end_batch(self, batch):
+        self._local.batch = None
+
+    def _require_no_batch(self, method):
+        ''' for methods reading back the result of their action, which a batch only pushes on exit '''
+        if getattr(self._local, 'batch', None) is not None:
+            raise RuntimeError('{} can not be used inside a batch'.format(method))
 
     def _push_action_with_data(self, arguments, payload):
-        data = self.ce.abi_json_to_bin(payload['account'], payload['name'], arguments)
-        payload['data'] = data['binargs']
+        payload['data'] = self.ce.pack_action_data(payload['account'], payload['name'], arguments)
+        batch = getattr(self._local, 'batch', None)
+        if batch is not None:
+            batch.add(payload)
+            return None
         trx = {"actions": [payload]}
-
-        if isinstance(self.p_keys, list):
-            keys = [EOSKey(pk) for pk in self.p_keys]
-        else:
-            keys = EOSKey(self.p_keys)
-        resp = self.ce.push_transaction(trx, keys, broadcast=True)
+        resp = self.ce.push_transaction(trx, self.keyring, broadcast=True)
 
         return resp
 
@@ -43,4 +96,6 @@ class EOSSP8DEBase:
             }],
         }
 
-        return self._push_action_with_data(arguments, payload)
+        resp = self._push_action_with_data(arguments, payload)
+        self.keyring.invalidate(account)
+        return resp
@@ -2,7 +2,7 @@ import string
 from .spade_base import EOSSP8DEBase
 
 
-_ALPHABET = string.ascii_lowercase + string.digits[1:6]
+_ALPHABET = '.' + string.ascii_lowercase + string.digits[1:6]
 _UINT64_MAX= (1 << 64) -1
 
 def _validate_s(s):
@@ -43,6 +43,10 @@ class EOSSP8DE_NFT(EOSSP8DEBase):
     def get_assets(self, account, limit=10):
         return self.ce.get_table(self.contract_account, account, "sassets", limit=limit)
 
+    def iter_assets(self, account, limit=None):
+        """Iterate over all assets of account, page by page"""
+        return self.ce.iter_table(self.contract_account, account, "sassets", limit=limit)
+
     def _author(self, author, dappinfo, fieldtypes, priorityimg, op_type):
         author = _validate_s(author)
 
@@ -293,6 +297,10 @@ class EOSSP8DE_NFT_EXCHANGE(EOSSP8DEBase):
     def get_lots(self, limit=10):
         return self.ce.get_table(self.contract_account, self.contract_account, "lots", limit=limit)
 
+    def iter_lots(self, limit=None):
+        """Iterate over all lots, page by page"""
+        return self.ce.iter_table(self.contract_account, self.contract_account, "lots", limit=limit)
+
     def get_deposits(self, account, limit=10):
         return self.ce.get_table(account, self.contract_account, "deposits", limit=limit)
 
@@ -374,3 +382,14 @@ class EOSSP8DE_NFT_EXCHANGE(EOSSP8DEBase):
         }
 
         return self._push_action_with_data(arguments, payload)
+
+    def prepare_bet(self, account_from, account_to, account_tokens='eosio.token'):
+        """Prepared make_bet of account_from to account_to, call it with depos and lotid"""
+        account_from = _validate_s(account_from)
+        transfer = self.prepare("transfer", {"from": account_from, "to": _validate_s(account_to)},
+                                [{"actor": account_from, "permission": "active"}],
+                                account=_validate_s(account_tokens))
+
+        def bet(depos, lotid):
+            return transfer(quantity=depos, memo=str(_validate_u64(lotid)))
+        return bet
@@ -0,0 +1,71 @@
+#
+# table_pager.py
+#
+
+from .exceptions import EOSTablePagingError
+
+DEFAULT_TABLE_PAGE_SIZE = 100
+MAX_TABLE_PAGE_SIZE = 2000
+MIN_TABLE_PAGE_SIZE = 10
+# page fetch time the page size is tuned towards, in seconds
+TABLE_PAGE_TARGET_TIME = 0.25
+
+
+class TablePager:
+    '''
+    Paging state of a chain.get_table_rows scan, shared by Cleos.iter_table and
+    AsyncCleos.iter_table.
+
+    request() returns the get_table arguments of the next page and advance() consumes its
+    response. The scan continues from the next_key returned by nodeos (the lower bound of
+    the next page, or its upper bound when reverse is set). The page size doubles while
+    pages come back faster than TABLE_PAGE_TARGET_TIME, halves when they are much slower,
+    and shrinks to what nodeos managed to return when it cut a page short.
+    '''
+
+    def __init__(self, lower_bound='', upper_bound='', limit=None, page_size=DEFAULT_TABLE_PAGE_SIZE,
+                 max_page_size=MAX_TABLE_PAGE_SIZE, reverse=False):
+        self.lower_bound = lower_bound
+        self.upper_bound = upper_bound
+        self.remaining = limit
+        self.page_size = min(page_size, max_page_size)
+        self.max_page_size = max_page_size
+        self.reverse = reverse
+        self.done = limit is not None and limit <= 0
+
+    def request(self):
+        ''' keyword arguments of Cleos.get_table for the next page '''
+        page_size = self.page_size
+        if self.remaining is not None:
+            page_size = min(page_size, self.remaining)
+        return {'lower_bound': self.lower_bound, 'upper_bound': self.upper_bound, 'limit': page_size}
+
+    def advance(self, response, requested, elapsed):
+        ''' consume a get_table response for the page requested with limit requested, returns its rows '''
+        rows = response['rows']
+        if self.remaining is not None:
+            rows = rows[:self.remaining]
+            self.remaining -= len(rows)
+        more = response.get('more')
+        if not more or (self.remaining is not None and self.remaining <= 0):
+            self.done = True
+            return rows
+        next_key = response.get('next_key')
+        if next_key in (None, ''):
+            # nodeos before 1.8 only reports "more": true
+            raise EOSTablePagingError('The node does not return next_key, the table can not be paged')
+        if self.reverse:
+            self.upper_bound = next_key
+        else:
+            self.lower_bound = next_key
+        self._tune(len(response['rows']), requested, elapsed)
+        return rows
+
+    def _tune(self, returned, requested, elapsed):
+        if returned < requested:
+            # nodeos stops filling a page when it runs out of its time budget
+            self.page_size = max(MIN_TABLE_PAGE_SIZE, returned)
+        elif elapsed < TABLE_PAGE_TARGET_TIME:
+            self.page_size = min(self.max_page_size, self.page_size * 2)
+        elif elapsed > 2 * TABLE_PAGE_TARGET_TIME:
+            self.page_size = max(MIN_TABLE_PAGE_SIZE, self.page_size // 2)
@@ -0,0 +1,100 @@
+#
+# tapos.py
+#
+
+import threading
+import time
+from .utils import block_num_from_id, ref_block_prefix
+
+# any of the last 65536 blocks is a valid TAPOS reference, a minute old LIB is always safe
+DEFAULT_TAPOS_MAX_AGE = 60
+
+
+class TaposProvider:
+    '''
+    Caches the chain_id and the TAPOS reference of the last irreversible block so that
+    building a transaction does not need the get_info + get_block round trips.
+
+    The ref_block_prefix is derived locally from the cached block id. The cache is
+    refreshed by a single get_info call once it is older than max_age seconds, or
+    periodically in a background thread after start().
+    '''
+
+    def __init__(self, cleos, max_age=DEFAULT_TAPOS_MAX_AGE, clock=time.monotonic):
+        self._cleos = cleos
+        self._max_age = max_age
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._chain_info = None
+        self._lib_info = None
+        self._updated = None
+        self._stop = None
+        self._thread = None
+
+    def needs_refresh(self):
+        with self._lock:
+            return self._updated is None or self._clock() - self._updated > self._max_age
+
+    def update(self, chain_info):
+        ''' update the cache from a chain.get_info response '''
+        block_id = chain_info['last_irreversible_block_id']
+        lib_info = {
+            'id': block_id,
+            'block_num': block_num_from_id(block_id),
+            'ref_block_prefix': ref_block_prefix(block_id),
+        }
+        with self._lock:
+            self._chain_info = chain_info
+            self._lib_info = lib_info
+            self._updated = self._clock()
+
+    def refresh(self, timeout=30):
+        self.update(self._cleos.get_info(timeout=timeout))
+
+    def invalidate(self):
+        with self._lock:
+            self._updated = None
+
+    def cached_chain_lib_info(self):
+        ''' (chain_info, lib_info) as last cached, without any refresh '''
+        with self._lock:
+            return self._chain_info, self._lib_info
+
+    def get_chain_lib_info(self, timeout=30):
+        ''' drop-in replacement for Cleos.get_chain_lib_info '''
+        if self.needs_refresh():
+            self.refresh(timeout=timeout)
+        return self.cached_chain_lib_info()
+
+    @property
+    def chain_id(self):
+        return self.get_chain_lib_info()[0]['chain_id']
+
+    #####
+    # background refresh
+    #####
+
+    def start(self, interval=None):
+        ''' refresh the cache every interval seconds (max_age / 2 by default) in a daemon thread '''
+        if self._thread is not None:
+            return
+        interval = interval or self._max_age / 2.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(interval, self._stop), daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self, interval, stop):
+        while not stop.is_set():
+            try:
+                self.refresh()
+            except Exception:
+                # keep the last good reference, get_chain_lib_info retries once it gets too old
+                pass
+            stop.wait(interval)
@@ -76,8 +76,7 @@ class TestEos:
                     "permission": authorization['permission'],
                 }],
             }
-            data = ce.abi_json_to_bin(payload['account'], payload['name'], action['parameters'])
-            payload['data'] = data['binargs']
+            payload['data'] = ce.pack_action_data(payload['account'], payload['name'], action['parameters'])
             trx = {'actions': [payload]}
             try:
                 ce.push_transaction(trx, EOSKey(authorization['key']))
@@ -0,0 +1,234 @@
+#
+# transaction_tracker.py
+#
+
+import datetime as dt
+import threading
+import time
+from concurrent.futures import Future
+from .exceptions import EOSTransactionStatusError
+from .types import EXPIRATION_SECONDS
+
+# seconds between two polls of the background thread, about a block
+DEFAULT_TRACKER_INTERVAL = 0.5
+# statuses of a transaction included in a block that will be applied
+INCLUDED_STATUSES = ('executed', 'delayed')
+
+
+def _timestamp(val):
+    ''' epoch seconds of a block timestamp / expiration string, a datetime or a number '''
+    if isinstance(val, (int, float)):
+        return float(val)
+    if isinstance(val, str):
+        val = dt.datetime.fromisoformat(val.rstrip('Z'))
+    if val.tzinfo is None:
+        val = val.replace(tzinfo=dt.timezone.utc)
+    return val.timestamp()
+
+
+def _trx_id(trx):
+    # deferred transactions are reported by id only
+    return trx['trx'] if isinstance(trx['trx'], str) else trx['trx']['id']
+
+
+class TrackedTransaction:
+    '''
+    A transaction followed by a TransactionTracker.
+
+    included     - Future of the number of the block the transaction was first seen in.
+                   The block can still be forked out, irreversible is the final answer.
+    irreversible - Future of the block number once the last irreversible block passed it.
+
+    Both fail with EOSTransactionStatusError when the transaction expired without being
+    included, or was included with a failed status.
+    '''
+
+    def __init__(self, trx_id, expiration):
+        self.trx_id = trx_id
+        self.expiration = expiration
+        self.block_num = None
+        self.included = Future()
+        self.irreversible = Future()
+
+    def _fail(self, status):
+        ex = EOSTransactionStatusError('Transaction {} {}'.format(self.trx_id, status), self.trx_id, status)
+        for future in (self.included, self.irreversible):
+            if not future.done():
+                future.set_exception(ex)
+
+
+class TransactionTracker:
+    '''
+    Follows the blocks of the chain to report when pushed transactions are included and
+    become irreversible, without history.get_transaction.
+
+    track() registers a transaction id, the tracker then fetches every block once from the
+    head at submission and matches the ids of all tracked transactions inside it, so the
+    cost is one get_block per block whatever the number of tracked transactions. Blocks
+    are fetched by poll(), or every interval seconds in a daemon thread after start().
+    A transaction that is not included when the block time reaches its expiration is
+    reported as expired. A fork (a block whose previous is not the block followed before
+    it) moves the tracker back and the transactions of the orphaned blocks are looked for
+    again. The tracker goes idle when nothing is tracked.
+
+        tracker = TransactionTracker(ce)
+        tracked = tracker.track_push(ce.push_transaction(trx, keys))
+        tracked.irreversible.add_done_callback(...)
+    '''
+
+    def __init__(self, cleos):
+        self._cleos = cleos
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._included = {}
+        self._block_ids = {}
+        self._next_block = None
+        self._block_time = None
+        self._stop = None
+        self._thread = None
+
+    def __len__(self):
+        with self._lock:
+            return len(self._pending) + len(self._included)
+
+    def track(self, trx_id, expiration=None, block_num=None, timeout=30):
+        '''
+        TrackedTransaction of trx_id. expiration is the transaction expiration (epoch seconds,
+        datetime or string, EXPIRATION_SECONDS from now by default), block_num the head block
+        when it was pushed, fetched with get_info when the tracker is idle and none is given.
+        '''
+        expiration = time.time() + EXPIRATION_SECONDS if expiration is None else _timestamp(expiration)
+        tracked = TrackedTransaction(trx_id, expiration)
+        if block_num is None and self._next_block is None:
+            block_num = self._cleos.get_info(timeout=timeout)['head_block_num']
+        with self._lock:
+            if block_num is not None and (self._next_block is None or block_num < self._next_block):
+                self._next_block = block_num
+            self._pending.setdefault(trx_id, []).append(tracked)
+        return tracked
+
+    def track_push(self, response, expiration=None, timeout=30):
+        ''' track the transaction of a chain.push_transaction response '''
+        processed = response.get('processed') or {}
+        return self.track(response['transaction_id'], expiration=expiration, block_num=processed.get('block_num'),
+                          timeout=timeout)
+
+    #####
+    # block following
+    #####
+
+    def poll(self, timeout=30):
+        ''' fetch the blocks produced since the last poll, returns the number of blocks fetched '''
+        with self._lock:
+            if self._next_block is None:
+                return 0
+        info = self._cleos.get_info(timeout=timeout)
+        fetched = 0
+        while True:
+            with self._lock:
+                block_num = self._next_block
+            if block_num is None or block_num > info['head_block_num']:
+                break
+            block = self._cleos.get_block(block_num, timeout=timeout)
+            fetched += 1
+            self._apply_block(block_num, block)
+        self._advance_lib(info['last_irreversible_block_num'])
+        return fetched
+
+    def _apply_block(self, block_num, block):
+        done = []
+        with self._lock:
+            previous = self._block_ids.get(block_num - 1)
+            if previous is not None and block['previous'] != previous:
+                self._fork(block_num - 1)
+                return
+            self._block_ids[block_num] = block['id']
+            self._next_block = block_num + 1
+            self._block_time = _timestamp(block['timestamp'])
+            for trx in block.get('transactions', []):
+                trx_id = _trx_id(trx)
+                tracked = self._pending.pop(trx_id, None)
+                if tracked is None:
+                    continue
+                if trx['status'] not in INCLUDED_STATUSES:
+                    done.extend((t, trx['status']) for t in tracked)
+                    continue
+                for t in tracked:
+                    t.block_num = block_num
+                    done.append((t, None))
+                self._included[trx_id] = tracked
+            # nodeos only accepts transactions expiring after the block time
+            for trx_id, tracked in list(self._pending.items()):
+                expired = [t for t in tracked if t.expiration <= self._block_time]
+                if expired:
+                    done.extend((t, 'expired') for t in expired)
+                    tracked = [t for t in tracked if t not in expired]
+                    if tracked:
+                        self._pending[trx_id] = tracked
+                    else:
+                        del self._pending[trx_id]
+            self._idle_check()
+        # futures run their callbacks, resolve them outside the lock
+        for t, status in done:
+            if status is not None:
+                t._fail(status)
+            elif not t.included.done():
+                t.included.set_result(t.block_num)
+
+    def _fork(self, block_num):
+        ''' forget the blocks from block_num on, their transactions are pending again '''
+        for num in [num for num in self._block_ids if num >= block_num]:
+            del self._block_ids[num]
+        for trx_id, tracked in list(self._included.items()):
+            if tracked[0].block_num >= block_num:
+                del self._included[trx_id]
+                for t in tracked:
+                    t.block_num = None
+                self._pending[trx_id] = tracked
+        self._next_block = block_num
+
+    def _advance_lib(self, lib):
+        done = []
+        with self._lock:
+            for trx_id, tracked in list(self._included.items()):
+                if tracked[0].block_num <= lib:
+                    del self._included[trx_id]
+                    done.extend(tracked)
+            for num in [num for num in self._block_ids if num < lib]:
+                del self._block_ids[num]
+            self._idle_check()
+        for t in done:
+            t.irreversible.set_result(t.block_num)
+
+    def _idle_check(self):
+        if not self._pending and not self._included:
+            self._next_block = None
+            self._block_ids.clear()
+
+    #####
+    # background polling
+    #####
+
+    def start(self, interval=DEFAULT_TRACKER_INTERVAL):
+        ''' poll every interval seconds in a daemon thread '''
+        if self._thread is not None:
+            return
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(interval, self._stop), daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self, interval, stop):
+        while not stop.is_set():
+            try:
+                self.poll()
+            except Exception:
+                # the next poll continues from the last block fetched
+                pass
+            stop.wait(interval)
@@ -6,15 +6,18 @@ from .schema import (ActionSchema, PermissionLevelSchema, ChainInfoSchema, Block
                      AbiExtensionsSchema, AbiVariantsSchema)
 import datetime as dt
 import pytz
-from .utils import sha256, string_to_name, name_to_string, int_to_hex, hex_to_int, char_subtraction
-from .exceptions import EOSBufferInvalidType, EOSInvalidSchema, EOSUnknownObj, EOSAbiProcessingError
+from .utils import sha256, string_to_name, name_to_string, char_subtraction
+from .exceptions import EOSBufferInvalidType, EOSInvalidSchema, EOSUnknownObj
+from .abi_serializer import get_serializer, BinaryReader, pack_abi
 import json
-import binascii
 import struct
 import six
 from colander import Invalid
 from collections import OrderedDict
 
+# seconds a transaction stays valid when it does not set its expiration
+EXPIRATION_SECONDS = 30
+
 
 def convert_little_endian(buf, format='q'):
     ''' '''
@@ -26,6 +29,10 @@ def convert_big_endian(buf, format="I"):
     # return the first value of the tuple that is returned by unpack
     return struct.unpack('<{}'.format(format), buf)[0]
 
+
+# precompiled little endian packers used by EOSBuffer.write
+_PACKERS = {fmt: struct.Struct('<{}'.format(fmt)) for fmt in ('H', 'I', 'q', 'Q', 'l', 'f')}
+
 # json encoder
 
 
@@ -66,41 +73,49 @@ class ScopeName(Name):
 class Byte(int):
     # length of hex str
     hex_str_len = 2
+    fmt = '<B'
 
 
 class UInt16(int):
     # length of hex str
     hex_str_len = 4
+    fmt = '<H'
 
 
 class UInt32(int):
     # length of hex str
     hex_str_len = 8
+    fmt = '<I'
 
 
 class UInt64(int):
     # length of hex str
     hex_str_len = 16
+    fmt = '<q'
 
 
 class Int16(int):
     # length of hex str
     hex_str_len = 4
+    fmt = '<h'
 
 
 class Int32(int):
     # length of hex str
     hex_str_len = 8
+    fmt = '<i'
 
 
 class Int64(int):
     # length of hex str
     hex_str_len = 16
+    fmt = '<q'
 
 
 class Float(float):
     # length of hex str
     hex_str_len = 8
+    fmt = '<f'
 
 
 if six.PY3:
@@ -119,34 +134,39 @@ class VarUInt:
 
     def encode(self):
         ''' '''
+        self._b_arr = bytearray()
+        self.write(self._b_arr)
+        return self._b_arr
+
+    def write(self, buf):
+        ''' append the encoded value to the bytearray buf '''
         # ensure value is an int
         val = int(self._val)
-        buf = int((val) & 0x7f)
-        val >>= 7
-        buf |= (((val > 0) if 1 else 0) << 7)
-        self._push_byte(buf)
-        while val:
-            buf = int((val) & 0x7f)
+        while True:
+            byte = val & 0x7f
             val >>= 7
-            buf |= (((val > 0) if 1 else 0) << 7)
-            self._push_byte(buf)
-        return self._b_arr
-
-    def _pop(self, buf, length):
-        return buf[:length], buf[length:]
+            if val:
+                buf.append(byte | 0x80)
+            else:
+                buf.append(byte)
+                return
 
-    def decode(self, buf):
-        ''' '''
+    def read(self, reader):
+        ''' read a value at the position of the BinaryReader reader '''
         shift = 0
         result = 0
         while True:
-            tmp, buf = self._pop(buf, 2)
-            i = hex_to_int(tmp)
+            i = reader.read_byte()
             result |= (i & 0x7f) << shift
             shift += 7
             if not(i & 0x80):
                 break
-        return result, buf
+        return result
+
+    def decode(self, buf):
+        ''' decode the hex string buf, returns (val, leftover) '''
+        reader = BinaryReader(buf)
+        return self.read(reader), buf[reader.pos * 2:]
 
 
 class BaseObject(object):
@@ -171,6 +191,16 @@ class BaseObject(object):
         ''' '''
         return EOSBuffer(value).encode()
 
+    def _write_buffer(self, buf, value):
+        ''' append the encoding of value to the bytearray buf '''
+        _BUFFER.write(buf, value)
+
+    def encode(self):
+        ''' hex encoding, see write() '''
+        buf = bytearray()
+        self.write(buf)
+        return buf.hex()
+
     def _create_obj_array(self, arr, class_type):
         ''' '''
         new_arr = []
@@ -187,16 +217,15 @@ class Action(BaseObject):
         # setup permissions
         self.authorization = self._create_obj_array(self.authorization, Authorization)
 
-    def encode(self):
+    def write(self, buf):
         ''' '''
-        acct = self._encode_buffer(AccountName(self.account))
-        name = self._encode_buffer(Name(self.name))
-        auth = self._encode_buffer(self.authorization)
-        # need to figure out how to process data
-        # get length
-        data_len = self._encode_buffer(VarUInt(len(self.data) / 2))
-        data = data_len + self.data
-        return '{}{}{}{}'.format(acct, name, auth, data)
+        self._write_buffer(buf, AccountName(self.account))
+        self._write_buffer(buf, Name(self.name))
+        self._write_buffer(buf, self.authorization)
+        # data is already serialized, prefix it with its length
+        data = bytes.fromhex(self.data)
+        VarUInt(len(data)).write(buf)
+        buf += data
 
 
 class Asset:
@@ -230,7 +259,7 @@ class Asset:
         except IndexError:
             raise IndexError('Invalid string format given. Must be in the formst <float> <currency_type>')
 
-    def _string_to_symbol(self):
+    def _symbol_value(self):
         ''' '''
         rslt = 0
         cnt = 0
@@ -244,14 +273,23 @@ class Asset:
 
             cnt += 1
         rslt |= UInt64(self.precision)
-        return EOSBuffer(UInt64(rslt)).encode()
+        return UInt64(rslt)
 
-    def encode(self):
+    def _string_to_symbol(self):
+        ''' '''
+        return EOSBuffer(self._symbol_value()).encode()
+
+    def write(self, buf):
         ''' '''
         power = '1'.ljust(self.precision + len('1'), '0')
-        amount = EOSBuffer(UInt64(self.amount * UInt64(power))).encode()
-        symbol = self._string_to_symbol()
-        return '{amount}{symbol}'.format(amount=amount, symbol=symbol)
+        _BUFFER.write(buf, UInt64(self.amount * UInt64(power)))
+        _BUFFER.write(buf, self._symbol_value())
+
+    def encode(self):
+        ''' '''
+        buf = bytearray()
+        self.write(buf)
+        return buf.hex()
 
 
 class AbiType(BaseObject):
@@ -259,10 +297,9 @@ class AbiType(BaseObject):
         self._validator = AbiTypeSchema()
         super(AbiTypes, self).__init__(d)
 
-    def encode(self):
-        new_type_name = self._encode_buffer(self.new_type_name)
-        type = self._encode_buffer(self.type)
-        return '{}{}'.format(new_type_name, type)
+    def write(self, buf):
+        self._write_buffer(buf, self.new_type_name)
+        self._write_buffer(buf, self.type)
 
 
 class AbiStructField(BaseObject):
@@ -270,10 +307,9 @@ class AbiStructField(BaseObject):
         self._validator = AbiStructFieldSchema()
         super(AbiStructField, self).__init__(d)
 
-    def encode(self):
-        name = self._encode_buffer(self.name)
-        type = self._encode_buffer(self.type)
-        return '{}{}'.format(name, type)
+    def write(self, buf):
+        self._write_buffer(buf, self.name)
+        self._write_buffer(buf, self.type)
 
 
 class AbiStruct(BaseObject):
@@ -282,11 +318,10 @@ class AbiStruct(BaseObject):
         super(AbiStruct, self).__init__(d)
         self.fields = self._create_obj_array(self.fields, AbiStructField)
 
-    def encode(self):
-        name = self._encode_buffer(self.name)
-        base = self._encode_buffer(self.base)
-        fields = self._encode_buffer(self.fields)
-        return '{}{}{}'.format(name, base, fields)
+    def write(self, buf):
+        self._write_buffer(buf, self.name)
+        self._write_buffer(buf, self.base)
+        self._write_buffer(buf, self.fields)
 
 
 class AbiAction(BaseObject):
@@ -294,11 +329,10 @@ class AbiAction(BaseObject):
         self._validator = AbiActionSchema()
         super(AbiAction, self).__init__(d)
 
-    def encode(self):
-        name = self._encode_buffer(Name(self.name))
-        type = self._encode_buffer(self.type)
-        ricardian_contract = self._encode_buffer(self.ricardian_contract)
-        return '{}{}{}'.format(name, type, ricardian_contract)
+    def write(self, buf):
+        self._write_buffer(buf, Name(self.name))
+        self._write_buffer(buf, self.type)
+        self._write_buffer(buf, self.ricardian_contract)
 
 
 class AbiTable(BaseObject):
@@ -306,13 +340,12 @@ class AbiTable(BaseObject):
         self._validator = AbiTableSchema()
         super(AbiTable, self).__init__(d)
 
-    def encode(self):
-        name = self._encode_buffer(Name(self.name))
-        index_type = self._encode_buffer(self.index_type)
-        key_names = self._encode_buffer(self.key_names)
-        key_types = self._encode_buffer(self.key_types)
-        type = self._encode_buffer(self.type)
-        return '{}{}{}{}{}'.format(name, index_type, key_names, key_types, type)
+    def write(self, buf):
+        self._write_buffer(buf, Name(self.name))
+        self._write_buffer(buf, self.index_type)
+        self._write_buffer(buf, self.key_names)
+        self._write_buffer(buf, self.key_types)
+        self._write_buffer(buf, self.type)
 
 
 class AbiRicardianClauses(BaseObject):
@@ -320,10 +353,9 @@ class AbiRicardianClauses(BaseObject):
         self._validator = AbiRicardianClauseSchema()
         super(AbiRicardianClauses, self).__init__(d)
 
-    def encode(self):
-        id = self._encode_buffer(self.id)
-        body = self._encode_buffer(self.body)
-        return '{}{}'.format(id, body)
+    def write(self, buf):
+        self._write_buffer(buf, self.id)
+        self._write_buffer(buf, self.body)
 
 
 class AbiErrorMessages(BaseObject):
@@ -332,7 +364,7 @@ class AbiErrorMessages(BaseObject):
         self._validator = AbiErrorMessagesSchema()
         super(AbiErrorMessages, self).__init__(d)
 
-    def encode():
+    def write(self, buf):
         raise NotImplementedError
 
 
@@ -342,7 +374,7 @@ class AbiExtensions(BaseObject):
         self._validator = AbiExtensionsSchema()
         super(AbiExtensions, self).__init__(d)
 
-    def encode():
+    def write(self, buf):
         raise NotImplementedError
 
 
@@ -352,7 +384,7 @@ class AbiVariants(BaseObject):
         self._validator = AbiVariantsSchema()
         super(AbiVariants, self).__init__(d)
 
-    def encode():
+    def write(self, buf):
         raise NotImplementedError
 
 
@@ -390,6 +422,8 @@ class Abi(BaseObject):
     def __init__(self, d):
         ''' '''
         self._validator = AbiSchema()
+        self._serializer = get_serializer(d)
+        self._parameters = {}
         super(Abi, self).__init__(d)
         self.types = self._create_obj_array(self.types, AbiType)
         self.structs = self._create_obj_array(self.structs, AbiStruct)
@@ -421,6 +455,12 @@ class Abi(BaseObject):
         raise EOSUnknownObj('{} is not a valid struct for this contract'.format(name))
 
     def get_action_parameters(self, name):
+        ''' '''
+        if name not in self._parameters:
+            self._parameters[name] = self._build_action_parameters(name)
+        return self._parameters[name]
+
+    def _build_action_parameters(self, name):
         ''' '''
         parameters = OrderedDict()
         # get the struct
@@ -438,46 +478,21 @@ class Abi(BaseObject):
         return parameters
 
     def get_raw(self):
-        version = self._encode_buffer(self.version)
-        # encode types
-        types = self._encode_buffer(self.types)
-        structs = self._encode_buffer(self.structs)
-        actions = self._encode_buffer(self.actions)
-        tables = self._encode_buffer(self.tables)
-        ricardian_clauses = self._encode_buffer(self.ricardian_clauses)
-        error_messages = self._encode_buffer(self.error_messages)
-        abi_extensions = self._encode_buffer(self.abi_extensions)
-        variants = self._encode_buffer(self.variants)
-        return '{}{}{}{}{}{}{}{}{}'.format(version, types, structs, actions, tables,
-                                           ricardian_clauses, error_messages, abi_extensions,
-                                           variants)
+        ''' binary abi as hex, as stored by eosio::setabi '''
+        return pack_abi(self._serializer.abi).hex()
 
-    def encode(self):
-        ''' '''
-        raw_abi = self.get_raw()
-        # divide by two because it is hex
-        length = self._encode_buffer(VarUInt(len(raw_abi) / 2))
-        return length + raw_abi
+    def write(self, buf):
+        raw_abi = pack_abi(self._serializer.abi)
+        VarUInt(len(raw_abi)).write(buf)
+        buf += raw_abi
 
     def json_to_bin(self, name, data):
-        # act = self.get_action(name)
-        params = self.get_action_parameters(name)
-        bin_buffer = ''
-        for field in data:
-            # create EOSBuffer with value as a type of field
-            if isinstance(params[field], list):
-                field_type = type(params[field][0])
-                arr = []
-                for f in data[field]:
-                    print(f)
-                    arr.append(field_type(f))
-                field_buffer = EOSBuffer(arr)
-            else:
-                field_type = type(params[field])
-                field_buffer = EOSBuffer(field_type(data[field]))
+        ''' serialize the arguments of action name, returns hex '''
+        return self._serializer.encode_action_data(name, data).hex()
 
-            bin_buffer += field_buffer.encode()
-        return bin_buffer
+    def bin_to_json(self, name, data):
+        ''' deserialize the hex/bytes arguments of action name '''
+        return self._serializer.decode_action_data(name, data)
 
 
 class Authorization(BaseObject):
@@ -487,11 +502,10 @@ class Authorization(BaseObject):
         self._validator = PermissionLevelSchema()
         super(Authorization, self).__init__(d)
 
-    def encode(self):
+    def write(self, buf):
         ''' '''
-        actor = self._encode_buffer(AccountName(self.actor))
-        perms = self._encode_buffer(PermissionName(self.permission))
-        return '{}{}'.format(actor, perms)
+        self._write_buffer(buf, AccountName(self.actor))
+        self._write_buffer(buf, PermissionName(self.permission))
 
 
 class ChainInfo(BaseObject):
@@ -513,7 +527,7 @@ class Transaction(BaseObject):
         ''' '''
         # add defaults
         if 'expiration' not in d:
-            d['expiration'] = str((dt.datetime.utcnow() + dt.timedelta(seconds=30)).replace(tzinfo=pytz.UTC))
+            d['expiration'] = str((dt.datetime.utcnow() + dt.timedelta(seconds=EXPIRATION_SECONDS)).replace(tzinfo=pytz.UTC))
         if 'ref_block_num' not in d:
             d['ref_block_num'] = chain_info['last_irreversible_block_num'] & 0xFFFF
         if 'ref_block_prefix' not in d:
@@ -524,27 +538,35 @@ class Transaction(BaseObject):
         # parse actions
         self.actions = self._create_obj_array(self.actions, Action)
 
-    def _encode_hdr(self):
+    def _write_hdr(self, buf):
         ''' '''
         # convert
         exp_ts = (self.expiration - dt.datetime(1970, 1, 1, tzinfo=self.expiration.tzinfo)).total_seconds()
-        exp = self._encode_buffer(UInt32(exp_ts))
-        ref_blk = self._encode_buffer(UInt16(self.ref_block_num & 0xffff))
-        ref_block_prefix = self._encode_buffer(UInt32(self.ref_block_prefix))
-        net_usage_words = self._encode_buffer(VarUInt(self.net_usage_words))
-        max_cpu_usage_ms = self._encode_buffer(Byte(self.max_cpu_usage_ms))
-        delay_sec = self._encode_buffer(VarUInt(self.delay_sec))
-        # create hdr buffer
-        hdr = '{}{}{}{}{}{}'.format(exp, ref_blk, ref_block_prefix, net_usage_words, max_cpu_usage_ms, delay_sec)
-        return hdr
+        self._write_buffer(buf, UInt32(exp_ts))
+        self._write_buffer(buf, UInt16(self.ref_block_num & 0xffff))
+        self._write_buffer(buf, UInt32(self.ref_block_prefix))
+        self._write_buffer(buf, VarUInt(self.net_usage_words))
+        self._write_buffer(buf, Byte(self.max_cpu_usage_ms))
+        self._write_buffer(buf, VarUInt(self.delay_sec))
 
-    def encode(self):
+    def _encode_hdr(self):
+        ''' '''
+        buf = bytearray()
+        self._write_hdr(buf)
+        return buf.hex()
+
+    def write(self, buf):
         ''' '''
-        hdr_buf = self._encode_hdr()
-        context_actions = self._encode_buffer(self.context_free_actions)
-        actions = self._encode_buffer(self.actions)
-        trans_exts = self._encode_buffer(self.transaction_extensions)
-        return bytearray.fromhex(hdr_buf + context_actions + actions + trans_exts)
+        self._write_hdr(buf)
+        self._write_buffer(buf, self.context_free_actions)
+        self._write_buffer(buf, self.actions)
+        self._write_buffer(buf, self.transaction_extensions)
+
+    def encode(self):
+        ''' serialized transaction as a bytearray '''
+        buf = bytearray()
+        self.write(buf)
+        return buf
 
     def get_id(self):
         return sha256(self.encode())
@@ -554,137 +576,117 @@ class PackedTransaction:
     def __init__(self, trx, ce):
         self._cleos = ce
         self._packed_trx = trx
+        self._packed_bytes = bytes.fromhex(trx)
         # empty header
         self._is_unpacked = False
         self._unpacked_trx = OrderedDict()
 
-    def _decode_buffer(self, objType, buf):
+    def _read(self, reader, objType):
         ''' '''
-        eBuf = EOSBuffer("")
-        return eBuf.decode(objType, buf)
+        return _BUFFER.read(reader, objType)
 
-    def _decode_header(self, buf):
+    def _decode(self, read, buf):
+        ''' run read(reader) over a hex string or a BinaryReader, returns (value, leftover)
+            where leftover has the same form as buf '''
+        if isinstance(buf, BinaryReader):
+            return (read(buf), buf)
+        reader = BinaryReader(buf)
+        val = read(reader)
+        return (val, buf[reader.pos * 2:])
+
+    def _read_header(self, reader):
         ''' '''
-        buf = self._packed_trx
-        # get expiration buffer
-        (exp, buf) = self._decode_buffer(UInt32(), buf)
         # get expiration in UTC
-        exp_dt = dt.datetime.utcfromtimestamp(exp)
+        exp_dt = dt.datetime.utcfromtimestamp(self._read(reader, UInt32()))
         self._unpacked_trx['expiration'] = exp_dt.strftime("%Y-%m-%dT%H:%M:%S")
-        # get ref_block
-        (ref_blk, buf) = self._decode_buffer(UInt16(), buf)
-        self._unpacked_trx['ref_block_num'] = ref_blk
-        # get ref_block_prefix
-        (ref_blk_pre, buf) = self._decode_buffer(UInt32(), buf)
-        self._unpacked_trx['ref_block_prefix'] = ref_blk_pre
-        # get net usage
-        (max_net_usage, buf) = self._decode_buffer(VarUInt(), buf)
-        self._unpacked_trx['max_net_usage_words'] = max_net_usage
-        # get cpu usage
-        (max_cpu_usage, buf) = self._decode_buffer(Byte(), buf)
-        self._unpacked_trx['max_cpu_usage_ms'] = max_cpu_usage
-        # get delay sec
-        (delay_sec, buf) = self._decode_buffer(VarUInt(), buf)
-        self._unpacked_trx['delay_sec'] = delay_sec
-        return buf
+        self._unpacked_trx['ref_block_num'] = self._read(reader, UInt16())
+        self._unpacked_trx['ref_block_prefix'] = self._read(reader, UInt32())
+        self._unpacked_trx['max_net_usage_words'] = self._read(reader, VarUInt())
+        self._unpacked_trx['max_cpu_usage_ms'] = self._read(reader, Byte())
+        self._unpacked_trx['delay_sec'] = self._read(reader, VarUInt())
 
-    def decode_actions(self, buf):
+    def _read_actions(self, reader):
         ''' '''
-        # get length of action array
         actions = []
-        (length, act_buf) = self._decode_buffer(VarUInt(), buf)
-        cnt = 0
-        # loop through array
-        while cnt < length and length:
+        # get length of action array
+        length = self._read(reader, VarUInt())
+        for _ in range(length):
             # process action account/name
-            (acct_name, act_buf) = self._decode_buffer(AccountName(), act_buf)
-            (action_name, act_buf) = self._decode_buffer(ActionName(), act_buf)
-            # get authorizations
-            (auth, act_buf) = self.decode_authorizations(act_buf)
-            # get data length
-            (hex_data_len, act_buf) = self._decode_buffer(VarUInt(), act_buf)
-            # get abi information
-            contract_abi = self._cleos.get_abi(acct_name)
-            abi = Abi(contract_abi["abi"])
-            abi_act = abi.get_action(action_name)
-            # temp check need to handle this better
-            if abi_act["type"] != action_name:
-                raise EOSAbiProcessingError("Error processing the {} action".format(action_name))
-            abi_struct = abi.get_action_parameters(action_name)
-            data = OrderedDict()
-            # save data for hex_data
-            data_diff = act_buf
-            for a in abi_struct:
-                (act_data, act_buf) = self._decode_buffer(abi_struct[a], act_buf)
-                data[a] = act_data
+            acct_name = self._read(reader, AccountName())
+            action_name = self._read(reader, ActionName())
+            auth = self._read_authorizations(reader)
+            # data is a view into the packed transaction, nothing is copied until hex_data
+            data = reader.read(self._read(reader, VarUInt()))
+            # the abi is parsed once per contract, not once per action
+            serializer = self._cleos.get_abi_serializer(acct_name)
             act = OrderedDict({
                 'account': acct_name,
                 'name': action_name,
                 "authorization": auth,
-                "data": data,
-                "hex_data": data_diff.rstrip(act_buf),
+                "data": serializer.decode_action_data(action_name, BinaryReader(data)),
+                "hex_data": data.hex(),
             })
             actions.append(act)
-            # increment count
-            cnt += 1
-
-        return (actions, act_buf)
+        return actions
 
-    def decode_authorizations(self, buf):
+    def _read_authorizations(self, reader):
         ''' '''
         auths = []
-        (length, auth_buf) = self._decode_buffer(VarUInt(), buf)
-        cnt = 0
-        while cnt < length and length:
-            # process action account/name
-            (acct_name, auth_buf) = self._decode_buffer(AccountName(), auth_buf)
-            (perm, auth_buf) = self._decode_buffer(ActionName(), auth_buf)
+        length = self._read(reader, VarUInt())
+        for _ in range(length):
             auth = OrderedDict({
-                'actor': acct_name,
-                'permission': perm,
+                'actor': self._read(reader, AccountName()),
+                'permission': self._read(reader, PermissionName()),
             })
             auths.append(auth)
-            cnt += 1
-        return (auths, auth_buf)
+        return auths
 
     # placeholder until context_free_actions are implemented. Might be able to use self.decode_actions
-    def decode_context_actions(self, buf):
+    def _read_context_actions(self, reader):
         ''' '''
-        (length, ctx_buf) = self._decode_buffer(VarUInt(), buf)
+        length = self._read(reader, VarUInt())
         if length > 0:
             raise NotImplementedError("Currently quantralib does not support context_free_actions")
-        # get length of action array
-        return (length, ctx_buf)
+        return length
 
     # placeholder until context_free_actions are implemented. Might be able to use self.decode_actions
-    def decode_trx_extensions(self, buf):
+    def _read_trx_extensions(self, reader):
         ''' '''
-        trx_ext = []
-        (length, ctx_buf) = self._decode_buffer(VarUInt(), buf)
+        length = self._read(reader, VarUInt())
         if length > 0:
             raise NotImplementedError("Currently quantralib does not support transaction extensions")
-        # get length of action array
-        return (trx_ext, ctx_buf)
+        return []
+
+    def decode_actions(self, buf):
+        ''' buf is a hex string or a BinaryReader '''
+        return self._decode(self._read_actions, buf)
+
+    def decode_authorizations(self, buf):
+        ''' '''
+        return self._decode(self._read_authorizations, buf)
+
+    def decode_context_actions(self, buf):
+        ''' '''
+        return self._decode(self._read_context_actions, buf)
+
+    def decode_trx_extensions(self, buf):
+        ''' '''
+        return self._decode(self._read_trx_extensions, buf)
 
     def get_id(self):
         ''' '''
-        return sha256(bytearray.fromhex(self._packed_trx))
+        return sha256(self._packed_bytes)
 
     def get_transaction(self):
         ''' '''
         # only unpack once
         if not self._is_unpacked:
-            # decode the header and get the rest of the trx back
-            trx_buf = self._decode_header(self._packed_trx)
-            # process list of context free actions
-            (context_actions, trx_buf) = self.decode_context_actions(trx_buf)
-            self._unpacked_trx['context_free_actions'] = context_actions
-            # process actions
-            (actions, trx_buf) = self.decode_actions(trx_buf)
-            self._unpacked_trx['actions'] = actions
-            # process transaction extensions
-            (trx_ext, trx_buf) = self.decode_trx_extensions(trx_buf)
-            self._unpacked_trx['transaction_extensions'] = trx_ext
+            # a single cursor walks the whole packed transaction
+            reader = BinaryReader(self._packed_bytes)
+            self._read_header(reader)
+            self._unpacked_trx['context_free_actions'] = self._read_context_actions(reader)
+            self._unpacked_trx['actions'] = self._read_actions(reader)
+            self._unpacked_trx['transaction_extensions'] = self._read_trx_extensions(reader)
             # set boolean
             self._is_unpacked = True
         return self._unpacked_trx
@@ -695,150 +697,170 @@ class EOSBuffer:
         self._value = v
         self._count = 0
 
-    def _decode_number(self, val, format='L'):
-        byte_val = binascii.unhexlify(val)
-        return convert_big_endian(byte_val, format)
-
-    def _decode_float(self, val, format='f'):
-        byte_val = binascii.unhexlify(val)
-        return struct.unpack(">{}".format(format), byte_val)
-
-    def _decode_name(self, val, format='Q'):
-        ''' '''
-        num = self._decode_number(val, format)
-        return name_to_string(num)
-
-    def _decode_str(self, val):
-        ''' '''
-        # get length
-        vu = VarUInt()
-        (length, val) = vu.decode(val)
-        string = ''
-        leftover = val
-        # if there is data parse it
-        if length > 0:
-            (str_data, leftover) = self._splice_buf(val, length * 2)
-            string = binascii.unhexlify(str_data).decode()
-        return (string, leftover)
-
-    def _splice_buf(self, buf, length):
-        return buf[:length], buf[length:]
-
-    def _write_number(self, val, format='q'):
-        ''' '''
-        le = convert_little_endian(val, format)
-        return binascii.hexlify(le).decode()
-
-    def _write_name(self, w_str):
-        ''' '''
-        val = string_to_name(w_str)
-        le = convert_little_endian(val, 'Q')
-        return binascii.hexlify(le).decode()
-
-    def _write_str(self, w_str):
-        b = bytearray()
-        length = VarUInt(len(w_str)).encode()
-        b.extend(map(ord, w_str))
-        return binascii.hexlify(length + b).decode()
-
-    def _write_varuint(self, vuint):
-        buf = vuint.encode()
-        return binascii.hexlify(buf).decode()
-
-    def decode(self, objType, buf=None):
-        leftover = ""
-        if not buf:
-            buf = self._value
-        if isinstance(objType, UInt32):
-            (val, leftover) = self._splice_buf(buf, objType.hex_str_len)
-            val = self._decode_number(val, 'I')
-        elif isinstance(objType, UInt16):
-            (val, leftover) = self._splice_buf(buf, objType.hex_str_len)
-            val = self._decode_number(val, 'H')
-        elif isinstance(objType, VarUInt):
-            (val, leftover) = objType.decode(buf)
+    def read(self, reader, objType):
+        ''' read a value of objType at the position of the BinaryReader reader '''
+        decoder = _DECODERS.get(type(objType))
+        if decoder is not None:
+            return decoder(reader, objType)
+        if isinstance(objType, VarUInt):
+            return objType.read(reader)
         elif(isinstance(objType, Byte) or
              isinstance(objType, bool)):
-            (hex_str, leftover) = self._splice_buf(buf, 2)
-            val = hex_to_int(hex_str)
-        elif isinstance(objType, Float):
-            (val, leftover) = self._splice_buf(buf, objType.hex_str_len)
-            val = self._decode_float(val, 'f')
+            return reader.read_byte()
+        elif(isinstance(objType, Float) or
+             isinstance(objType, UInt16) or
+             isinstance(objType, UInt32) or
+             isinstance(objType, UInt64) or
+             isinstance(objType, Int16) or
+             isinstance(objType, Int32) or
+             isinstance(objType, Int64)):
+            return reader.unpack(objType.fmt, objType.hex_str_len // 2)
         elif(isinstance(objType, int) or
              isinstance(objType, long)):
-            (val, leftover) = self._splice_buf(buf, objType.hex_str_len)
-            val = self._decode_number(val, 'q')
-        elif (isinstance(objType, Name) or
-              isinstance(objType, AccountName) or
-              isinstance(objType, PermissionName) or
-              isinstance(objType, ActionName) or
-              isinstance(objType, TableName) or
-              isinstance(objType, ScopeName)):
-            (val, leftover) = self._splice_buf(buf, objType.hex_str_len)
-            val = self._decode_name(val)
+            return reader.unpack('<l', 4)
+        elif isinstance(objType, Name):
+            return name_to_string(reader.unpack('<Q', 8))
         elif isinstance(objType, str):
-            (val, leftover) = self._decode_str(buf)
+            length = VarUInt().read(reader)
+            return bytes(reader.read(length)).decode()
         elif(isinstance(objType, list)):
-            # get count(VarUint)
-            val = []
-            (length, leftover) = VarUInt("").decode(buf)
-            while len(val) < length:
-                (out, leftover) = self.decode(objType[0], leftover)
-                val.append(out)
-        else:
-            raise EOSBufferInvalidType("Cannot decode type: {}".format(type(objType)))
+            length = VarUInt().read(reader)
+            return [self.read(reader, objType[0]) for _ in range(length)]
+        raise EOSBufferInvalidType("Cannot decode type: {}".format(type(objType)))
 
-        return (val, leftover)
+    def decode(self, objType, buf=None):
+        ''' decode objType from the start of buf (hex, bytes or a BinaryReader), returns
+            (val, leftover) where leftover has the same form as buf '''
+        if not buf:
+            buf = self._value
+        if isinstance(buf, BinaryReader):
+            return (self.read(buf, objType), buf)
+        reader = BinaryReader(buf)
+        val = self.read(reader, objType)
+        if isinstance(buf, str):
+            return (val, buf[reader.pos * 2:])
+        return (val, buf[reader.pos:])
 
     def encode(self, val=None):
-        if not val:
+        ''' hex encoding of val, a compatibility view over encode_bytes() '''
+        return self.encode_bytes(val).hex()
+
+    def encode_bytes(self, val=None):
+        ''' binary encoding of val (the buffer value by default) as a bytearray '''
+        if val is None:
             val = self._value
-        if (isinstance(val, Name) or
-            isinstance(val, AccountName) or
-            isinstance(val, PermissionName) or
-            isinstance(val, ActionName) or
-            isinstance(val, TableName) or
-                isinstance(val, ScopeName)):
-            val = self._write_name(val)
-            return val
+        buf = bytearray()
+        self.write(buf, val)
+        return buf
+
+    def write(self, buf, val):
+        ''' append the binary encoding of val to the bytearray buf '''
+        encoder = _ENCODERS.get(type(val))
+        if encoder is not None:
+            return encoder(buf, val)
+        if isinstance(val, Name):
+            buf += _PACKERS['Q'].pack(string_to_name(val))
         elif(isinstance(val, str)):
-            return self._write_str(val)
+            data = val.encode('utf-8')
+            VarUInt(len(data)).write(buf)
+            buf += data
         elif(isinstance(val, Byte) or
              isinstance(val, bool)):
-            # return self._write_number(val, '?')
-            return int_to_hex(val)
+            buf.append(int(val))
         elif(isinstance(val, UInt16)):
-            return self._write_number(val, 'H')
+            buf += _PACKERS['H'].pack(val)
         elif(isinstance(val, UInt32)):
-            return self._write_number(val, 'I')
+            buf += _PACKERS['I'].pack(val)
         elif(isinstance(val, UInt64)):
-            return self._write_number(val, 'q')
+            buf += _PACKERS['q'].pack(val)
         elif(isinstance(val, Float)):
-            return self._write_number(val, 'f')
+            buf += _PACKERS['f'].pack(val)
         elif(isinstance(val, VarUInt)):
-            # temp encoding
-            return self._write_varuint(val)
+            val.write(buf)
         elif(isinstance(val, int) or
              isinstance(val, long)):
-            return self._write_number(val, 'l')
-        elif(isinstance(val, Action) or
-             isinstance(val, AbiStruct) or
-             isinstance(val, AbiStructField) or
-             isinstance(val, AbiType) or
-             isinstance(val, AbiAction) or
-             isinstance(val, AbiTable) or
-             isinstance(val, AbiRicardianClauses) or
-             isinstance(val, AbiErrorMessages) or
-             isinstance(val, AbiExtensions) or
-             isinstance(val, AbiVariants) or
-             isinstance(val, Asset) or
-             isinstance(val, Authorization)):
-            return val.encode()
+            buf += _PACKERS['l'].pack(val)
+        elif(isinstance(val, BaseObject) or
+             isinstance(val, Asset)):
+            val.write(buf)
         elif(isinstance(val, list)):
-            buf = self._write_varuint(VarUInt(len(val)))
+            VarUInt(len(val)).write(buf)
             for item in val:
-                e_item = self.encode(item)
-                buf = '{}{}'.format(buf, e_item)
-            return buf
+                self.write(buf, item)
         else:
             raise EOSBufferInvalidType('Cannot encode type: {}'.format(type(val)))
+
+
+# shared instance for the encoders/decoders above, read/write do not use the buffer value
+_BUFFER = EOSBuffer(None)
+
+
+#####
+# exact type dispatch for EOSBuffer.read/write, subclasses fall back to the isinstance checks
+#####
+
+def _write_name(buf, val):
+    buf += _PACKERS['Q'].pack(string_to_name(val))
+
+
+def _write_str(buf, val):
+    data = val.encode('utf-8')
+    VarUInt(len(data)).write(buf)
+    buf += data
+
+
+def _write_byte(buf, val):
+    buf.append(int(val))
+
+
+def _write_object(buf, val):
+    val.write(buf)
+
+
+def _write_list(buf, val):
+    VarUInt(len(val)).write(buf)
+    for item in val:
+        _BUFFER.write(buf, item)
+
+
+def _number_writer(fmt):
+    pack = _PACKERS[fmt].pack
+
+    def write(buf, val):
+        buf += pack(val)
+    return write
+
+
+def _read_number(reader, objType):
+    return reader.unpack(objType.fmt, objType.hex_str_len // 2)
+
+
+def _read_name(reader, objType):
+    return name_to_string(reader.unpack('<Q', 8))
+
+
+_NAME_TYPES = (Name, AccountName, PermissionName, ActionName, TableName, ScopeName)
+
+_ENCODERS = {
+    str: _write_str,
+    bool: _write_byte,
+    Byte: _write_byte,
+    UInt16: _number_writer('H'),
+    UInt32: _number_writer('I'),
+    UInt64: _number_writer('q'),
+    Float: _number_writer('f'),
+    int: _number_writer('l'),
+    VarUInt: _write_object,
+    Action: _write_object,
+    Authorization: _write_object,
+    Asset: _write_object,
+    list: _write_list,
+}
+_ENCODERS.update((name_type, _write_name) for name_type in _NAME_TYPES)
+
+_DECODERS = {
+    Byte: lambda reader, objType: reader.read_byte(),
+    VarUInt: lambda reader, objType: objType.read(reader),
+}
+_DECODERS.update((num_type, _read_number) for num_type in (UInt16, UInt32, UInt64, Int16, Int32, Int64, Float))
+_DECODERS.update((name_type, _read_name) for name_type in _NAME_TYPES)
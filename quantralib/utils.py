@@ -1,6 +1,7 @@
 from binascii import hexlify
 import hashlib
 import itertools
+import struct
 from .exceptions import InvalidKeyFile, EOSIncorectContractVersion
 
 MIN_CONTRACT_VERSION = 2
@@ -55,6 +56,16 @@ def sig_digest(payload, chain_id=None, context_free_data=None):
     return sha256(buf)
 
 
+def block_num_from_id(block_id):
+    ''' the first 4 bytes of a block id are the big endian block number '''
+    return int(block_id[:8], 16)
+
+
+def ref_block_prefix(block_id):
+    ''' TAPOS prefix: the second 64 bit word of the block id, low 32 bits, little endian '''
+    return struct.unpack_from('<I', bytes.fromhex(block_id), 8)[0]
+
+
 def int_to_hex(i):
     return '{:02x}'.format(i)
 
@@ -119,14 +130,12 @@ def char_to_symbol(c):
 
 def string_to_name(s):
     ''' '''
-    i = 0
     name = 0
-    while i < len(s):
-        #sym = char_to_symbol(s[i])
-        name += (char_to_symbol(s[i]) & 0x1F) << (64 - 5 * (i + 1))
-        i += 1
-    if i > 12:
-        name |= char_to_symbol(s[11]) & 0x0F
+    for i, c in enumerate(s[:12]):
+        name |= (char_to_symbol(c) & 0x1F) << (64 - 5 * (i + 1))
+    if len(s) > 12:
+        # the 13th char only has the lowest 4 bits left
+        name |= char_to_symbol(s[12]) & 0x0F
     return name
 
 
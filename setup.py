@@ -31,10 +31,15 @@ setup(
         'six',
         'pyyaml',
     ],
+    extras_require={
+        'async': ['aiohttp'],
+        'fast': ['coincurve>=15'],
+    },
     entry_points={
         'console_scripts': [
             'validate_chain = quantralib.command_line:validate_chain',
             'quantrapy = quantralib.command_line:cleos',
             'pytesteos = quantralib.command_line:testeos',
+            'quantrapy-signd = quantralib.sign_daemon:main',
         ],
     })
@@ -0,0 +1,129 @@
+import base64
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from quantralib.abi_serializer import pack_abi
+from quantralib.keys import EOSKey
+from quantralib.utils import sha256
+
+# chain state and key shared by the tests talking to a StubNodeos
+LIB_ID = '0000f2a7e8ca6b2ac2d0a6d7b6e0b0f1e4d4b3a2c1b0a0908070605040302010'
+CHAIN_INFO = {'chain_id': 'ab' * 32, 'head_block_num': 62140, 'last_irreversible_block_num': 62119,
+              'last_irreversible_block_id': LIB_ID}
+KEY = EOSKey('5JU8RktQ72qFtJyiW3DJ54B2ZY6Ad83HdoGg78Nk8kUNMJEmCUg')
+
+
+def account_route(key=KEY):
+    ''' chain.get_account route of accounts whose active permission is the single key '''
+    def get_account(body):
+        return {'account_name': body['account_name'], 'permissions': [
+            {'perm_name': 'active', 'parent': 'owner',
+             'required_auth': {'threshold': 1, 'keys': [{'key': key.to_public(), 'weight': 1}], 'accounts': []}}]}
+    return get_account
+
+
+def transfer(memo):
+    ''' transaction of a single action with memo as its data '''
+    return {'actions': [{'account': 'eosio.token', 'name': 'transfer',
+                         'authorization': [{'actor': 'tester', 'permission': 'active'}],
+                         'data': memo.encode().hex()}]}
+
+
+def push_one(body):
+    ''' chain.push_transaction of transfer(memo) bodies, failing the 'bad' memo '''
+    data = body['transaction']['actions'][0]['data']
+    if bytes.fromhex(data) == b'bad':
+        return 500, {'code': 500, 'message': 'Internal Service Error', 'error': {'name': 'eosio_assert_message_exception'}}
+    return {'transaction_id': data, 'processed': {}}
+
+
+def push_many(body):
+    # nodeos reports failed transactions of a push_transactions call in place, with a zero id
+    results = []
+    for trx in body:
+        rslt = push_one(trx)
+        results.append({'transaction_id': '0' * 64, 'processed': {'error': 'assertion failure'}}
+                       if isinstance(rslt, tuple) else rslt)
+    return results
+
+
+def push_routes(failing=False):
+    ''' get_info and push routes, every chain.push_transaction fails when failing is set '''
+    return {
+        '/v1/chain/get_info': lambda body: CHAIN_INFO,
+        '/v1/chain/push_transaction': (lambda body: (500, {'code': 500, 'error': {}})) if failing else push_one,
+        '/v1/chain/push_transactions': push_many,
+    }
+
+
+def abi_route(abi):
+    ''' chain.get_raw_abi route serving abi for every account '''
+    raw_abi = pack_abi(abi)
+
+    def get_raw_abi(body):
+        return {'account_name': body['account_name'], 'abi_hash': sha256(raw_abi),
+                'abi': base64.b64encode(raw_abi).decode()}
+    return get_raw_abi
+
+
+class StubNodeos:
+    ''' Minimal local stand-in for the nodeos HTTP API.
+
+        routes maps an api path (e.g. '/v1/chain/get_info') to a callable taking the
+        decoded json body and returning either a dict or a (status, dict) tuple.
+    '''
+
+    def __init__(self, routes=None):
+        self.routes = dict(routes or {})
+        self.requests = []
+        self.peers = set()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def _handle(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                raw = self.rfile.read(length) if length else b''
+                body = json.loads(raw) if raw else None
+                stub.peers.add(self.client_address)
+                stub.requests.append((self.path, body))
+                route = stub.routes.get(self.path)
+                if route is None:
+                    status, resp = 404, {'code': 404, 'message': 'Not Found'}
+                else:
+                    resp = route(body)
+                    status = 200
+                    if isinstance(resp, tuple):
+                        status, resp = resp
+                out = json.dumps(resp).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(out)))
+                self.end_headers()
+                self.wfile.write(out)
+
+            do_GET = _handle
+            do_POST = _handle
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        return 'http://127.0.0.1:{}'.format(self._server.server_address[1])
+
+    def calls(self, path):
+        return [body for p, body in self.requests if p == path]
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self._server.shutdown()
+        self._server.server_close()
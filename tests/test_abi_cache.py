@@ -0,0 +1,114 @@
+import base64
+import pytest
+from quantralib.abi_cache import AbiCache
+from quantralib.abi_serializer import pack_abi
+from quantralib.cleos import Cleos
+from quantralib.exceptions import EOSAbiProcessingError
+from quantralib.types import Transaction
+from quantralib.utils import sha256
+from stub_nodeos import StubNodeos
+from test_abi_serializer import TOKEN_ABI, TRANSFER, TRANSFER_BIN
+
+RAW_ABI = pack_abi(TOKEN_ABI)
+ABI_HASH = sha256(RAW_ABI)
+
+
+def raw_abi_response(account, abi_hash=None):
+    resp = {'account_name': account, 'abi_hash': ABI_HASH}
+    if abi_hash != ABI_HASH:
+        resp['abi'] = base64.b64encode(RAW_ABI).decode()
+    return resp
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeCleos:
+    def __init__(self):
+        self.calls = []
+
+    def get_raw_abi(self, acct_name, abi_hash=None, timeout=30):
+        self.calls.append((acct_name, abi_hash))
+        if acct_name == 'noabi':
+            return {'account_name': acct_name, 'abi_hash': sha256(b''), 'abi': ''}
+        return raw_abi_response(acct_name, abi_hash)
+
+
+class TestAbiCache:
+
+    def test_ttl_revalidates_by_hash(self):
+        clock = Clock()
+        ce = FakeCleos()
+        cache = AbiCache(ce, ttl=10, clock=clock)
+        serializer = cache.get('eosio.token')
+        assert serializer.encode_action_data('transfer', TRANSFER).hex() == TRANSFER_BIN
+        clock.now = 9
+        assert cache.get('eosio.token') is serializer
+        assert ce.calls == [('eosio.token', None)]
+        # expired, the node only confirms the hash and the parsed abi is kept
+        clock.now = 11
+        assert cache.get('eosio.token') is serializer
+        assert ce.calls[-1] == ('eosio.token', ABI_HASH)
+        assert len(ce.calls) == 2
+
+    def test_changed_abi_is_reloaded(self):
+        clock = Clock()
+        cache = AbiCache(FakeCleos(), ttl=10, clock=clock)
+        cache.update('eosio.token', dict(raw_abi_response('eosio.token'), abi_hash='00' * 32))
+        old = cache.get('eosio.token')
+        clock.now = 11
+        assert cache.get('eosio.token') is not old
+        assert cache.stale_hash('eosio.token') == ABI_HASH
+
+    def test_lru_eviction(self):
+        ce = FakeCleos()
+        cache = AbiCache(ce, maxsize=2)
+        cache.get('a')
+        cache.get('b')
+        cache.get('a')
+        cache.get('c')
+        assert 'a' in cache and 'c' in cache and 'b' not in cache
+        assert len(cache) == 2
+
+    def test_invalidate(self):
+        ce = FakeCleos()
+        cache = AbiCache(ce)
+        cache.get('a')
+        cache.get('b')
+        cache.invalidate('a')
+        assert 'a' not in cache and 'b' in cache
+        cache.invalidate()
+        assert len(cache) == 0
+
+    def test_account_without_abi(self):
+        cache = AbiCache(FakeCleos())
+        with pytest.raises(EOSAbiProcessingError):
+            cache.get('noabi')
+        assert 'noabi' not in cache
+
+
+class TestMultisigReview:
+
+    def test_abi_parsed_once_per_contract(self):
+        action = {'account': 'eosio.token', 'name': 'transfer',
+                  'authorization': [{'actor': 'eosio', 'permission': 'active'}], 'data': TRANSFER_BIN}
+        trx = Transaction({'expiration': '2018-06-15T19:17:47', 'actions': [dict(action) for _ in range(50)]},
+                          {'last_irreversible_block_num': 100}, {'ref_block_prefix': 123456})
+        packed = trx.encode().hex()
+        routes = {
+            '/v1/chain/get_raw_abi': lambda body: raw_abi_response(body['account_name'], body.get('abi_hash')),
+            '/v1/chain/get_table_rows': lambda body: {'rows': [{'proposal_name': 'prop', 'packed_transaction': packed}]},
+        }
+        with StubNodeos(routes) as node:
+            with Cleos(node.url) as ce:
+                review = ce.multisig_review('eosio', 'prop')
+            assert len(node.calls('/v1/chain/get_raw_abi')) == 1
+        actions = review['transaction']['actions']
+        assert len(actions) == 50
+        assert all(dict(act['data']) == TRANSFER for act in actions)
+        assert all(act['hex_data'] == TRANSFER_BIN for act in actions)
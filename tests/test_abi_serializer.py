@@ -0,0 +1,185 @@
+import base64
+import threading
+import pytest
+from quantralib.abi_serializer import AbiSerializer, get_serializer, pack_abi, unpack_abi
+from quantralib.cleos import Cleos
+from quantralib.exceptions import EOSAbiProcessingError, EOSUnknownObj
+from stub_nodeos import StubNodeos
+
+TOKEN_ABI = {
+    'version': 'eosio::abi/1.1',
+    'types': [{'new_type_name': 'account_name', 'type': 'name'}],
+    'structs': [
+        {'name': 'transfer', 'base': '', 'fields': [
+            {'name': 'from', 'type': 'account_name'},
+            {'name': 'to', 'type': 'name'},
+            {'name': 'quantity', 'type': 'asset'},
+            {'name': 'memo', 'type': 'string'}]},
+        {'name': 'permission_level', 'base': '', 'fields': [
+            {'name': 'actor', 'type': 'name'},
+            {'name': 'permission', 'type': 'name'}]},
+        {'name': 'base_info', 'base': '', 'fields': [
+            {'name': 'owner', 'type': 'name'}]},
+        {'name': 'info', 'base': 'base_info', 'fields': [
+            {'name': 'auth', 'type': 'permission_level[]'},
+            {'name': 'note', 'type': 'string?'},
+            {'name': 'value', 'type': 'value_t'},
+            {'name': 'extra', 'type': 'uint32$'}]},
+    ],
+    'actions': [{'name': 'transfer', 'type': 'transfer', 'ricardian_contract': ''},
+                {'name': 'setinfo', 'type': 'info', 'ricardian_contract': ''}],
+    'variants': [{'name': 'value_t', 'types': ['uint64', 'string']}],
+}
+TRANSFER = {'to': 'eosio', 'memo': 'test', 'from': 'eosio', 'quantity': '1.0000 EOS'}
+TRANSFER_BIN = '0000000000ea30550000000000ea3055102700000000000004454f53000000000474657374'
+
+
+class TestAbiSerializer:
+    ser = AbiSerializer(TOKEN_ABI)
+
+    def test_transfer_matches_nodeos(self):
+        assert self.ser.encode_action_data('transfer', TRANSFER).hex() == TRANSFER_BIN
+        assert dict(self.ser.decode_action_data('transfer', TRANSFER_BIN)) == TRANSFER
+
+    @pytest.mark.parametrize('type_name,value,hex_value', [
+        ('bool', True, '01'),
+        ('int8', -1, 'ff'),
+        ('uint16', 513, '0102'),
+        ('int64', -2, 'feffffffffffffff'),
+        ('uint64', 100000000000129, '81407a10f35a0000'),
+        ('varuint32', 300, 'ac02'),
+        ('varint32', -1, '01'),
+        ('uint128', 1, '01' + '00' * 15),
+        ('float64', 1.5, '000000000000f83f'),
+        ('name', 'eosio.token', '00a6823403ea3055'),
+        ('string', '', '00'),
+        ('bytes', '0a0b', '020a0b'),
+        ('checksum256', 'ab' * 32, 'ab' * 32),
+        ('symbol', '4,EOS', '04454f5300000000'),
+        ('symbol_code', 'EOS', '454f530000000000'),
+        ('asset', '-0.0100 SPX', '9cffffffffffffff0453505800000000'),
+        ('asset', '10 SPX', '0a000000000000000053505800000000'),
+        ('time_point_sec', '2018-06-15T19:17:47', 'db10245b'),
+        ('time_point', '2018-06-15T19:17:47.500', 'e04d3912b36e0500'),
+        ('public_key', 'EOS6JWAwA6goJmmAGwQEwbFne8zNxhuVTjgk1aLqVW9efHWhGfvwU',
+         '0002ba391b46bec7147ecc9851ddb1a2d8c22562e54d4356fa817037d5b49f36bc20'),
+        ('public_key', 'PUB_R1_65vcmkCEJuxQ2rvYxBZSiUGP9FJPaqMfrLyakHduxEULWcBUxW',
+         '01029da9782abcdc8289a2a8c06fa51b3a3ccf300a294d4e746e1a93b05204277486'),
+        ('uint8[]', [1, 2], '020102'),
+        ('string?', None, '00'),
+    ])
+    def test_builtin_types(self, type_name, value, hex_value):
+        assert self.ser.encode(type_name, value).hex() == hex_value
+        assert self.ser.decode(type_name, hex_value) == value
+
+    def test_struct_features(self):
+        data = {'owner': 'alice', 'auth': [{'actor': 'bob', 'permission': 'active'}],
+                'note': 'hi', 'value': ['string', 'x']}
+        packed = self.ser.encode_action_data('setinfo', data)
+        assert dict(self.ser.decode_action_data('setinfo', packed)) == data
+        # binary extension present
+        extended = self.ser.encode_action_data('setinfo', dict(data, extra=7))
+        assert extended == packed + b'\x07\x00\x00\x00'
+        assert self.ser.decode_action_data('setinfo', extended)['extra'] == 7
+
+    def test_errors(self):
+        with pytest.raises(EOSAbiProcessingError):
+            self.ser.encode_action_data('transfer', {'from': 'eosio', 'to': 'eosio', 'quantity': '1.0000 EOS'})
+        with pytest.raises(EOSAbiProcessingError):
+            self.ser.encode('name', 'EOSIO')
+        with pytest.raises(EOSAbiProcessingError):
+            self.ser.encode('uint8', 256)
+        with pytest.raises(EOSUnknownObj):
+            self.ser.encode_action_data('nothere', {})
+
+    def test_compiled_codecs(self):
+        ser = AbiSerializer(TOKEN_ABI)
+        ser.encode_action_data('transfer', TRANSFER)
+        codec = ser.codec('transfer')
+        assert ser.codec('transfer') is codec
+        # typedefs share the codec of the type they resolve to
+        assert ser.codec('account_name') is ser.codec('name')
+
+    def test_action_fields(self):
+        ser = AbiSerializer(TOKEN_ABI)
+        assert ser.action_fields('transfer') == [('from', 'account_name'), ('to', 'name'), ('quantity', 'asset'),
+                                                 ('memo', 'string')]
+        assert ser.action_fields('setinfo')[0] == ('owner', 'name')
+        with pytest.raises(EOSUnknownObj):
+            ser.action_fields('nothere')
+
+    def test_recursive_struct(self):
+        ser = AbiSerializer({'structs': [{'name': 'node', 'base': '', 'fields': [
+            {'name': 'value', 'type': 'uint8'}, {'name': 'children', 'type': 'node[]'}]}]})
+        tree = {'value': 1, 'children': [{'value': 2, 'children': []}]}
+        assert ser.encode('node', tree).hex() == '0101' '0200'
+        assert ser.decode('node', '01010200') == tree
+
+    def test_unknown_field_type(self):
+        ser = AbiSerializer({'structs': [{'name': 's', 'base': '', 'fields': [{'name': 'a', 'type': 'nothere'}]}]})
+        for _ in range(2):
+            with pytest.raises(EOSUnknownObj):
+                ser.encode('s', {'a': 1})
+
+    def test_unknown_variant_type(self):
+        ser = AbiSerializer({'variants': [{'name': 'v', 'types': ['uint8', 'nothere']}]})
+        for _ in range(2):
+            with pytest.raises(EOSUnknownObj):
+                ser.encode('v', ['uint8', 1])
+
+    def test_concurrent_compilation(self):
+        ser = AbiSerializer({'structs': [
+            {'name': 'outer', 'base': '', 'fields': [
+                {'name': 'a', 'type': 'uint8'}, {'name': 'b', 'type': 'inner'}, {'name': 'c', 'type': 'uint8'}]},
+            {'name': 'inner', 'base': '', 'fields': [{'name': 'x', 'type': 'uint8'}]}]})
+        compiling, resume = threading.Event(), threading.Event()
+        struct_fields = ser._struct_fields
+
+        def slow_struct_fields(struct_def, seen=()):
+            if struct_def['name'] == 'inner':
+                compiling.set()
+                resume.wait(5)
+            return struct_fields(struct_def, seen)
+        ser._struct_fields = slow_struct_fields
+        val = {'a': 1, 'b': {'x': 2}, 'c': 3}
+        out = {}
+
+        def encode(name):
+            out[name] = ser.encode('outer', val).hex()
+        first = threading.Thread(target=encode, args=('first',))
+        first.start()
+        assert compiling.wait(5)
+        # the second thread waits for the compilation instead of using the half built codec
+        second = threading.Thread(target=encode, args=('second',))
+        second.start()
+        second.join(0.2)
+        assert 'second' not in out
+        resume.set()
+        first.join()
+        second.join()
+        assert out == {'first': '010203', 'second': '010203'}
+
+    def test_shared_by_hash(self):
+        assert get_serializer(TOKEN_ABI) is get_serializer(dict(TOKEN_ABI))
+        assert get_serializer(TOKEN_ABI, 'ab' * 32) is not get_serializer(TOKEN_ABI)
+
+    def test_pack_abi(self):
+        raw = pack_abi(TOKEN_ABI)
+        abi = unpack_abi(raw)
+        assert abi['version'] == TOKEN_ABI['version']
+        assert [s['name'] for s in abi['structs']] == [s['name'] for s in TOKEN_ABI['structs']]
+        assert pack_abi(abi) == raw
+
+
+class TestPackActionData:
+
+    def test_abi_fetched_once(self):
+        raw_abi = {'account_name': 'eosio.token', 'abi_hash': 'ab' * 32,
+                   'abi': base64.b64encode(pack_abi(TOKEN_ABI)).decode()}
+        routes = {'/v1/chain/get_raw_abi': lambda body: raw_abi}
+        with StubNodeos(routes) as node:
+            ce = Cleos(node.url)
+            for _ in range(3):
+                assert ce.pack_action_data('eosio.token', 'transfer', TRANSFER) == TRANSFER_BIN
+            assert len(node.calls('/v1/chain/get_raw_abi')) == 1
+            assert node.calls('/v1/chain/abi_json_to_bin') == []
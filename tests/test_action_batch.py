@@ -0,0 +1,140 @@
+import pytest
+from quantralib.action_batch import ActionBatch, action_size
+from quantralib.exceptions import EOSBatchPushError
+from quantralib.erandom import EOSRandom
+from quantralib.spade_nft import EOSSP8DE_NFT
+from stub_nodeos import CHAIN_INFO, KEY, StubNodeos, abi_route, account_route
+
+NFT_ABI = {
+    'version': 'eosio::abi/1.1',
+    'structs': [{'name': 'transfer', 'base': '', 'fields': [
+        {'name': 'from', 'type': 'name'},
+        {'name': 'to', 'type': 'name'},
+        {'name': 'assetids', 'type': 'uint64[]'},
+        {'name': 'memo', 'type': 'string'}]}],
+    'actions': [{'name': 'transfer', 'type': 'transfer', 'ricardian_contract': ''}],
+}
+
+
+def push(body):
+    memo = body['transaction']['actions'][-1]['data']
+    if memo.endswith('626164'):
+        return 500, {'code': 500, 'message': 'Internal Service Error', 'error': {'name': 'eosio_assert_message_exception'}}
+    return {'transaction_id': 'ok', 'processed': {}}
+
+
+ROUTES = {
+    '/v1/chain/get_info': lambda body: CHAIN_INFO,
+    '/v1/chain/get_account': account_route(),
+    '/v1/chain/get_raw_abi': abi_route(NFT_ABI),
+    '/v1/chain/push_transaction': push,
+    '/v1/chain/get_table_rows': lambda body: {'rows': [{'version': 2, 'random_price': '1.00 QRND'}], 'more': False},
+}
+
+
+def action(actor, data_len=8):
+    return {'account': 'nft', 'name': 'transfer', 'authorization': [{'actor': actor, 'permission': 'active'}],
+            'data': '00' * data_len}
+
+
+class TestActionBatch:
+
+    def test_groups_by_authorization(self):
+        batch = ActionBatch(None)
+        for actor in ['alice', 'bob', 'alice']:
+            batch.add(action(actor))
+        trxs = batch.transactions()
+        assert [[a['authorization'][0]['actor'] for a in trx['actions']] for trx in trxs] == [['alice', 'alice'], ['bob']]
+
+    def test_split_by_actions_bytes_and_cpu(self):
+        batch = ActionBatch(None, max_actions=3)
+        for _ in range(7):
+            batch.add(action('alice'))
+        assert [len(trx['actions']) for trx in batch.transactions()] == [3, 3, 1]
+
+        batch = ActionBatch(None, max_bytes=1000)
+        for _ in range(5):
+            batch.add(action('alice', data_len=300))
+        assert action_size(action('alice', data_len=300)) == 16 + 1 + 16 + 2 + 300
+        assert [len(trx['actions']) for trx in batch.transactions()] == [2, 2, 1]
+
+        batch = ActionBatch(None, max_cpu_us=1000, action_cpu_us={'transfer': 400})
+        for _ in range(5):
+            batch.add(action('alice'))
+        assert [len(trx['actions']) for trx in batch.transactions()] == [2, 2, 1]
+
+    def test_contract_batch(self):
+        with StubNodeos(ROUTES) as node:
+            nft = EOSSP8DE_NFT('nft', [KEY.to_wif()], chain_url=node.url)
+            with nft.batch(max_actions=2) as b:
+                assert b.transfer('alice', 'bob', [1], 'a') is None
+                nft.transfer('alice', 'bob', [2], 'b')
+                b.transfer('alice', 'bob', [3], 'c')
+                assert len(b) == 3
+                assert node.calls('/v1/chain/push_transaction') == []
+            pushed = node.calls('/v1/chain/push_transaction')
+            assert sorted(len(body['transaction']['actions']) for body in pushed) == [1, 2]
+            assert [r['transaction_id'] for r in b.results] == ['ok', 'ok']
+            # outside the block actions are pushed again
+            nft.transfer('alice', 'bob', [4], 'd')
+            assert len(node.calls('/v1/chain/push_transaction')) == 3
+            nft.close()
+
+    def test_failed_transactions(self):
+        with StubNodeos(ROUTES) as node:
+            nft = EOSSP8DE_NFT('nft', [KEY.to_wif()], chain_url=node.url)
+            with pytest.raises(EOSBatchPushError) as err:
+                with nft.batch(max_actions=1) as b:
+                    b.transfer('alice', 'bob', [1], 'a')
+                    b.transfer('alice', 'bob', [2], 'bad')
+            assert ['error' in r for r in err.value.results] == [False, True]
+            nft.close()
+
+    def test_failed_transaction_stops_its_group(self):
+        with StubNodeos(ROUTES) as node:
+            nft = EOSSP8DE_NFT('nft', [KEY.to_wif()], chain_url=node.url)
+            with pytest.raises(EOSBatchPushError) as err:
+                with nft.batch(max_actions=1) as b:
+                    for memo in ['a', 'bad', 'c']:
+                        b.transfer('alice', 'bob', [1], memo)
+                    b.transfer('carol', 'bob', [2], 'e')
+            pushed = [body['transaction']['actions'][0] for body in node.calls('/v1/chain/push_transaction')]
+            # 'c' follows the failed 'bad' of alice, carol's group goes on
+            assert sorted(bytes.fromhex(a['data'])[-1:].decode() for a in pushed) == ['a', 'd', 'e']
+            results = err.value.results
+            assert ['error' in r for r in results] == [False, True, True, False]
+            assert results[2]['error'].startswith('not pushed')
+            nft.close()
+
+    def test_block_error_discards_actions(self):
+        with StubNodeos(ROUTES) as node:
+            nft = EOSSP8DE_NFT('nft', [KEY.to_wif()], chain_url=node.url)
+            with pytest.raises(KeyError):
+                with nft.batch() as b:
+                    b.transfer('alice', 'bob', [1], 'a')
+                    raise KeyError('abort')
+            assert node.calls('/v1/chain/push_transaction') == []
+            nft.close()
+
+    def test_group_transactions_pushed_in_order(self):
+        with StubNodeos(ROUTES) as node:
+            nft = EOSSP8DE_NFT('nft', [KEY.to_wif()], chain_url=node.url)
+            memos = ['a', 'b', 'c', 'd', 'e', 'f']
+            with nft.batch(max_actions=1) as b:
+                for memo in memos:
+                    b.transfer('alice', 'bob', [1], memo)
+                    b.transfer('carol', 'bob', [2], memo)
+            for actor in ['alice', 'carol']:
+                pushed = [body['transaction']['actions'][0] for body in node.calls('/v1/chain/push_transaction')]
+                data = [a['data'] for a in pushed if a['authorization'][0]['actor'] == actor]
+                assert [bytes.fromhex(d)[-1:].decode() for d in data] == memos
+            nft.close()
+
+    def test_reading_methods_raise(self):
+        with StubNodeos(ROUTES) as node:
+            rnd = EOSRandom('qrandom', [KEY.to_wif()], 'eosio.token', chain_url=node.url)
+            with pytest.raises(RuntimeError):
+                with rnd.batch() as b:
+                    b.buy_random('alice', 1)
+            assert node.calls('/v1/chain/push_transaction') == []
+            rnd.close()
@@ -0,0 +1,151 @@
+import asyncio
+import hashlib
+import json
+import pytest
+import requests
+from quantralib.keys import EOSKey
+from quantralib.signer import Signer
+from quantralib.utils import sig_digest
+from quantralib.types import Transaction
+from stub_nodeos import KEY, StubNodeos, push_routes, transfer
+from test_table_pager import table_rows, KEYS
+
+aiohttp = pytest.importorskip('aiohttp')
+from quantralib.async_cleos import AsyncCleos
+
+
+CHAIN_INFO = {'chain_id': 'cf057bbfb72640471fd910bcb67639c22df9f92470936cddc1ade0e2f2e7dc4f',
+              'head_block_num': 120, 'last_irreversible_block_num': 100,
+              'last_irreversible_block_id': '000000640000000040e20100' + '00' * 20}
+LIB_INFO = {'block_num': 100, 'ref_block_prefix': 123456}
+TRX = {'actions': [{'account': 'eosio.token', 'name': 'transfer',
+                    'authorization': [{'actor': 'tester', 'permission': 'active'}],
+                    'data': '00'}]}
+
+
+def routes():
+    return {
+        '/v1/chain/get_info': lambda body: CHAIN_INFO,
+        '/v1/chain/get_block': lambda body: LIB_INFO,
+        '/v1/chain/get_table_rows': lambda body: {'rows': [{'scope': body['scope']}], 'more': False},
+        '/v1/chain/get_account': lambda body: (500, {'code': 500, 'error': {'name': 'unknown_account'}}),
+        '/v1/chain/push_transaction': lambda body: {'transaction_id': 'ff', 'processed': {}},
+    }
+
+
+class WaitingSigner(Signer):
+    ''' signs only once all signers of the group started, so signing serially would deadlock '''
+
+    def __init__(self, key, group):
+        self.key = key
+        self.group = group
+
+    def to_public(self):
+        return self.key.to_public()
+
+    def to_wif(self):
+        return self.key.to_wif()
+
+    def sign(self, digest):
+        return self.key.sign(digest)
+
+    async def sign_async(self, digest, executor=None):
+        self.group.append(self)
+        while len(self.group) < 2:
+            await asyncio.sleep(0.01)
+        return await super().sign_async(digest, executor)
+
+    def verify(self, encoded_sig, digest):
+        return self.key.verify(encoded_sig, digest)
+
+
+class TestAsyncCleos:
+    key = KEY
+
+    def test_concurrent_get_table(self):
+        async def run(url):
+            async with AsyncCleos(url) as ce:
+                scopes = ['scope{}'.format(i) for i in range(50)]
+                rows = await asyncio.gather(*(ce.get_table('code', s, 'tbl') for s in scopes))
+                return scopes, [r['rows'][0]['scope'] for r in rows]
+
+        with StubNodeos(routes()) as node:
+            scopes, rows = asyncio.run(run(node.url))
+        assert rows == scopes
+
+    def test_http_error(self):
+        async def run(url):
+            async with AsyncCleos(url) as ce:
+                await ce.get_account('nobody')
+
+        with StubNodeos(routes()) as node:
+            with pytest.raises(requests.exceptions.HTTPError) as ex:
+                asyncio.run(run(node.url))
+        assert ex.value.response.json()['error']['name'] == 'unknown_account'
+
+    def test_push_transaction(self):
+        async def run(url):
+            async with AsyncCleos(url) as ce:
+                return await ce.push_transaction(dict(TRX), self.key)
+
+        with StubNodeos(routes()) as node:
+            resp = asyncio.run(run(node.url))
+            pushed = node.calls('/v1/chain/push_transaction')
+        assert resp['transaction_id'] == 'ff'
+        assert len(pushed) == 1
+        sent = pushed[0]
+        trx = Transaction(sent['transaction'], CHAIN_INFO, LIB_INFO)
+        assert trx.ref_block_num == 100
+        assert trx.ref_block_prefix == 123456
+        digest = sig_digest(trx.encode(), CHAIN_INFO['chain_id'])
+        assert self.key.verify(sent['signatures'][0], digest)
+
+    def test_iter_table(self):
+        async def run(url):
+            async with AsyncCleos(url) as ce:
+                return [r['id'] async for r in ce.iter_table('code', 'scope', 'tbl', page_size=50)]
+
+        with StubNodeos({'/v1/chain/get_table_rows': table_rows}) as node:
+            assert asyncio.run(run(node.url)) == KEYS
+
+    def test_concurrent_signers(self):
+        other = EOSKey('PVT_K1_r9seSVdS9yTRmSXtLrpELLZ5dhbEqr12jLCRg5NJAWr5q8U9o')
+
+        async def run(url):
+            group = []
+            async with AsyncCleos(url) as ce:
+                signers = [WaitingSigner(self.key, group), WaitingSigner(other, group)]
+                return await asyncio.wait_for(ce.push_transaction(dict(TRX), signers, broadcast=False), 5)
+
+        with StubNodeos(routes()) as node:
+            sent = json.loads(asyncio.run(run(node.url)))
+        trx = Transaction(sent['transaction'], CHAIN_INFO, LIB_INFO)
+        digest = sig_digest(trx.encode(), CHAIN_INFO['chain_id'])
+        assert sent['signatures'] == [self.key.sign(digest), other.sign(digest)]
+
+    def test_push_transactions(self):
+        memos = ['a', 'bad', 'c', 'd']
+
+        async def run(url, window):
+            async with AsyncCleos(url) as ce:
+                return await ce.push_transactions([transfer(m) for m in memos], self.key, window=window)
+
+        with StubNodeos(push_routes()) as node:
+            for window in (None, 2):
+                results = asyncio.run(run(node.url, window))
+                assert [r['transaction_id'] for r in results[::2]] == ['61', '63']
+                assert 'error' in results[1] and len(results[1]['transaction_id']) == 64
+            assert len(node.calls('/v1/chain/push_transactions')) == 1
+            assert len(node.calls('/v1/chain/push_transaction')) == len(memos)
+
+    def test_failed_push_transaction_id(self):
+        async def run(url):
+            async with AsyncCleos(url) as ce:
+                with pytest.raises(requests.exceptions.HTTPError) as err:
+                    await ce.push_transaction(transfer('bad'), self.key, packed=True)
+                return err.value.transaction_id
+
+        with StubNodeos(push_routes(failing=True)) as node:
+            failed_id = asyncio.run(run(node.url))
+            pushed = node.calls('/v1/chain/push_transaction')[0]
+        assert failed_id == hashlib.sha256(bytes.fromhex(pushed['packed_trx'])).hexdigest()
@@ -0,0 +1,38 @@
+import os
+import base58
+import pytest
+from quantralib.key_codec import b58decode, b58encode, decode_key_string, decode_wif, encode_key_string, encode_wif
+
+WIF = '5JU8RktQ72qFtJyiW3DJ54B2ZY6Ad83HdoGg78Nk8kUNMJEmCUg'
+R1_PUB = 'PUB_R1_65vcmkCEJuxQ2rvYxBZSiUGP9FJPaqMfrLyakHduxEULWcBUxW'
+
+
+class TestKeyCodec:
+
+    @pytest.mark.parametrize('length', [0, 1, 32, 33, 37, 65, 69])
+    def test_base58_matches_reference(self, length):
+        for zeros in range(3):
+            data = b'\0' * zeros + os.urandom(length)
+            assert b58encode(data) == base58.b58encode(data).decode()
+            assert b58decode(b58encode(data)) == data
+
+    def test_key_strings(self):
+        key_type, data = decode_key_string(R1_PUB, 'PUB')
+        assert key_type == 'R1' and len(data) == 33
+        assert encode_key_string('PUB', key_type, data) == R1_PUB
+        secret = decode_wif(WIF)
+        assert encode_wif(secret) == WIF
+        assert decode_key_string(WIF, 'PVT') == ('K1', secret)
+        pvt = encode_key_string('PVT', 'K1', secret)
+        assert pvt.startswith('PVT_K1_') and decode_key_string(pvt, 'PVT') == ('K1', secret)
+
+    @pytest.mark.parametrize('val,prefix', [
+        (R1_PUB[:-1] + 'X', 'PUB'),
+        (R1_PUB.replace('6', '0'), 'PUB'),
+        (R1_PUB, 'SIG'),
+        ('PUB_XX_65vcmkCE', 'PUB'),
+        (WIF[:-1] + 'h', 'PVT'),
+    ])
+    def test_malformed(self, val, prefix):
+        with pytest.raises(ValueError):
+            decode_key_string(val, prefix)
@@ -0,0 +1,102 @@
+from quantralib.cleos import Cleos
+from quantralib.keyring import Keyring
+from quantralib.keys import EOSKey
+from stub_nodeos import CHAIN_INFO, KEY as K1, StubNodeos
+
+K2 = EOSKey('PVT_K1_r9seSVdS9yTRmSXtLrpELLZ5dhbEqr12jLCRg5NJAWr5q8U9o')
+R1 = EOSKey('PVT_R1_2sTZXHRWPfgWfn4gTD4bXjVsKRTSYBCekebBgJq1P9SW7ckoXk')
+OTHER = EOSKey()
+
+
+def permission(name, parent, keys=(), accounts=(), threshold=1):
+    return {'perm_name': name, 'parent': parent, 'required_auth': {
+        'threshold': threshold, 'waits': [],
+        'keys': [{'key': key, 'weight': weight} for key, weight in keys],
+        'accounts': [{'permission': {'actor': actor, 'permission': perm}, 'weight': weight}
+                     for actor, perm, weight in accounts]}}
+
+
+ACCOUNTS = {
+    'alice': [permission('owner', '', keys=[(K1.to_public(), 1)]),
+              permission('active', 'owner', keys=[(OTHER.to_public(), 1)])],
+    'bob': [permission('owner', '', keys=[(OTHER.to_public(), 1)]),
+            permission('active', 'owner', keys=[(K1.to_public(), 1), (K2.to_public(), 1)],
+                       accounts=[('carol', 'active', 1)], threshold=2)],
+    'carol': [permission('owner', '', keys=[(OTHER.to_public(), 1)]),
+              permission('active', 'owner', keys=[('PUB_R1_65vcmkCEJuxQ2rvYxBZSiUGP9FJPaqMfrLyakHduxEULWcBUxW', 2)])],
+    'dave': [permission('owner', '', keys=[(OTHER.to_public(), 1)]),
+             permission('active', 'owner', keys=[(OTHER.to_public(), 1)])],
+}
+
+
+class FakeCleos:
+    def __init__(self):
+        self.calls = []
+
+    def get_account(self, account, timeout=30):
+        self.calls.append(account)
+        return {'account_name': account, 'permissions': ACCOUNTS[account]}
+
+
+def auth(actor, permission='active'):
+    return {'actor': actor, 'permission': permission}
+
+
+class TestKeyring:
+
+    def test_index(self):
+        ring = Keyring([K1.to_wif(), K2, R1])
+        assert len(ring) == 3
+        assert K1.to_public() in ring
+        # PUB_K1_ and EOS spell the same key
+        assert ring.get('PUB_K1_6ctHgq55Tt4u3ksvDw1jadhC5tytemHs8fHM4YfFVqMe4F8XWU') is K2
+        assert ring.get('PUB_R1_65vcmkCEJuxQ2rvYxBZSiUGP9FJPaqMfrLyakHduxEULWcBUxW') is R1
+        assert ring.get(OTHER.to_public()) is None
+
+    def test_required_keys(self):
+        ce = FakeCleos()
+        ring = Keyring([K1, K2, R1], cleos=ce)
+        assert ring.keys_for([auth('alice', 'owner')]) == [K1]
+        # threshold 2 with two keys of weight 1
+        assert ring.keys_for([auth('bob')]) == [K1, K2]
+        assert ring.keys_for([auth('carol')]) == [R1]
+        assert ring.keys_for([auth('alice', 'owner'), auth('carol')]) == [K1, R1]
+        # as in nodeos the owner key does not satisfy a declared active
+        assert ring.keys_for([auth('alice')]) == [K1, K2, R1]
+        # unsatisfiable, sign with everything and let nodeos report it
+        assert ring.keys_for([auth('dave')]) == [K1, K2, R1]
+        assert sorted(ce.calls) == ['alice', 'bob', 'carol', 'dave']
+
+    def test_account_delegation(self):
+        ring = Keyring([K2, R1], cleos=FakeCleos())
+        # K2 and carol@active each weigh 1 of bob's threshold 2
+        assert ring.keys_for([auth('bob')]) == [K2, R1]
+
+    def test_cache(self):
+        now = [0]
+        ce = FakeCleos()
+        ring = Keyring([K1], cleos=ce, account_cache_ttl=10, clock=lambda: now[0])
+        ring.keys_for([auth('alice')])
+        ring.keys_for([auth('alice')])
+        assert ce.calls == ['alice']
+        now[0] = 11
+        ring.keys_for([auth('alice')])
+        ring.invalidate('alice')
+        ring.keys_for([auth('alice')])
+        assert ce.calls == ['alice'] * 3
+
+    def test_push_signs_with_required_keys(self):
+        routes = {
+            '/v1/chain/get_info': lambda body: CHAIN_INFO,
+            '/v1/chain/get_account': lambda body: {'permissions': ACCOUNTS[body['account_name']]},
+            '/v1/chain/push_transaction': lambda body: {'transaction_id': '00'},
+        }
+        trx = {'actions': [{'account': 'eosio.token', 'name': 'transfer', 'authorization': [auth('alice', 'owner')],
+                            'data': '00'}]}
+        with StubNodeos(routes) as node:
+            ring = Keyring([K1, K2, R1])
+            with Cleos(node.url) as ce:
+                ce.push_transaction(trx, ring)
+                ce.push_transaction(trx, ring)
+            assert len(node.calls('/v1/chain/get_account')) == 1
+            assert len(node.calls('/v1/chain/push_transaction')[0]['signatures']) == 1
@@ -0,0 +1,71 @@
+import pytest
+import requests
+from quantralib.cleos import Cleos
+from quantralib.node_pool import NodePool, is_node_failure
+from stub_nodeos import StubNodeos
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestNodePool:
+
+    def test_fastest_first(self):
+        pool = NodePool(['http://a', 'http://b', 'http://c'])
+        a, b, c = pool.nodes
+        pool.report_success(a, 0.5)
+        pool.report_success(b, 0.1)
+        pool.report_success(c, 0.3)
+        assert pool.candidates() == [b, c, a]
+
+    def test_ejection_backoff(self):
+        clock = Clock()
+        pool = NodePool(['http://a', 'http://b'], backoff=1.0, max_backoff=4.0, clock=clock)
+        a, b = pool.nodes
+        pool.report_success(a, 0.1)
+        pool.report_success(b, 0.2)
+        pool.report_failure(a)
+        assert pool.best() is b
+        clock.now += 1.5
+        assert pool.best() is a
+        for _ in range(5):
+            pool.report_failure(a)
+        assert a.ejected_until == clock.now + 4.0
+        pool.report_success(a, 0.1)
+        assert a.failures == 0
+
+    def test_is_node_failure(self):
+        assert is_node_failure(503, None)
+        assert is_node_failure(500, None)
+        assert not is_node_failure(500, {'code': 500, 'error': {'name': 'eosio_assert_message_exception'}})
+        assert not is_node_failure(404, None)
+
+
+class TestCleosNodePool:
+    info = {'chain_id': 'ab' * 32}
+
+    def test_failover(self):
+        down = {'/v1/chain/get_info': lambda body: (503, {'message': 'unavailable'})}
+        up = {'/v1/chain/get_info': lambda body: self.info}
+        with StubNodeos(down) as bad, StubNodeos(up) as good:
+            ce = Cleos([bad.url, good.url])
+            assert ce.get_info() == self.info
+            assert ce.get_info() == self.info
+            # the bad node was ejected after the first failure
+            assert len(bad.calls('/v1/chain/get_info')) == 1
+            assert len(good.calls('/v1/chain/get_info')) == 2
+            assert ce.node_pool.best().url == good.url
+
+    def test_nodeos_error_not_ejected(self):
+        err = {'/v1/chain/get_account': lambda body: (500, {'code': 500, 'error': {'name': 'unknown'}})}
+        with StubNodeos(err) as node, StubNodeos(err) as other:
+            ce = Cleos([node.url, other.url])
+            with pytest.raises(requests.exceptions.HTTPError):
+                ce.get_account('nobody')
+            assert all(n.failures == 0 for n in ce.node_pool.nodes)
+            assert len(node.requests) + len(other.requests) == 1
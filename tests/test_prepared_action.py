@@ -0,0 +1,73 @@
+import json
+import pytest
+from quantralib.abi_serializer import AbiSerializer
+from quantralib.exceptions import EOSAbiProcessingError
+from quantralib.spade_nft import EOSSP8DE_NFT_EXCHANGE
+from quantralib.types import Transaction
+from quantralib.utils import sha256, sig_digest
+from stub_nodeos import CHAIN_INFO, KEY, StubNodeos, abi_route, account_route
+from test_abi_serializer import TOKEN_ABI
+
+AUTH = [{'actor': 'alice', 'permission': 'active'}]
+ROUTES = {
+    '/v1/chain/get_info': lambda body: CHAIN_INFO,
+    '/v1/chain/get_account': account_route(),
+    '/v1/chain/get_raw_abi': abi_route(TOKEN_ABI),
+    '/v1/chain/push_transaction': lambda body: {'transaction_id': sha256(bytes.fromhex(body.get('packed_trx', '')))},
+}
+
+
+@pytest.fixture
+def exchange():
+    with StubNodeos(ROUTES) as node:
+        ex = EOSSP8DE_NFT_EXCHANGE('exchange', [KEY.to_wif()], chain_url=node.url)
+        yield ex, node
+        ex.close()
+
+
+class TestPreparedAction:
+
+    def test_pack_matches_serializer(self, exchange):
+        ex, _ = exchange
+        transfer = ex.prepare('transfer', {'from': 'alice', 'to': 'exchange'}, AUTH, account='eosio.token')
+        assert transfer.varying == ['quantity', 'memo']
+        args = {'from': 'alice', 'to': 'exchange', 'quantity': '1.5000 EOS', 'memo': '42'}
+        assert transfer.pack(quantity='1.5000 EOS', memo='42') == AbiSerializer(TOKEN_ABI).encode_action_data(
+            'transfer', args)
+        with pytest.raises(EOSAbiProcessingError):
+            transfer.pack(quantity='1.5000 EOS')
+
+    def test_transaction_matches_push_transaction(self, exchange):
+        ex, _ = exchange
+        transfer = ex.prepare('transfer', {'from': 'alice', 'to': 'exchange'}, AUTH, account='eosio.token')
+        body = json.loads(transfer(broadcast=False, quantity='1.5000 EOS', memo='42'))
+        raw = bytes.fromhex(body['packed_trx'])
+        payload = transfer.payload(quantity='1.5000 EOS', memo='42')
+        lib_info = {'ref_block_prefix': ex.ce.tapos.cached_chain_lib_info()[1]['ref_block_prefix']}
+        expected = Transaction({'actions': [payload]}, CHAIN_INFO, lib_info).encode()
+        # past the expiration, the same bytes as the Transaction serializes to
+        assert raw[4:] == expected[4:]
+        assert KEY.verify(body['signatures'][0], sig_digest(raw, CHAIN_INFO['chain_id']))
+
+    def test_prepare_bet(self, exchange):
+        ex, node = exchange
+        bet = ex.prepare_bet('alice', 'exchange')
+        rslt = bet('1.0000 EOS', 7)
+        pushed = node.calls('/v1/chain/push_transaction')
+        assert len(pushed) == 1 and rslt['transaction_id'] == sha256(bytes.fromhex(pushed[0]['packed_trx']))
+        bet('2.0000 EOS', 8)
+        # the abi and the permissions are fetched once
+        assert len(node.calls('/v1/chain/get_raw_abi')) == 1
+        assert len(node.calls('/v1/chain/get_account')) == 1
+        with pytest.raises(ValueError):
+            ex.prepare_bet('alice', 'exchange', account_tokens='Tokens')
+
+    def test_batched(self, exchange):
+        ex, node = exchange
+        bet = ex.prepare_bet('alice', 'exchange')
+        with ex.batch() as b:
+            assert bet('1.0000 EOS', 7) is None
+            bet('2.0000 EOS', 8)
+        pushed = node.calls('/v1/chain/push_transaction')
+        assert len(pushed) == 1 and len(pushed[0]['transaction']['actions']) == 2
+        assert len(b.results) == 1
@@ -0,0 +1,80 @@
+import hashlib
+import json
+import zlib
+import pytest
+import requests
+from quantralib.cleos import Cleos
+from quantralib.types import Transaction
+from quantralib.utils import sig_digest
+from stub_nodeos import CHAIN_INFO, KEY, StubNodeos, push_routes, transfer
+
+ROUTES = push_routes()
+MEMOS = ['a', 'bad', 'c', 'd']
+
+
+class TestPushTransactions:
+
+    def test_bulk(self):
+        with StubNodeos(ROUTES) as node, Cleos(node.url) as ce:
+            results = ce.push_transactions([transfer(m) for m in MEMOS], KEY)
+            assert len(node.calls('/v1/chain/push_transactions')) == 1
+        assert [r['transaction_id'] for r in results[::2]] == ['61', '63']
+        assert 'error' not in results[0] and results[1]['error'] == 'assertion failure'
+        assert results[1]['transaction_id'].strip('0') and len(results[1]['transaction_id']) == 64
+
+    def test_bulk_is_split(self, monkeypatch):
+        monkeypatch.setattr('quantralib.cleos.MAX_PUSH_TRANSACTIONS', 3)
+        with StubNodeos(ROUTES) as node, Cleos(node.url) as ce:
+            results = ce.push_transactions([transfer(m) for m in MEMOS], KEY)
+            assert [len(body) for body in node.calls('/v1/chain/push_transactions')] == [3, 1]
+        assert len(results) == len(MEMOS)
+
+    def test_window(self):
+        with StubNodeos(ROUTES) as node, Cleos(node.url) as ce:
+            results = ce.push_transactions([transfer(m) for m in MEMOS], KEY, window=2)
+            assert len(node.calls('/v1/chain/push_transaction')) == len(MEMOS)
+        assert [r['transaction_id'] for r in results[::2]] == ['61', '63']
+        assert results[1]['error']['name'] == 'eosio_assert_message_exception'
+
+    def test_not_broadcast(self):
+        with StubNodeos(ROUTES) as node, Cleos(node.url) as ce:
+            bodies = ce.push_transactions([transfer(m) for m in MEMOS], KEY, broadcast=False)
+            assert node.calls('/v1/chain/push_transactions') == []
+        assert len(json.loads(bodies[0])['signatures']) == 1
+
+
+class TestPackedTransaction:
+
+    @pytest.mark.parametrize('compression,unpack', [('none', bytes), ('zlib', zlib.decompress)])
+    def test_packed_trx(self, compression, unpack):
+        trx = transfer('a')
+        with StubNodeos(ROUTES) as node, Cleos(node.url) as ce:
+            body = json.loads(ce.push_transaction(dict(trx), KEY, broadcast=False, compression=compression,
+                                                  packed=True))
+        assert 'transaction' not in body and body['compression'] == compression
+        raw = unpack(bytes.fromhex(body['packed_trx']))
+        # past the TAPOS header, the same bytes as the json form serializes to
+        expected = Transaction(trx, CHAIN_INFO, {'ref_block_prefix': 0}).encode()
+        assert raw[10:] == expected[10:]
+        assert KEY.verify(body['signatures'][0], sig_digest(raw, CHAIN_INFO['chain_id']))
+
+    def test_client_side_transaction_id(self):
+        with StubNodeos(push_routes(failing=True)) as node, Cleos(node.url) as ce:
+            results = ce.push_transactions([transfer('a')], KEY, compression='zlib', window=1)
+            pushed = node.calls('/v1/chain/push_transaction')[0]
+        raw = zlib.decompress(bytes.fromhex(pushed['packed_trx']))
+        assert results[0]['transaction_id'] == hashlib.sha256(raw).hexdigest()
+
+    def test_single_push_transaction_id(self):
+        with StubNodeos(push_routes(failing=True)) as node, Cleos(node.url) as ce:
+            body, trx_id = ce.sign_transaction(transfer('a'), KEY, packed=True)
+            assert trx_id == hashlib.sha256(bytes.fromhex(json.loads(body)['packed_trx'])).hexdigest()
+            with pytest.raises(requests.exceptions.HTTPError) as err:
+                ce.push_transaction(transfer('a'), KEY, packed=True)
+            pushed = node.calls('/v1/chain/push_transaction')[0]
+        assert err.value.transaction_id == hashlib.sha256(bytes.fromhex(pushed['packed_trx'])).hexdigest()
+
+    def test_unknown_compression(self):
+        with StubNodeos(ROUTES) as node, Cleos(node.url) as ce:
+            with pytest.raises(ValueError):
+                ce.push_transaction(transfer('a'), KEY, broadcast=False, compression='gzip')
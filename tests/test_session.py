@@ -0,0 +1,43 @@
+import gc
+import threading
+import pytest
+from quantralib.cleos import Cleos
+from stub_nodeos import StubNodeos
+
+
+class TestSession:
+    info = {'chain_id': 'ab' * 32, 'head_block_num': 10, 'last_irreversible_block_num': 5}
+
+    def test_connection_reused(self):
+        with StubNodeos({'/v1/chain/get_info': lambda body: self.info}) as node:
+            with Cleos(node.url) as ce:
+                for _ in range(5):
+                    assert ce.get_info() == self.info
+            assert len(node.calls('/v1/chain/get_info')) == 5
+            assert len(node.peers) == 1
+
+    def test_no_keep_alive(self):
+        with StubNodeos({'/v1/chain/get_info': lambda body: self.info}) as node:
+            with Cleos(node.url, keep_alive=False) as ce:
+                for _ in range(3):
+                    ce.get_info()
+            assert len(node.peers) == 3
+
+    def test_close(self):
+        with StubNodeos({'/v1/chain/get_info': lambda body: self.info}) as node:
+            ce = Cleos(node.url)
+            ce.get_info()
+            ce.close()
+            assert ce._session.closed
+            with pytest.raises(RuntimeError):
+                ce.get_info()
+
+    def test_sessions_go_with_their_threads(self):
+        with StubNodeos({'/v1/chain/get_info': lambda body: self.info}) as node, Cleos(node.url) as ce:
+            for _ in range(20):
+                thread = threading.Thread(target=ce.get_info)
+                thread.start()
+                thread.join()
+            gc.collect()
+            assert len(ce._session._sessions) == 0
+            assert len(node.calls('/v1/chain/get_info')) == 20
@@ -3,7 +3,14 @@ import sys
 sys.path.append('../quantralib')
 
 from quantralib.cleos import EOSKey
+from quantralib.keys import KEYGEN_CHUNK_SIZE, generate_keys, pubkey_to_eospubkey, recover_public_key, sig_to_eossig, sign_batch, verify_batch
+from quantralib.sign_backend import available_backends, is_canonical
+import base58
+from ecdsa import NIST256p, SECP256k1, SigningKey
+from ecdsa.util import sigencode_der
 import hashlib
+from concurrent.futures import ProcessPoolExecutor
+import pytest
 
 
 class TestSig:
@@ -33,3 +40,95 @@ class TestSig:
         key = EOSKey(self.k1[1])
         sig = key.sign(self.digest)
         assert key.verify(sig, self.digest)
+
+    def test_canonical_low_s(self):
+        key = EOSKey(self.k1[1], backend='python')
+        for i in range(20):
+            digest = hashlib.sha256(str(i).encode()).hexdigest()
+            compact = base58.b58decode(key.sign(digest)[7:])[:65]
+            assert is_canonical(compact)
+            assert int.from_bytes(compact[33:], 'big') <= SECP256k1.order // 2
+
+    @pytest.mark.skipif('secp256k1' not in available_backends(), reason='coincurve is not installed')
+    def test_backends_identical(self):
+        for wif in (self.legacy[1], self.k1[1]):
+            fast, slow = EOSKey(wif, backend='secp256k1'), EOSKey(wif, backend='python')
+            for i in range(20):
+                digest = hashlib.sha256(str(i).encode()).hexdigest()
+                assert fast.sign(digest) == slow.sign(digest)
+
+    def test_recovery_id(self):
+        for wif in (self.k1[1], self.r1[1]):
+            key = EOSKey(wif, backend='python')
+            for i in range(10):
+                digest = hashlib.sha256(str(i).encode()).digest()
+                compact = key._get_backend().sign(key, digest)
+                recovered = EOSKey.recover_key(key._curve, digest, compact[1:], compact[0] - 31)
+                assert recovered.to_string() == key._vk.to_string()
+
+    def test_r1_uses_python_backend(self):
+        key = EOSKey(self.r1[1], backend='secp256k1' if 'secp256k1' in available_backends() else 'python')
+        assert key._get_backend().name == 'python'
+
+    def test_sign_batch(self):
+        key, r1 = EOSKey(self.k1[1]), EOSKey(self.r1[1])
+        digests = [hashlib.sha256(str(i).encode()).hexdigest() for i in range(12)]
+        assert sign_batch(digests, self.k1[1], workers=2) == [key.sign(d) for d in digests]
+        signed = sign_batch(digests, [key, r1], workers=2)
+        assert [sigs[0] for sigs in signed] == [key.sign(d) for d in digests]
+        assert all(r1.verify(sigs[1], d) for sigs, d in zip(signed, digests))
+
+    def test_private_string_keeps_type(self):
+        key = EOSKey(self.r1[1])
+        assert EOSKey(key.to_private_string()).to_public() == key.to_public()
+
+    @pytest.mark.parametrize('backend', available_backends())
+    def test_recover_public_key(self, backend):
+        for pub, priv in (self.legacy, self.k1, self.r1):
+            sig = EOSKey(priv).sign(self.digest)
+            recovered = recover_public_key(sig, self.digest, backend=backend)
+            assert recovered == (pub if pub.startswith('PUB_R1_') else EOSKey(priv).to_public())
+        assert recover_public_key('SIG_K1_notasignature', self.digest) is None
+
+    def test_verify_batch(self):
+        key = EOSKey(self.k1[1])
+        digests = [hashlib.sha256(str(i).encode()).hexdigest() for i in range(8)]
+        items = [(key.sign(d), d, self.k1[0]) for d in digests]
+        # wrong digest, wrong key and the legacy spelling of the right key
+        items += [(items[0][0], digests[1], self.k1[0]), (items[0][0], digests[0], self.legacy[0]),
+                  (items[0][0], digests[0], key.to_public())]
+        assert verify_batch(items, workers=2) == [True] * 8 + [False, False, True]
+        assert not key.verify(items[0][0], digests[1])
+
+    def test_chip_key_conversion(self):
+        sk = SigningKey.from_string(EOSKey(self.r1[1])._sk.to_string(), curve=NIST256p)
+        vk = sk.get_verifying_key()
+        for encoding in ('compressed', 'uncompressed', 'raw'):
+            assert pubkey_to_eospubkey(vk.to_string(encoding).hex()) == self.r1[0]
+        assert pubkey_to_eospubkey(vk.to_der().hex()) == self.r1[0]
+        for i in range(8):
+            digest = hashlib.sha256(str(i).encode()).digest()
+            der = sk.sign_digest(digest, sigencode=sigencode_der)
+            sig = sig_to_eossig(der.hex(), vk.to_string('uncompressed').hex(), digest.hex())
+            assert recover_public_key(sig, digest) == self.r1[0]
+
+    def test_generate_keys(self):
+        pairs = list(generate_keys(KEYGEN_CHUNK_SIZE + 3, workers=2))
+        assert len(set(pairs)) == KEYGEN_CHUNK_SIZE + 3
+        for wif, public in pairs[::100]:
+            assert EOSKey(wif).to_public() == public
+
+    def test_generate_keys_bounded(self, monkeypatch):
+        submitted = []
+
+        class Pool(ProcessPoolExecutor):
+            def submit(self, *args, **kwargs):
+                submitted.append(super().submit(*args, **kwargs))
+                return submitted[-1]
+        monkeypatch.setattr('quantralib.keys.ProcessPoolExecutor', Pool)
+        keys = generate_keys(KEYGEN_CHUNK_SIZE * 20, workers=2)
+        next(keys)
+        # two chunks per worker in flight, the rest is never submitted
+        assert len(submitted) == 4
+        keys.close()
+        assert all(future.done() for future in submitted)
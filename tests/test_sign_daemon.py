@@ -0,0 +1,109 @@
+import hashlib
+import os
+import socket
+import tempfile
+import threading
+import pytest
+from quantralib.cleos import Cleos
+from quantralib.exceptions import EOSKeyError, EOSRemoteSignerError
+from quantralib.keyring import Keyring
+from quantralib.keys import EOSKey
+from quantralib.sign_daemon import RemoteSigner, SignerClient, SigningDaemon
+from stub_nodeos import CHAIN_INFO, StubNodeos
+
+K1 = EOSKey('PVT_K1_r9seSVdS9yTRmSXtLrpELLZ5dhbEqr12jLCRg5NJAWr5q8U9o')
+R1 = EOSKey('PVT_R1_2sTZXHRWPfgWfn4gTD4bXjVsKRTSYBCekebBgJq1P9SW7ckoXk')
+R1_PUB = 'PUB_R1_65vcmkCEJuxQ2rvYxBZSiUGP9FJPaqMfrLyakHduxEULWcBUxW'
+DIGESTS = [hashlib.sha256(str(i).encode()).hexdigest() for i in range(6)]
+
+
+@pytest.fixture(params=[1, 2])
+def daemon(request):
+    path = os.path.join(tempfile.mkdtemp(), 'signd.sock')
+    with SigningDaemon(path, [K1.to_wif(), R1], workers=request.param).start() as daemon:
+        yield daemon
+    assert not os.path.exists(path)
+
+
+class TestSignDaemon:
+
+    def test_socket_permissions(self, daemon):
+        assert os.stat(daemon.path).st_mode & 0o777 == 0o600
+
+    def test_live_socket_is_kept(self, daemon):
+        with pytest.raises(EOSRemoteSignerError):
+            SigningDaemon(daemon.path, [K1]).start()
+        with SignerClient(daemon.path) as client:
+            assert client.public_keys() == [K1.to_public(), R1_PUB]
+
+    def test_stale_socket_is_replaced(self):
+        path = os.path.join(tempfile.mkdtemp(), 'signd.sock')
+        # bound but never listening, as left behind by a killed daemon
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(path)
+        stale.close()
+        with SigningDaemon(path, [K1]).start() as daemon:
+            with SignerClient(daemon.path) as client:
+                assert client.public_keys() == [K1.to_public()]
+
+    def test_sign(self, daemon):
+        with SignerClient(daemon.path) as client:
+            assert client.public_keys() == [K1.to_public(), R1_PUB]
+            signed = client.sign(DIGESTS, [R1_PUB, K1.to_public()])
+            assert [sigs[1] for sigs in signed] == [K1.sign(d) for d in DIGESTS]
+            assert all(R1.verify(sigs[0], d) for sigs, d in zip(signed, DIGESTS))
+            with pytest.raises(EOSKeyError):
+                client.sign(DIGESTS, [EOSKey().to_public()])
+            # the connection survives a failed request
+            k1, r1 = client.signers()
+            assert k1.sign(DIGESTS[0]) == K1.sign(DIGESTS[0])
+            assert k1.sign_batch(DIGESTS) == [K1.sign(d) for d in DIGESTS]
+            assert r1.verify(r1.sign(DIGESTS[0]), DIGESTS[0])
+
+    def test_requests_are_combined(self, daemon):
+        batches = []
+        release = threading.Event()
+        sign_requests = daemon._signer.sign_requests
+
+        def spy(requests):
+            batches.append(len(requests))
+            release.wait(5)
+            return sign_requests(requests)
+        daemon._signer.sign_requests = spy
+        signers = [RemoteSigner(K1.to_public(), daemon.path) for _ in DIGESTS]
+        threads = [threading.Thread(target=signer.sign, args=(d,)) for signer, d in zip(signers, DIGESTS)]
+        threads[0].start()
+        while not batches:
+            threading.Event().wait(0.01)
+        # the other clients queue up while the first request is signed
+        for thread in threads[1:]:
+            thread.start()
+        while daemon._queue.qsize() < len(DIGESTS) - 1:
+            threading.Event().wait(0.01)
+        release.set()
+        for thread in threads:
+            thread.join()
+        assert batches == [1, len(DIGESTS) - 1]
+
+    def test_client_reconnects_after_fork(self, daemon):
+        with SignerClient(daemon.path) as client:
+            client.public_keys()
+            inherited = client._sock
+            # as seen from a forked child
+            client._pid = -1
+            assert client.public_keys() == [K1.to_public(), R1_PUB]
+            assert client._sock is not inherited and inherited.fileno() == -1
+
+    def test_push_transaction(self, daemon):
+        routes = {
+            '/v1/chain/get_info': lambda body: CHAIN_INFO,
+            '/v1/chain/push_transaction': lambda body: {'transaction_id': '00'},
+        }
+        trx = {'actions': [{'account': 'eosio.token', 'name': 'transfer',
+                            'authorization': [{'actor': 'tester', 'permission': 'active'}], 'data': '00'}]}
+        remote = RemoteSigner(K1.to_public(), daemon.path)
+        assert Keyring([remote]).get(K1.to_public()) is remote
+        with StubNodeos(routes) as node, Cleos(node.url) as ce:
+            ce.push_transaction(trx, [remote])
+            signatures = node.calls('/v1/chain/push_transaction')[0]['signatures']
+            assert len(signatures) == 1 and signatures[0].startswith('SIG_K1_')
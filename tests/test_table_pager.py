@@ -0,0 +1,78 @@
+import pytest
+from quantralib.cleos import Cleos
+from quantralib.exceptions import EOSTablePagingError
+from quantralib.table_pager import TablePager, MIN_TABLE_PAGE_SIZE
+from stub_nodeos import StubNodeos
+
+KEYS = list(range(1, 1001))
+
+
+def table_rows(body, max_rows=None):
+    ''' get_table_rows over KEYS with nodeos paging semantics '''
+    lower = int(body['lower_bound'] or KEYS[0])
+    upper = int(body['upper_bound'] or KEYS[-1])
+    keys = [k for k in KEYS if lower <= k <= upper]
+    if body.get('reverse'):
+        keys.reverse()
+    limit = min(body['limit'], max_rows or body['limit'])
+    page, rest = keys[:limit], keys[limit:]
+    rows = [{'id': k} for k in page]
+    if body.get('show_payer'):
+        rows = [{'data': row, 'payer': 'alice'} for row in rows]
+    resp = {'rows': rows, 'more': bool(rest), 'next_key': str(rest[0]) if rest else ''}
+    return resp
+
+
+class TestTablePager:
+
+    def test_page_size_adapts(self):
+        pager = TablePager(page_size=100)
+        pager.advance({'rows': [{}] * 100, 'more': True, 'next_key': '101'}, 100, 0.01)
+        assert pager.page_size == 200
+        assert pager.request()['lower_bound'] == '101'
+        pager.advance({'rows': [{}] * 200, 'more': True, 'next_key': '301'}, 200, 1.0)
+        assert pager.page_size == 100
+        # the node returned less than asked for
+        pager.advance({'rows': [{}] * 3, 'more': True, 'next_key': '304'}, 100, 0.01)
+        assert pager.page_size == MIN_TABLE_PAGE_SIZE
+
+    def test_limit(self):
+        pager = TablePager(page_size=100, limit=150)
+        rows = pager.advance({'rows': [{}] * 100, 'more': True, 'next_key': '101'}, 100, 1.0)
+        assert len(rows) == 100 and not pager.done
+        assert pager.request()['limit'] == 50
+        pager.advance({'rows': [{}] * 50, 'more': True, 'next_key': '151'}, 50, 1.0)
+        assert pager.done
+
+    def test_missing_next_key(self):
+        with pytest.raises(EOSTablePagingError):
+            TablePager().advance({'rows': [{}], 'more': True}, 100, 0.1)
+
+
+class TestIterTable:
+
+    @pytest.mark.parametrize('prefetch', [True, False])
+    def test_all_rows(self, prefetch):
+        with StubNodeos({'/v1/chain/get_table_rows': table_rows}) as node:
+            with Cleos(node.url) as ce:
+                rows = [r['id'] for r in ce.iter_table('code', 'scope', 'tbl', page_size=50, prefetch=prefetch)]
+            pages = node.calls('/v1/chain/get_table_rows')
+        assert rows == KEYS
+        assert len(pages) < len(KEYS) // 50
+
+    def test_reverse_bounds_payer(self):
+        with StubNodeos({'/v1/chain/get_table_rows': table_rows}) as node:
+            with Cleos(node.url) as ce:
+                rows = list(ce.iter_table('code', 'scope', 'tbl', lower_bound='100', upper_bound='400',
+                                          page_size=20, reverse=True, show_payer=True))
+        assert [r['data']['id'] for r in rows] == list(range(400, 99, -1))
+        assert rows[0]['payer'] == 'alice'
+
+    def test_limit_and_short_pages(self):
+        routes = {'/v1/chain/get_table_rows': lambda body: table_rows(body, max_rows=30)}
+        with StubNodeos(routes) as node:
+            with Cleos(node.url) as ce:
+                rows = list(ce.iter_table('code', 'scope', 'tbl', limit=250, page_size=100))
+            limits = [body['limit'] for body in node.calls('/v1/chain/get_table_rows')]
+        assert [r['id'] for r in rows] == KEYS[:250]
+        assert limits[:2] == [100, 30]
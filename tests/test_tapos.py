@@ -0,0 +1,67 @@
+from quantralib.cleos import Cleos
+from quantralib.tapos import TaposProvider
+from quantralib.utils import ref_block_prefix, block_num_from_id
+from stub_nodeos import CHAIN_INFO, KEY, LIB_ID, StubNodeos
+
+TRX = {'actions': [{'account': 'eosio.token', 'name': 'transfer',
+                    'authorization': [{'actor': 'tester', 'permission': 'active'}],
+                    'data': '00'}]}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeCleos:
+    def __init__(self):
+        self.calls = 0
+
+    def get_info(self, timeout=30):
+        self.calls += 1
+        return CHAIN_INFO
+
+
+class TestTapos:
+
+    def test_block_id_helpers(self):
+        assert block_num_from_id(LIB_ID) == 62119
+        # bytes 8..11 of the id read as little endian uint32
+        assert ref_block_prefix(LIB_ID) == 0xd7a6d0c2
+
+    def test_cache_age(self):
+        clock = Clock()
+        ce = FakeCleos()
+        tapos = TaposProvider(ce, max_age=10, clock=clock)
+        chain_info, lib_info = tapos.get_chain_lib_info()
+        assert chain_info['chain_id'] == CHAIN_INFO['chain_id']
+        assert lib_info['block_num'] == 62119
+        assert lib_info['ref_block_prefix'] == 0xd7a6d0c2
+        clock.now = 9
+        tapos.get_chain_lib_info()
+        assert ce.calls == 1
+        clock.now = 11
+        tapos.get_chain_lib_info()
+        assert ce.calls == 2
+        tapos.invalidate()
+        tapos.get_chain_lib_info()
+        assert ce.calls == 3
+
+    def test_push_single_round_trip(self):
+        routes = {
+            '/v1/chain/get_info': lambda body: CHAIN_INFO,
+            '/v1/chain/push_transaction': lambda body: {'transaction_id': '00'},
+        }
+        with StubNodeos(routes) as node:
+            with Cleos(node.url) as ce:
+                for _ in range(3):
+                    ce.push_transaction(dict(TRX), KEY)
+            assert len(node.calls('/v1/chain/get_info')) == 1
+            assert node.calls('/v1/chain/get_block') == []
+            pushed = node.calls('/v1/chain/push_transaction')
+        assert len(pushed) == 3
+        assert pushed[0]['transaction']['ref_block_num'] == 62119 & 0xffff
+        assert pushed[0]['transaction']['ref_block_prefix'] == 0xd7a6d0c2
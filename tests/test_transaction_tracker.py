@@ -0,0 +1,100 @@
+import pytest
+from quantralib.exceptions import EOSTransactionStatusError
+from quantralib.transaction_tracker import TransactionTracker
+
+START = 1000
+EPOCH = 1600000000
+
+
+def block_id(num, fork=''):
+    return '{:08x}{}'.format(num, fork).ljust(64, '0')
+
+
+class FakeChain:
+    ''' get_info/get_block of a chain producing a block every half second '''
+
+    def __init__(self):
+        self.blocks = {}
+        self.head = START
+        self.lib = START
+        self.fetched = []
+        self.produce(START, [])
+
+    def produce(self, num, trxs, fork=''):
+        previous = self.blocks[num - 1]['id'] if num - 1 in self.blocks else block_id(num - 1)
+        self.blocks[num] = {'block_num': num, 'id': block_id(num, fork), 'previous': previous,
+                            'timestamp': '2020-09-13T12:26:{:06.3f}'.format(40 + (num - START) * 0.5),
+                            'transactions': trxs}
+        self.head = max(self.head, num)
+
+    def get_info(self, timeout=30):
+        return {'head_block_num': self.head, 'last_irreversible_block_num': self.lib}
+
+    def get_block(self, block_num, timeout=30):
+        self.fetched.append(block_num)
+        return self.blocks[block_num]
+
+
+def executed(trx_id, status='executed'):
+    return {'status': status, 'cpu_usage_us': 100, 'net_usage_words': 12, 'trx': {'id': trx_id, 'signatures': []}}
+
+
+class TestTransactionTracker:
+
+    def test_included_then_irreversible(self):
+        chain = FakeChain()
+        tracker = TransactionTracker(chain)
+        tracked = [tracker.track('trx{}'.format(i), expiration=EPOCH + 60) for i in range(50)]
+        chain.produce(START + 1, [executed('trx{}'.format(i)) for i in range(25)])
+        chain.produce(START + 2, [executed('trx{}'.format(i)) for i in range(25, 50)])
+        assert tracker.poll() == 3
+        assert [t.included.result(0) for t in tracked[::25]] == [START + 1, START + 2]
+        assert not tracked[0].irreversible.done()
+        chain.lib = START + 1
+        assert tracker.poll() == 0
+        assert tracked[0].irreversible.result(0) == START + 1 and not tracked[25].irreversible.done()
+        chain.lib = START + 2
+        tracker.poll()
+        assert tracked[49].irreversible.result(0) == START + 2
+        # one fetch per block for all the tracked transactions, and idle afterwards
+        assert chain.fetched == [START, START + 1, START + 2]
+        assert len(tracker) == 0 and tracker.poll() == 0
+
+    def test_expired_and_failed(self):
+        chain = FakeChain()
+        tracker = TransactionTracker(chain)
+        expiring = tracker.track('late', expiration='2020-09-13T12:26:41.000')
+        failed = tracker.track('bad', expiration=EPOCH + 60)
+        chain.produce(START + 1, [executed('bad', status='hard_fail')])
+        chain.produce(START + 2, [])
+        tracker.poll()
+        with pytest.raises(EOSTransactionStatusError) as err:
+            expiring.irreversible.result(0)
+        assert err.value.status == 'expired'
+        with pytest.raises(EOSTransactionStatusError):
+            failed.included.result(0)
+
+    def test_fork(self):
+        chain = FakeChain()
+        tracker = TransactionTracker(chain)
+        tracked = tracker.track('trx', expiration=EPOCH + 60)
+        chain.produce(START + 1, [executed('trx')])
+        tracker.poll()
+        assert tracked.included.result(0) == START + 1
+        # START + 1 is replaced, the transaction lands in START + 2 of the new branch
+        chain.produce(START + 1, [], fork='f')
+        chain.produce(START + 2, [executed('trx')], fork='f')
+        chain.lib = START + 2
+        tracker.poll()
+        assert tracked.irreversible.result(0) == START + 2
+
+    def test_track_push(self):
+        chain = FakeChain()
+        chain.produce(START + 1, [])
+        chain.produce(START + 2, [executed('trx')])
+        tracker = TransactionTracker(chain)
+        tracked = tracker.track_push({'transaction_id': 'trx', 'processed': {'block_num': START + 2}},
+                                     expiration=EPOCH + 60)
+        tracker.poll()
+        assert tracked.included.result(0) == START + 2
+        assert chain.fetched == [START + 2]
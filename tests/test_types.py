@@ -0,0 +1,83 @@
+from quantralib.abi_serializer import AbiSerializer, BinaryReader
+from quantralib.types import (EOSBuffer, Transaction, PackedTransaction, AccountName, UInt16, UInt32, UInt64,
+                              Int16, Float, VarUInt, Asset)
+from test_abi_serializer import TOKEN_ABI, TRANSFER, TRANSFER_BIN
+
+TRX = {'expiration': '2018-06-15T19:17:47', 'actions': [
+    {'account': 'eosio.token', 'name': 'transfer',
+     'authorization': [{'actor': 'eosio', 'permission': 'active'}], 'data': '0102'}]}
+TRX_HEX = ('db10245b701140e2010000000000' '01' '00a6823403ea3055' '000000572d3ccdcd'
+           '01' '0000000000ea3055' '00000000a8ed3232' '02' '0102' '00')
+
+
+class TestEOSBuffer:
+
+    def test_encode_bytes(self):
+        assert EOSBuffer([UInt16(5), UInt16(7)]).encode_bytes() == bytearray.fromhex('0205000700')
+        assert EOSBuffer(Asset('1.2500 SPX')).encode() == 'd4300000000000000453505800000000'
+        assert EOSBuffer(VarUInt(300)).encode() == 'ac02'
+        assert EOSBuffer(UInt64(0)).encode() == '00' * 8
+
+    def test_write_appends(self):
+        buf = bytearray(b'\xff')
+        EOSBuffer(None).write(buf, [AccountName('alice'), 'é'])
+        assert buf.hex() == 'ff' '02' '0000000000855c34' '02c3a9'
+
+    def test_empty_list_items(self):
+        # falsy items are encoded as themselves, not as the buffer value
+        assert EOSBuffer(['', UInt64(0)]).encode() == '02' '00' + '00' * 8
+
+    def test_transaction(self):
+        trx = Transaction(dict(TRX), {'last_irreversible_block_num': 70000}, {'ref_block_prefix': 123456})
+        assert trx.encode().hex() == TRX_HEX
+        assert trx._encode_hdr() == TRX_HEX[:26]
+
+    def test_decode(self):
+        buf = EOSBuffer('')
+        assert buf.decode(UInt32(), '0a000000ff') == (10, 'ff')
+        assert buf.decode([AccountName()], '020000000000855c340000000000000e3d77') == (['alice', 'bob'], '77')
+        assert buf.decode('', '0568656c6c6fee') == ('hello', 'ee')
+        assert buf.decode(Int16(), b'\xfe\xff\x01') == (-2, b'\x01')
+        assert buf.decode(Float(), '0000c03f') == (1.5, '')
+        assert VarUInt().decode('ac02ff') == (300, 'ff')
+
+    def test_decode_reader(self):
+        reader = BinaryReader('0205000700ff')
+        assert EOSBuffer('').decode([UInt16()], reader) == ([5, 7], reader)
+        assert reader.pos == 5
+
+
+class AbiCleos:
+    serializer = AbiSerializer(TOKEN_ABI)
+
+    def get_abi_serializer(self, acct_name, timeout=30):
+        return self.serializer
+
+
+class TestPackedTransaction:
+    action = {'account': 'eosio.token', 'name': 'transfer',
+              'authorization': [{'actor': 'eosio', 'permission': 'active'}], 'data': TRANSFER_BIN}
+
+    def test_get_transaction(self):
+        trx = Transaction({'expiration': '2018-06-15T19:17:47', 'actions': [dict(self.action), dict(self.action)]},
+                          {'last_irreversible_block_num': 70000}, {'ref_block_prefix': 123456})
+        packed = PackedTransaction(trx.encode().hex(), AbiCleos())
+        unpacked = packed.get_transaction()
+        assert unpacked['expiration'] == '2018-06-15T19:17:47'
+        assert unpacked['ref_block_num'] == 70000 & 0xffff
+        assert unpacked['ref_block_prefix'] == 123456
+        assert len(unpacked['actions']) == 2
+        for act in unpacked['actions']:
+            assert act['hex_data'] == TRANSFER_BIN
+            assert dict(act['data']) == TRANSFER
+            assert [dict(a) for a in act['authorization']] == self.action['authorization']
+        assert packed.get_id() == trx.get_id()
+
+    def test_decode_actions_hex(self):
+        trx = Transaction({'expiration': '2018-06-15T19:17:47', 'actions': [dict(self.action)]},
+                          {'last_irreversible_block_num': 1}, {'ref_block_prefix': 1})
+        # actions start after the 13 byte header and the empty context free action list
+        body = trx.encode().hex()[28:]
+        actions, leftover = PackedTransaction('', AbiCleos()).decode_actions(body)
+        assert actions[0]['hex_data'] == TRANSFER_BIN
+        assert leftover == '00'